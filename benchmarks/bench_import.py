@@ -0,0 +1,89 @@
+"""Time importing the package with ``python -X importtime``.
+
+Every module is imported in a fresh interpreter, the best of a few runs is
+reported together with the share of it spent importing pulumi and
+pulumi_gcp.
+
+    python -m benchmarks.bench_import
+    python -m benchmarks.bench_import --modules pulumi_gcp_network.spec
+
+The exit code is 1 when importing a module of the package imports
+pulumi_gcp, only constructing a component should.
+"""
+
+import argparse
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+MODULES = [
+    "pulumi_gcp_network.subnets",
+    "pulumi_gcp_network.routes",
+    "pulumi_gcp_network.firewall_rules",
+    "pulumi_gcp_network.spec",
+    "pulumi_gcp_network.loaders",
+    "pulumi_gcp_network.network",
+]
+# pulumi_gcp itself, for reference
+REFERENCE = ["pulumi", "pulumi_gcp", "pulumi_gcp.compute"]
+TRACKED = ["pulumi", "pulumi_gcp"]
+
+
+def import_times(module: str) -> Dict[str, int]:
+    """Cumulative import microseconds by module of importing ``module``.
+
+    ``""`` holds the total, the sum of the top level imports.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    times = {"": 0}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+        if not name[1:].startswith(" "):
+            times[""] += int(cumulative)
+    return times
+
+
+def best_import_times(module: str, repeat: int) -> Dict[str, int]:
+    runs = [import_times(module) for _ in range(repeat)]
+    return min(runs, key=lambda times: times[""])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--modules",
+        type=lambda value: [module for module in value.split(",") if module],
+        default=REFERENCE + MODULES,
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'module':<36} {'total ms':>9} {'pulumi ms':>10} {'gcp ms':>8}")
+    failed = []
+    for module in args.modules:
+        times = best_import_times(module, args.repeat)
+        print(
+            f"{module:<36} {times[''] / 1000:9.1f} "
+            + " ".join(
+                f"{times.get(tracked, 0) / 1000:{width}.1f}"
+                for tracked, width in zip(TRACKED, (10, 8))
+            )
+        )
+        if module in MODULES and "pulumi_gcp" in times:
+            failed.append(module)
+
+    for module in failed:
+        print(f"REGRESSION {module} imports pulumi_gcp", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
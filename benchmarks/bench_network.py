@@ -0,0 +1,342 @@
+"""Benchmark component construction under ``pulumi.runtime.Mocks``.
+
+Every scenario builds one component from synthetic inputs and waits for the
+mocked engine to register all of its resources. Wall time is measured in a
+first pass, peak memory with tracemalloc in a second one (tracemalloc slows
+allocation heavy code down too much to time both at once).
+
+    python -m benchmarks.bench_network                      # compare to baseline
+    python -m benchmarks.bench_network --sizes 10000,50000  # large stacks
+    python -m benchmarks.bench_network --update             # rewrite baseline
+
+The exit code is 1 when a result regressed past the tolerances.
+
+With ``--latency`` every registration takes that long, like a provider call
+does, and ``--parallel`` bounds the registrations in flight like ``pulumi up
+--parallel``. The resources of a component wait for the outputs they use
+only, ``max_in_flight`` shows how far they fan out. Compare the wall time to
+a ``--parallel 1`` run for the speedup of the graph, these runs are not
+compared to the baseline.
+
+    python -m benchmarks.bench_network --components Network --sizes 100 \
+        --latency 0.05 --parallel 32 --no-memory --repeat 1
+
+``--wave-size`` paces Network with a RegistrationScheduler, its report is
+logged once all resources are created.
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pulumi
+
+from .inputs import (
+    make_firewall_rules,
+    make_routes,
+    make_secondary_ranges,
+    make_subnets,
+)
+
+DEFAULT_SIZES = [10, 100, 1000]
+ALL_SIZES = [10, 100, 1000, 10000, 50000]
+BASELINE = Path(__file__).with_name("baseline.json")
+
+
+class CountingMocks(pulumi.runtime.Mocks):
+    def __init__(self):
+        self.registered: Dict[str, int] = {}
+        # seconds every registration takes
+        self.latency = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        self.registered.clear()
+        self.max_in_flight = 0
+
+    def new_resource(self, args: pulumi.runtime.MockResourceArgs):
+        # registrations run on the threads of the event loop's executor
+        with self._lock:
+            self.registered[args.typ] = self.registered.get(args.typ, 0) + 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+        return [args.name + "_id", args.inputs]
+
+    def call(self, args: pulumi.runtime.MockCallArgs):
+        return {}
+
+
+MOCKS = CountingMocks()
+pulumi.runtime.set_mocks(MOCKS, preview=False)
+
+# It's important to import _after_ the mocks are defined.
+from pulumi_gcp_network.firewall_rules import FirewallRules  # noqa isort:skip
+from pulumi_gcp_network.network import Network  # noqa isort:skip
+from pulumi_gcp_network.routes import Routes  # noqa isort:skip
+from pulumi_gcp_network.scheduling import RegistrationScheduler  # noqa isort:skip
+from pulumi_gcp_network.subnets import Subnets  # noqa isort:skip
+from pulumi_gcp_network.vpc import Vpc  # noqa isort:skip
+
+Scenario = Callable[[str, int], Callable[[], Any]]
+
+# creates in flight at once of the Network scenario, unpaced when None
+WAVE_SIZE: Optional[int] = None
+
+
+def _vpc(name: str, size: int) -> Callable[[], Any]:
+    return lambda: Vpc(name, project_id="bench", network_name=name)
+
+
+def _subnets(name: str, size: int) -> Callable[[], Any]:
+    subnets, secondary_ranges = make_subnets(size), make_secondary_ranges(size)
+    return lambda: Subnets(
+        name,
+        project_id="bench",
+        network_name=name,
+        subnets=subnets,  # type: ignore
+        secondary_ranges=secondary_ranges,  # type: ignore
+    )
+
+
+def _routes(name: str, size: int) -> Callable[[], Any]:
+    routes = make_routes(size)
+    return lambda: Routes(name, project_id="bench", network_name=name, routes=routes)
+
+
+def _firewall_rules(name: str, size: int) -> Callable[[], Any]:
+    rules = make_firewall_rules(size)
+    return lambda: FirewallRules(
+        name, project_id="bench", network_name=name, rules=rules
+    )
+
+
+def _network(name: str, size: int) -> Callable[[], Any]:
+    subnets, secondary_ranges = make_subnets(size), make_secondary_ranges(size)
+    routes, rules = make_routes(size), make_firewall_rules(size)
+    return lambda: Network(
+        name,
+        project_id="bench",
+        network_name=name,
+        subnets=subnets,  # type: ignore
+        secondary_ranges=secondary_ranges,  # type: ignore
+        routes=routes,
+        firewall_rules=rules,
+        registration_scheduler=(
+            RegistrationScheduler(wave_size=WAVE_SIZE) if WAVE_SIZE else None
+        ),
+    )
+
+
+# Vpc always creates one network, it is measured once at size 1.
+SCENARIOS: Dict[str, Tuple[Scenario, bool]] = {
+    "Vpc": (_vpc, False),
+    "Subnets": (_subnets, True),
+    "Routes": (_routes, True),
+    "FirewallRules": (_firewall_rules, True),
+    "Network": (_network, True),
+}
+
+
+def _run(build: Callable[[], Any]) -> Tuple[float, float]:
+    """Return (construction seconds, total seconds including registration)."""
+    timings: List[float] = []
+
+    @pulumi.runtime.test
+    def construct():
+        start = time.perf_counter()
+        build()
+        timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    construct()
+    return timings[0], time.perf_counter() - start
+
+
+def measure(
+    component: str, size: int, memory: bool = True, repeat: int = 1
+) -> Dict[str, Any]:
+    """Best of ``repeat`` timings, resource count and tracemalloc peak."""
+    scenario, _ = SCENARIOS[component]
+    timings = []
+    for attempt in range(repeat):
+        MOCKS.clear()
+        gc.collect()
+        name = f"bench-{component.lower()}-{size}-{attempt}"
+        timings.append(_run(scenario(name, size)))
+    construct_s, wall_s = min(timings, key=lambda timing: timing[1])
+    resources = sum(MOCKS.registered.values())
+
+    result = {
+        "construct_s": round(construct_s, 6),
+        "wall_s": round(wall_s, 6),
+        "resources": resources,
+        "per_resource_ms": round(wall_s * 1000 / max(resources, 1), 6),
+    }
+    if MOCKS.latency:
+        result["max_in_flight"] = MOCKS.max_in_flight
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        _run(scenario(f"bench-{component.lower()}-{size}-memory", size))
+        result["peak_kib"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+    return result
+
+
+def run(
+    components: List[str], sizes: List[int], memory: bool = True, repeat: int = 1
+) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    results: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for component in components:
+        _, scales = SCENARIOS[component]
+        for size in sizes if scales else [1]:
+            result = measure(component, size, memory, repeat)
+            results.setdefault(component, {})[str(size)] = result
+            print(
+                f"{component:>14} {size:>6}: {result['wall_s']:9.3f}s "
+                f"{result['per_resource_ms']:8.3f}ms/resource "
+                f"{result.get('peak_kib', 0):12.1f}KiB peak",
+                file=sys.stderr,
+            )
+    return results
+
+
+def compare(
+    baseline: Dict[str, Any],
+    results: Dict[str, Dict[str, Dict[str, Any]]],
+    time_tolerance: float,
+    memory_tolerance: float,
+    min_wall_s: float = 0.25,
+) -> List[str]:
+    """Describe every result that got slower or bigger than the baseline allows.
+
+    Runs shorter than ``min_wall_s`` are too noisy to compare timings.
+    """
+    regressions = []
+    for component, sizes in results.items():
+        for size, result in sizes.items():
+            expected = baseline.get("results", {}).get(component, {}).get(size)
+            if not expected:
+                continue
+            for metric, tolerance in (
+                ("per_resource_ms", time_tolerance),
+                ("peak_kib", memory_tolerance),
+            ):
+                if metric not in result or metric not in expected:
+                    continue
+                if metric == "per_resource_ms" and expected["wall_s"] < min_wall_s:
+                    continue
+                if result[metric] > expected[metric] * (1 + tolerance):
+                    regressions.append(
+                        f"{component}[{size}] {metric}: {result[metric]} > "
+                        f"{expected[metric]} (+{tolerance:.0%})"
+                    )
+    return regressions
+
+
+def _parse_list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: [int(size) for size in _parse_list(value)],
+        default=DEFAULT_SIZES,
+        help=f"comma separated input sizes, all of them: {ALL_SIZES}",
+    )
+    parser.add_argument(
+        "--components",
+        type=_parse_list,
+        default=list(SCENARIOS),
+        help="comma separated components to benchmark",
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    parser.add_argument(
+        "--update", action="store_true", help="merge the results into the baseline"
+    )
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc")
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="keep the best of this many timings"
+    )
+    parser.add_argument("--time-tolerance", type=float, default=0.5)
+    parser.add_argument("--memory-tolerance", type=float, default=0.10)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds every registration takes"
+    )
+    parser.add_argument(
+        "--parallel", type=int, help="registrations in flight at most, like pulumi's"
+    )
+    parser.add_argument(
+        "--wave-size", type=int, help="pace Network to this many creates at once"
+    )
+    parser.add_argument(
+        "--min-wall", type=float, default=0.25, help="ignore timings of faster runs"
+    )
+    args = parser.parse_args(argv)
+
+    unknown = set(args.components) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown components: {', '.join(sorted(unknown))}")
+    if args.latency and args.update:
+        parser.error("--latency timings cannot update the baseline")
+
+    global WAVE_SIZE
+    WAVE_SIZE = args.wave_size
+    MOCKS.latency = args.latency
+    if args.parallel:
+        # the mocks run on the event loop they were set up on
+        asyncio.get_event_loop().set_default_executor(ThreadPoolExecutor(args.parallel))
+
+    results = run(
+        args.components, args.sizes, memory=not args.no_memory, repeat=args.repeat
+    )
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+    if args.latency:
+        return 0
+
+    baseline = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+
+    if args.update:
+        merged = baseline.get("results", {})
+        for component, sizes in results.items():
+            merged.setdefault(component, {}).update(sizes)
+        report["results"] = merged
+        args.baseline.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+        return 0
+
+    regressions = compare(
+        baseline, results, args.time_tolerance, args.memory_tolerance, args.min_wall
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""Compare validate_many with the per-item ``Model.validate`` loop.
+
+python -m benchmarks.bench_validation --sizes 1000,20000
+python -m benchmarks.bench_validation --workers 8  # add a process pool run
+python -m benchmarks.bench_validation --cache  # add cold and warm SpecCache runs
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Optional
+
+from pulumi_gcp_network.cache import SpecCache
+from pulumi_gcp_network.firewall_rules import FirewallRulesRuleArgs
+from pulumi_gcp_network.network import Network
+from pulumi_gcp_network.routes import RoutesArgs
+from pulumi_gcp_network.subnets import SubnetsSubnetArgs
+from pulumi_gcp_network.validation import validate_many
+
+from .inputs import (
+    make_firewall_rules,
+    make_routes,
+    make_secondary_ranges,
+    make_subnets,
+)
+
+MODELS = [
+    (FirewallRulesRuleArgs, make_firewall_rules),
+    (RoutesArgs, make_routes),
+    (SubnetsSubnetArgs, make_subnets),
+]
+
+
+def _best(function: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _bench_cache(sizes: List[int], repeat: int) -> None:
+    """Network.validate_inputs without a cache, filling it and reading it.
+
+    ``diff s`` is Network.diff_inputs against the snapshot of the same inputs
+    with one firewall rule changed.
+    """
+    print(
+        f"\n{'inputs':<22} {'size':>6} {'none s':>8} {'cold s':>8} {'warm s':>8} "
+        f"{'diff s':>8}"
+    )
+    for size in sizes:
+        inputs = (
+            make_subnets(size),
+            make_secondary_ranges(size),
+            make_routes(size),
+            make_firewall_rules(size),
+        )
+        uncached = _best(lambda: Network.validate_inputs(*inputs), repeat)
+        with tempfile.TemporaryDirectory() as directory:
+            cold = _best(
+                lambda: Network.validate_inputs(
+                    *inputs, spec_cache=SpecCache(tempfile.mkdtemp(dir=directory))
+                ),
+                repeat,
+            )
+            spec_cache = SpecCache(directory)
+            Network.validate_inputs(*inputs, spec_cache=spec_cache)
+            warm = _best(
+                lambda: Network.validate_inputs(*inputs, spec_cache=spec_cache),
+                repeat,
+            )
+
+            snapshot_path = os.path.join(directory, "snapshot")
+            subnets, secondary_ranges, routes, rules = inputs
+            changed_rules = rules[:-1] + [dict(rules[-1], priority=10)]
+            timings = []
+            for _ in range(repeat):
+                Network.diff_inputs(*inputs, snapshot_path)
+                start = time.perf_counter()
+                Network.diff_inputs(
+                    subnets, secondary_ranges, routes, changed_rules, snapshot_path
+                )
+                timings.append(time.perf_counter() - start)
+            diff = min(timings)
+        print(
+            f"{'Network':<22} {size:>6} {uncached:8.3f} {cold:8.3f} {warm:8.3f} "
+            f"{diff:8.3f}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: [int(size) for size in value.split(",") if size],
+        default=[1000, 20000],
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--workers", type=int, default=0, help="also time a pool of this many processes"
+    )
+    parser.add_argument(
+        "--cache", action="store_true", help="also time Network.validate_inputs"
+    )
+    args = parser.parse_args(argv)
+    executor = ProcessPoolExecutor(args.workers) if args.workers else None
+
+    print(f"{'model':<22} {'size':>6} {'input':<9} {'loop s':>8} {'bulk s':>8} speedup")
+    for model, make_items in MODELS:
+        for size in args.sizes:
+            items = make_items(size)
+            instances = [model.validate(item) for item in items]
+            for label, inputs in (("dicts", items), ("instances", instances)):
+                loop = _best(
+                    lambda: [model.validate(item) for item in inputs], args.repeat
+                )
+                bulk = _best(lambda: validate_many(model, inputs), args.repeat)
+                print(
+                    f"{model.__name__:<22} {size:>6} {label:<9} "
+                    f"{loop:8.3f} {bulk:8.3f} {loop / bulk:6.2f}x"
+                )
+            if executor:
+                loop = _best(lambda: [model.validate(item) for item in items], 1)
+                pool = _best(
+                    lambda: validate_many(model, items, executor=executor),
+                    args.repeat,
+                )
+                print(
+                    f"{model.__name__:<22} {size:>6} {'pool':<9} "
+                    f"{loop:8.3f} {pool:8.3f} {loop / pool:6.2f}x"
+                )
+    if executor:
+        executor.shutdown()
+    if args.cache:
+        _bench_cache(args.sizes, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
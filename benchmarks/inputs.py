@@ -0,0 +1,65 @@
+"""Synthetic inputs for the benchmarks, deterministic for a given size."""
+
+import ipaddress
+from typing import Any, Dict, List
+
+REGIONS = ["us-west1", "us-east1", "europe-west1", "asia-east1"]
+
+
+def _address(base: str, offset: int) -> str:
+    return str(ipaddress.ip_address(base) + offset)
+
+
+def make_subnets(count: int) -> List[Dict[str, Any]]:
+    # /24s carved from 10.0.0.0/8, room for 65536 subnets
+    return [
+        {
+            "subnet_name": f"subnet-{i}",
+            "subnet_ip": f"{_address('10.0.0.0', i * 256)}/24",
+            "subnet_region": REGIONS[i % len(REGIONS)],
+            "subnet_private_access": i % 2 == 0,
+            "subnet_flow_logs": i % 3 == 0,
+        }
+        for i in range(count)
+    ]
+
+
+def make_secondary_ranges(count: int) -> Dict[str, List[Dict[str, Any]]]:
+    # one /26 per subnet carved from 100.64.0.0/10
+    return {
+        f"subnet-{i}": [
+            {
+                "range_name": f"subnet-{i}-pods",
+                "ip_cidr_range": f"{_address('100.64.0.0', i * 64)}/26",
+            }
+        ]
+        for i in range(count)
+    }
+
+
+def make_routes(count: int) -> List[Dict[str, Any]]:
+    # /28s carved from 172.16.0.0/12, alternating between two next hops
+    return [
+        {
+            "name": f"route-{i}",
+            "destination_range": f"{_address('172.16.0.0', i * 16)}/28",
+            "next_hop_ip": f"10.255.255.{i % 2 + 2}",
+            "tags": "bench" if i % 4 == 0 else None,
+            "priority": 1000 + i % 10,
+        }
+        for i in range(count)
+    ]
+
+
+def make_firewall_rules(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "name": f"fw-{i}",
+            "direction": "INGRESS" if i % 5 else "EGRESS",
+            "ranges": [f"{_address('192.0.0.0', i * 8)}/29"],
+            "target_tags": [f"tier-{i % 16}"],
+            "allow": [{"protocol": "tcp", "ports": [str(1024 + i % 4096)]}],
+            "priority": 1000 + i % 100,
+        }
+        for i in range(count)
+    ]
@@ -0,0 +1,406 @@
+"""Compact binary form of a validated :class:`~.spec.NetworkSpec`.
+
+The file is a sequence of 8 byte aligned blocks, each prefixed with its length
+and ``array`` typecode: a JSON header describing the tables, a table of
+interned strings and a few blocks per field of every model. The file is
+memory mapped and each block is copied once, with ``array.frombytes``, on
+its way to a list:
+
+* strings and enums are ids into the string table, so repeated tags, regions
+  or service accounts are stored once;
+* CIDR ranges are packed as address family, prefix length and address, ranges
+  that are not in their canonical form are kept as strings;
+* ints, floats and bools are stored as such, with a null mask when needed;
+* lists are offsets into a flat block of their items;
+* anything else (nested models, ports) is interned JSON.
+
+Integer blocks use the narrowest typecode that holds their values and blocks
+of zeros are left empty. Instances are rebuilt without validation, like the
+JSON form of :meth:`.spec.NetworkSpec.to_dict`, and a file written by another
+version of the library or pydantic is rejected.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple, Type, Union
+
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_LIST, SHAPE_SINGLETON, ModelField
+
+from .cache import gc_paused
+from .cidr import format_cidr, split_cidr
+from .firewall_rules import FirewallRulesRuleArgs
+from .routes import RoutesArgs
+from .spec import Model, NetworkSpec, json_default, spec_digest
+from .subnets import SubnetsSecondaryRangeArgs, SubnetsSubnetArgs
+from .validation import nested_fields
+
+MAGIC = b"PGNSPEC\x00"
+# bump when the layout of the blocks changes
+BINARY_FORMAT = 1
+
+# fields holding CIDR ranges, packed as integers
+CIDR_FIELDS: Dict[Type[BaseModel], Tuple[str, ...]] = {
+    SubnetsSubnetArgs: ("subnet_ip",),
+    SubnetsSecondaryRangeArgs: ("ip_cidr_range",),
+    RoutesArgs: ("destination_range",),
+    FirewallRulesRuleArgs: ("ranges",),
+}
+
+# block length and typecode
+_BLOCK = struct.Struct("<Qc7x")
+# string id of None, interned strings start at 1
+_NONE_ID = 0
+# the bool block stores None as 2
+_NONE_BOOL = 2
+# the CIDR family block holds the IP version, or this for a string id in the
+# fallback block
+_CIDR_STRING = 255
+_MASK_64 = (1 << 64) - 1
+
+
+def _kind(model: Type[BaseModel], name: str, field: ModelField) -> Tuple[str, bool]:
+    """Encoding of the values of a field and whether it holds a list."""
+    is_list = field.shape == SHAPE_LIST
+    if name in CIDR_FIELDS.get(model, ()):
+        return "cidr", is_list
+    if field.shape not in (SHAPE_SINGLETON, SHAPE_LIST) or not isinstance(
+        field.type_, type
+    ):
+        return "json", False
+    if issubclass(field.type_, bool):
+        return "bool", is_list
+    if issubclass(field.type_, str):
+        return "str", is_list
+    if issubclass(field.type_, int):
+        return "int", is_list
+    if issubclass(field.type_, float):
+        return "float", is_list
+    return "json", False
+
+
+def _typecode(values: List[int]) -> str:
+    """Narrowest integer typecode holding every value."""
+    low, high = min(values), max(values)
+    for unsigned, signed in (("B", "b"), ("H", "h"), ("I", "i"), ("Q", "q")):
+        bits = 8 * array(unsigned).itemsize
+        if low >= 0 and high < 1 << bits:
+            return unsigned
+        if -(1 << bits - 1) <= low and high < 1 << bits - 1:
+            return signed
+    raise OverflowError(f"{low}..{high} do not fit in 64 bits")
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.strings: Dict[str, int] = {}
+        self.blocks: List[Tuple[str, bytes]] = []
+
+    def intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return _NONE_ID
+        string_id = self.strings.get(value)
+        if string_id is None:
+            string_id = self.strings[value] = len(self.strings) + 1
+        return string_id
+
+    def add(self, typecode: str, data: Any) -> None:
+        self.blocks.append((typecode, bytes(data)))
+
+    def integers(self, values: List[int]) -> None:
+        if not any(values):
+            self.add("B", b"")
+            return
+        typecode = _typecode(values)
+        self.add(typecode, array(typecode, values))
+
+    def nulls(self, values: List[Any]) -> None:
+        self.integers([value is None for value in values])
+
+    def column(self, kind: str, values: List[Any]) -> None:
+        if kind == "str":
+            # str enums are interned by value
+            self.integers([self.intern(value) for value in values])
+        elif kind == "json":
+            self.integers(
+                [
+                    (
+                        _NONE_ID
+                        if value is None
+                        else self.intern(
+                            json.dumps(
+                                value, separators=(",", ":"), default=json_default
+                            )
+                        )
+                    )
+                    for value in values
+                ]
+            )
+        elif kind == "bool":
+            self.add("B", [_NONE_BOOL if value is None else value for value in values])
+        elif kind == "int":
+            self.nulls(values)
+            self.integers([0 if value is None else value for value in values])
+        elif kind == "float":
+            self.nulls(values)
+            self.add("d", array("d", [value or 0 for value in values]))
+        else:
+            self.cidr_column(values)
+
+    def cidr_column(self, values: List[Optional[str]]) -> None:
+        families = bytearray(len(values))
+        prefixes = bytearray(len(values))
+        high = [0] * len(values)
+        low = [0] * len(values)
+        fallback = [_NONE_ID] * len(values)
+        for i, value in enumerate(values):
+            if value is None:
+                continue
+            parts = split_cidr(value)
+            if parts is None:
+                families[i] = _CIDR_STRING
+                fallback[i] = self.intern(value)
+                continue
+            families[i], prefixes[i], address = parts
+            high[i], low[i] = address >> 64, address & _MASK_64
+        self.add("B", families)
+        self.add("B", prefixes)
+        for block in (high, low, fallback):
+            self.integers(block)
+
+    def table(self, model: Type[BaseModel], instances: List[Any]) -> Dict[str, Any]:
+        names = list(model.__fields__)
+        bits = {name: 1 << i for i, name in enumerate(names)}
+        masks: Dict[FrozenSet[str], int] = {}
+        fields_set = []
+        for instance in instances:
+            names_set = frozenset(instance.__fields_set__)
+            if names_set not in masks:
+                masks[names_set] = sum(bits[name] for name in names_set)
+            fields_set.append(masks[names_set])
+        self.integers(fields_set)
+
+        kinds = []
+        for name, field in model.__fields__.items():
+            kind, is_list = _kind(model, name, field)
+            kinds.append([kind, is_list])
+            values = [instance.__dict__[name] for instance in instances]
+            if is_list:
+                self.nulls(values)
+                offsets = [0]
+                flat: List[Any] = []
+                for value in values:
+                    flat.extend(value or ())
+                    offsets.append(len(flat))
+                self.integers(offsets)
+                values = flat
+            self.column(kind, values)
+        return {"rows": len(instances), "fields": names, "kinds": kinds}
+
+
+def encode_spec(spec: NetworkSpec) -> bytes:
+    writer = _Writer()
+    secondary_ranges = [
+        _range for ranges in spec.secondary_ranges.values() for _range in ranges
+    ]
+    tables = {
+        "subnets": writer.table(SubnetsSubnetArgs, spec.subnets),
+        "secondary_ranges": writer.table(SubnetsSecondaryRangeArgs, secondary_ranges),
+        "routes": writer.table(RoutesArgs, spec.routes),
+        "firewall_rules": writer.table(FirewallRulesRuleArgs, spec.firewall_rules),
+    }
+    writer.integers([writer.intern(name) for name in spec.secondary_ranges])
+    writer.integers([len(ranges) for ranges in spec.secondary_ranges.values()])
+
+    encoded = [string.encode() for string in writer.strings]
+    offsets = [0]
+    for string in encoded:
+        offsets.append(offsets[-1] + len(string))
+    header = {
+        "format": BINARY_FORMAT,
+        "version": spec_digest(),
+        "byteorder": sys.byteorder,
+        "tables": tables,
+        "secondary_range_subnets": len(spec.secondary_ranges),
+    }
+    blocks = [
+        ("B", json.dumps(header).encode()),
+        ("Q", bytes(array("Q", offsets))),
+        ("B", b"".join(encoded)),
+        *writer.blocks,
+    ]
+
+    chunks = [MAGIC]
+    for typecode, block in blocks:
+        chunks.append(_BLOCK.pack(len(block), typecode.encode()))
+        chunks.append(block)
+        chunks.append(bytes(-len(block) % 8))
+    return b"".join(chunks)
+
+
+class _Reader:
+    def __init__(self, view: memoryview):
+        self.view = view
+        self.position = len(MAGIC)
+        self.swap = False
+        self.strings: List[Optional[str]] = [None]
+
+    def block(self) -> Tuple[str, memoryview]:
+        length, typecode = _BLOCK.unpack_from(self.view, self.position)
+        start = self.position + _BLOCK.size
+        self.position = start + length + (-length % 8)
+        return typecode.decode(), self.view[start : start + length]
+
+    def array(self, size: int) -> List[Any]:
+        """Values of the next block, ``size`` zeros if it is empty."""
+        typecode, block = self.block()
+        if not block:
+            return [0] * size
+        values = array(typecode)
+        values.frombytes(block)
+        if self.swap:
+            values.byteswap()
+        return values.tolist()
+
+    def column(self, kind: str, size: int) -> List[Any]:
+        if kind == "str" or kind == "json":
+            return list(map(self.strings.__getitem__, self.array(size)))
+        if kind == "bool":
+            return [
+                None if value == _NONE_BOOL else bool(value)
+                for value in self.array(size)
+            ]
+        if kind == "int" or kind == "float":
+            nulls = self.array(size)
+            values = self.array(size)
+            if any(nulls):
+                return [None if null else value for null, value in zip(nulls, values)]
+            return values
+        return self.cidr_column(size)
+
+    def cidr_column(self, size: int) -> List[Optional[str]]:
+        families = self.array(size)
+        prefixes = self.array(size)
+        high, low, fallback = self.array(size), self.array(size), self.array(size)
+        values: List[Optional[str]] = []
+        for family, prefix, high_bits, low_bits, string_id in zip(
+            families, prefixes, high, low, fallback
+        ):
+            if family == _CIDR_STRING:
+                values.append(self.strings[string_id])
+            else:
+                values.append(format_cidr(family, prefix, high_bits << 64 | low_bits))
+        return values
+
+    def table(self, model: Type[Model], meta: Dict[str, Any]) -> List[Model]:
+        names = list(model.__fields__)
+        if meta["fields"] != names:
+            raise ValueError(f"{model.__name__} fields changed")
+        rows = meta["rows"]
+        masks = self.array(rows)
+
+        rebuilders = dict(nested_fields(model))
+        columns = []
+        column: List[Any]
+        for name, (kind, is_list) in zip(names, meta["kinds"]):
+            if is_list:
+                nulls = self.array(rows)
+                offsets = self.array(rows + 1)
+                flat = self.column(kind, offsets[-1])
+                column = [
+                    None if null else flat[start:end]
+                    for null, start, end in zip(nulls, offsets, offsets[1:])
+                ]
+            else:
+                column = self.column(kind, rows)
+            rebuild = rebuilders.get(name)
+            if rebuild is not None and kind == "json":
+                column = [
+                    None if encoded is None else rebuild(json.loads(encoded))
+                    for encoded in column
+                ]
+            elif rebuild is not None:
+                column = list(map(rebuild, column))
+            columns.append(column)
+
+        set_names: Dict[int, Set[str]] = {}
+        instances = []
+        for mask, row in zip(masks, zip(*columns)):
+            if mask not in set_names:
+                set_names[mask] = {
+                    name for i, name in enumerate(names) if mask >> i & 1
+                }
+            instance = model.__new__(model)
+            object.__setattr__(instance, "__dict__", dict(zip(names, row)))
+            object.__setattr__(instance, "__fields_set__", set(set_names[mask]))
+            if model.__private_attributes__:
+                instance._init_private_attributes()
+            instances.append(instance)
+        return instances
+
+
+def decode_spec(buffer: Any) -> NetworkSpec:
+    """Rebuild a spec from the bytes, memoryview or mmap of :func:`encode_spec`.
+
+    Raises ValueError when the buffer is not a spec of this library version.
+    """
+    with memoryview(buffer) as view:
+        if bytes(view[: len(MAGIC)]) != MAGIC:
+            raise ValueError("Not a binary network spec")
+        reader = _Reader(view)
+        header = json.loads(bytes(reader.block()[1]))
+        if header["format"] != BINARY_FORMAT or header["version"] != spec_digest():
+            raise ValueError("Binary network spec of another version")
+        reader.swap = header["byteorder"] != sys.byteorder
+
+        offsets = reader.array(1)
+        _, blob = reader.block()
+        reader.strings.extend(
+            str(blob[start:end], "utf-8") for start, end in zip(offsets, offsets[1:])
+        )
+        # views into an mmap keep it from being closed
+        blob.release()
+
+        tables = header["tables"]
+        subnets = reader.table(SubnetsSubnetArgs, tables["subnets"])
+        flattened = reader.table(SubnetsSecondaryRangeArgs, tables["secondary_ranges"])
+        routes = reader.table(RoutesArgs, tables["routes"])
+        firewall_rules = reader.table(FirewallRulesRuleArgs, tables["firewall_rules"])
+        subnet_names = reader.column("str", header["secondary_range_subnets"])
+        counts = reader.array(len(subnet_names))
+
+    secondary_ranges: Dict[str, List[SubnetsSecondaryRangeArgs]] = {}
+    ranges = iter(flattened)
+    for subnet_name, count in zip(subnet_names, counts):
+        secondary_ranges[subnet_name] = [next(ranges) for _ in range(count)]
+    return NetworkSpec(subnets, secondary_ranges, routes, firewall_rules)
+
+
+def write_spec(path: Union[str, Path], spec: NetworkSpec) -> None:
+    """Write the binary form of a spec.
+
+    The file is replaced atomically, readers that have the previous one
+    memory mapped keep reading it.
+    """
+    path = Path(path)
+    handle, temporary = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as spec_file:
+            spec_file.write(encode_spec(spec))
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def read_spec(path: Union[str, Path]) -> NetworkSpec:
+    """Decode a file of :func:`write_spec` through a read-only memory map."""
+    with open(path, "rb") as spec_file, gc_paused():
+        with mmap.mmap(spec_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return decode_spec(mapped)
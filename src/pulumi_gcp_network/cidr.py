@@ -0,0 +1,221 @@
+import bisect
+import ipaddress
+import socket
+import struct
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+_IPV4 = struct.Struct(">I")
+
+
+class CidrRange(NamedTuple):
+    owner: str
+    cidr: str
+    version: int
+    start: int
+    end: int
+    prefixlen: int
+
+
+class CidrOverlapError(ValueError):
+    def __init__(self, overlaps: List[Tuple[CidrRange, CidrRange]]):
+        self.overlaps = overlaps
+        details = "; ".join(
+            f"{first.owner} ({first.cidr}) overlaps {second.owner} ({second.cidr})"
+            for first, second in overlaps
+        )
+        super().__init__(f"Overlapping CIDR ranges found: {details}")
+
+
+def parse_cidr(cidr: str, owner: str = "") -> CidrRange:
+    """Encode an IPv4/IPv6 CIDR as an inclusive integer interval."""
+    network = ipaddress.ip_network(cidr, strict=False)
+    start = int(network.network_address)
+    return CidrRange(
+        owner=owner,
+        cidr=str(network),
+        version=network.version,
+        start=start,
+        end=start + network.num_addresses - 1,
+        prefixlen=network.prefixlen,
+    )
+
+
+def _sort_key(cidr_range: CidrRange) -> Tuple[int, int, int]:
+    # supernets sort before the ranges nested in them
+    return cidr_range.version, cidr_range.start, -cidr_range.end
+
+
+def split_cidr(cidr: str) -> Optional[Tuple[int, int, int]]:
+    """(version, prefix length, address) of a CIDR range in canonical form.
+
+    Returns None for anything :func:`format_cidr` would not give back as is,
+    e.g. ``10.1/16``, ``10.0.0.1/8`` or upper case IPv6 ranges.
+    """
+    address, _, prefix = cidr.partition("/")
+    if not prefix.isdigit() or str(int(prefix)) != prefix:
+        return None
+    prefixlen = int(prefix)
+    try:
+        packed = socket.inet_aton(address)
+    except OSError:
+        packed = None
+    if packed is not None:
+        # inet_aton also accepts shorthands such as 10.1
+        start = _IPV4.unpack(packed)[0]
+        if (
+            socket.inet_ntoa(packed) != address
+            or prefixlen > 32
+            or start & (1 << 32 - prefixlen) - 1
+        ):
+            return None
+        return 4, prefixlen, start
+    try:
+        network = ipaddress.IPv6Network(cidr)
+    except ValueError:
+        return None
+    if str(network) != cidr:
+        return None
+    return 6, prefixlen, int(network.network_address)
+
+
+def format_cidr(version: int, prefixlen: int, address: int) -> str:
+    if version == 4:
+        return f"{socket.inet_ntoa(_IPV4.pack(address))}/{prefixlen}"
+    return f"{ipaddress.IPv6Address(address)}/{prefixlen}"
+
+
+def pack_cidr(cidr: str) -> Union[int, str]:
+    """One int holding a canonical CIDR range, other strings are kept as they are.
+
+    The int is smaller than the string and :func:`unpack_cidr` turns it back
+    into the same string.
+    """
+    parts = split_cidr(cidr)
+    if parts is None:
+        return cidr
+    version, prefixlen, address = parts
+    return (address << 1 | (version == 6)) << 8 | prefixlen
+
+
+def unpack_cidr(packed: Union[int, str]) -> str:
+    if isinstance(packed, str):
+        return packed
+    address = packed >> 9
+    return format_cidr(6 if packed >> 8 & 1 else 4, packed & 0xFF, address)
+
+
+class CidrIndex:
+    """Sorted interval index over integer encoded CIDR ranges.
+
+    CIDR blocks are either disjoint or nested, so a list sorted by
+    ``(version, start, -end)`` is enough to find every overlap in a single
+    sweep and to answer range queries with a binary search.
+
+    The ranges given to the constructor are sorted once, O(n log n). ``add``
+    and ``remove`` keep the list sorted, each costs a binary search plus an
+    O(n) shift of the lists, cheap for the index of one network but not a way
+    to build a large index.
+    """
+
+    def __init__(self, ranges: Iterable[Tuple[str, str]] = ()):
+        # a stable sort keeps equal ranges in the order they were given
+        self._ranges: List[CidrRange] = sorted(
+            (parse_cidr(cidr, owner) for owner, cidr in ranges), key=_sort_key
+        )
+        self._keys: List[Tuple[int, int, int]] = [
+            _sort_key(cidr_range) for cidr_range in self._ranges
+        ]
+        self._by_prefix: Dict[Tuple[int, int, int], List[CidrRange]] = {}
+        for cidr_range in self._ranges:
+            self._by_prefix.setdefault(
+                (cidr_range.version, cidr_range.start, cidr_range.prefixlen), []
+            ).append(cidr_range)
+
+    def __len__(self) -> int:
+        return len(self._ranges)
+
+    def __iter__(self) -> Iterator[CidrRange]:
+        return iter(self._ranges)
+
+    def add(self, cidr: str, owner: str = "") -> CidrRange:
+        cidr_range = parse_cidr(cidr, owner)
+        key = _sort_key(cidr_range)
+        position = bisect.bisect_right(self._keys, key)
+        self._keys.insert(position, key)
+        self._ranges.insert(position, cidr_range)
+        self._by_prefix.setdefault(
+            (cidr_range.version, cidr_range.start, cidr_range.prefixlen), []
+        ).append(cidr_range)
+        return cidr_range
+
+    def remove(self, cidr: str, owner: str = "") -> CidrRange:
+        """Remove the range ``cidr`` added for ``owner``, KeyError if there is none."""
+        query = parse_cidr(cidr, owner)
+        key = _sort_key(query)
+        position = bisect.bisect_left(self._keys, key)
+        while position < len(self._keys) and self._keys[position] == key:
+            cidr_range = self._ranges[position]
+            if cidr_range.owner == owner:
+                del self._keys[position]
+                del self._ranges[position]
+                prefix = (query.version, query.start, query.prefixlen)
+                self._by_prefix[prefix].remove(cidr_range)
+                if not self._by_prefix[prefix]:
+                    del self._by_prefix[prefix]
+                return cidr_range
+            position += 1
+        raise KeyError(f"{cidr} of {owner!r}")
+
+    def find_overlaps(self) -> List[Tuple[CidrRange, CidrRange]]:
+        """Return one ``(earlier, later)`` pair for every overlapping range."""
+        overlaps = []
+        widest: Optional[CidrRange] = None
+        for cidr_range in self._ranges:
+            if (
+                widest is not None
+                and widest.version == cidr_range.version
+                and cidr_range.start <= widest.end
+            ):
+                overlaps.append((widest, cidr_range))
+                if cidr_range.end <= widest.end:
+                    continue
+            widest = cidr_range
+        return overlaps
+
+    def check(self) -> None:
+        overlaps = self.find_overlaps()
+        if overlaps:
+            raise CidrOverlapError(overlaps)
+
+    def containing(self, cidr: str) -> List[CidrRange]:
+        """Return all indexed ranges equal to ``cidr`` or a supernet of it."""
+        query = parse_cidr(cidr)
+        found = self._supernets(query)
+        found.extend(
+            self._by_prefix.get((query.version, query.start, query.prefixlen), [])
+        )
+        return found
+
+    def _supernets(self, query: CidrRange) -> List[CidrRange]:
+        # Ranges containing the query are one of its (at most 128) supernets.
+        found = []
+        max_prefixlen = 32 if query.version == 4 else 128
+        for prefixlen in range(query.prefixlen):
+            start = query.start & ~((1 << (max_prefixlen - prefixlen)) - 1)
+            found.extend(self._by_prefix.get((query.version, start, prefixlen), []))
+        return found
+
+    def overlapping(self, cidr: str) -> List[CidrRange]:
+        """Return all indexed ranges that overlap ``cidr``."""
+        query = parse_cidr(cidr)
+        found = self._supernets(query)
+
+        # Ranges equal to or nested in the query are contiguous in sort order.
+        position = bisect.bisect_left(self._keys, _sort_key(query))
+        while position < len(self._ranges):
+            cidr_range = self._ranges[position]
+            if cidr_range.version != query.version or cidr_range.start > query.end:
+                break
+            found.append(cidr_range)
+            position += 1
+        return found
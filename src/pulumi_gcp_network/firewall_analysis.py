@@ -0,0 +1,316 @@
+import dataclasses
+import ipaddress
+from typing import Any, Dict, Iterator, List, Sequence, Tuple, Union
+
+from .firewall_compaction import (
+    PortRanges,
+    collapse_ranges,
+    normalize_allow_deny,
+    parse_ports,
+)
+from .firewall_rules import FirewallDirectionEnum, FirewallRulesRuleArgs
+from .validation import validate_many
+
+ANY_RANGES = ("0.0.0.0/0", "::/0")
+
+Layer4Spec = Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+
+@dataclasses.dataclass
+class FirewallAnalysis:
+    # rule -> rules evaluated before it that match everything it matches
+    shadowed: Dict[str, List[str]] = dataclasses.field(default_factory=dict)
+    # (rule evaluated first, rule evaluated later) matching common traffic with
+    # opposite allow/deny actions
+    conflicts: List[Tuple[str, str]] = dataclasses.field(default_factory=list)
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _prefixes(cidr: str) -> Iterator[Tuple[int, int, int]]:
+    """Yield the (version, start, prefixlen) keys of a CIDR and its supernets."""
+    network = ipaddress.ip_network(cidr)
+    start = int(network.network_address)
+    for prefixlen in range(network.prefixlen, -1, -1):
+        host_bits = network.max_prefixlen - prefixlen
+        yield network.version, start >> host_bits << host_bits, prefixlen
+
+
+class CidrMasks:
+    """Bitmasks of the rules whose range sets contain or overlap a CIDR."""
+
+    def __init__(self, range_sets: List[List[str]]):
+        self.exact: Dict[Tuple[int, int, int], int] = {}
+        self.nested: Dict[Tuple[int, int, int], int] = {}
+        for i, cidrs in enumerate(range_sets):
+            bit = 1 << i
+            for cidr in cidrs:
+                prefixes = _prefixes(cidr)
+                key = next(prefixes)
+                self.exact[key] = self.exact.get(key, 0) | bit
+                self.nested[key] = self.nested.get(key, 0) | bit
+                for key in prefixes:
+                    self.nested[key] = self.nested.get(key, 0) | bit
+
+    def containing(self, cidr: str) -> int:
+        mask = 0
+        for key in _prefixes(cidr):
+            mask |= self.exact.get(key, 0)
+        return mask
+
+    def overlapping(self, cidr: str) -> int:
+        key = next(_prefixes(cidr))
+        return self.containing(cidr) | self.nested.get(key, 0)
+
+
+def _ports_cover(outer: PortRanges, inner: PortRanges) -> bool:
+    if outer is None:
+        return True
+    if inner is None:
+        return False
+    return all(
+        any(low <= inner_low and inner_high <= high for low, high in outer)
+        for inner_low, inner_high in inner
+    )
+
+
+def _ports_overlap(first: PortRanges, second: PortRanges) -> bool:
+    if first is None or second is None:
+        return True
+    return any(
+        low <= other_high and other_low <= high
+        for low, high in first
+        for other_low, other_high in second
+    )
+
+
+def _parse_layer4(spec: Layer4Spec) -> Dict[str, PortRanges]:
+    return {protocol: parse_ports(list(ports)) for protocol, ports in spec}
+
+
+def _layer4_covers(outer: Dict[str, PortRanges], inner: Dict[str, PortRanges]) -> bool:
+    if "all" in outer:
+        return True
+    if "all" in inner:
+        return False
+    return all(
+        protocol in outer and _ports_cover(outer[protocol], ports)
+        for protocol, ports in inner.items()
+    )
+
+
+def _layer4_overlaps(
+    first: Dict[str, PortRanges], second: Dict[str, PortRanges]
+) -> bool:
+    if "all" in first or "all" in second:
+        return True
+    return any(
+        protocol in second and _ports_overlap(ports, second[protocol])
+        for protocol, ports in first.items()
+    )
+
+
+def tag_masks(values: Sequence[Sequence[str]]) -> Dict[str, int]:
+    """Bitmask of the positions of the tag lists holding each tag."""
+    masks: Dict[str, int] = {}
+    for i, tags in enumerate(values):
+        for tag in tags:
+            masks[tag] = masks.get(tag, 0) | (1 << i)
+    return masks
+
+
+def _subset_mask(masks: Dict[str, int], tags: Sequence[str], everything: int) -> int:
+    """Rules whose tag list contains every one of ``tags``."""
+    mask = everything
+    for tag in tags:
+        mask &= masks.get(tag, 0)
+    return mask
+
+
+def _any_mask(masks: Dict[str, int], tags: Sequence[str]) -> int:
+    mask = 0
+    for tag in tags:
+        mask |= masks.get(tag, 0)
+    return mask
+
+
+class _MatchMasks:
+    """Per dimension bitmasks of the rules covering or overlapping each rule."""
+
+    def __init__(self, rules: List[FirewallRulesRuleArgs]):
+        count = len(rules)
+        self.everything = (1 << count) - 1
+
+        is_ingress = [rule.direction == FirewallDirectionEnum.INGRESS for rule in rules]
+        self.ingress_mask = _bits(is_ingress)
+        self.source_tags = [
+            (rule.source_tags or []) if is_ingress[i] else []
+            for i, rule in enumerate(rules)
+        ]
+        self.source_accounts = [
+            (rule.source_service_accounts or []) if is_ingress[i] else []
+            for i, rule in enumerate(rules)
+        ]
+        self.target_tags = [rule.target_tags or [] for rule in rules]
+        self.target_accounts = [rule.target_service_accounts or [] for rule in rules]
+
+        # Ranges are the source of ingress and the destination of egress rules.
+        # Without ranges a rule matches any address, unless it is an ingress
+        # rule that only matches source tags or service accounts.
+        self.range_sets: List[List[str]] = []
+        for i, rule in enumerate(rules):
+            if rule.ranges:
+                self.range_sets.append(collapse_ranges(rule.ranges))
+            elif self.source_tags[i] or self.source_accounts[i]:
+                self.range_sets.append([])
+            else:
+                self.range_sets.append(list(ANY_RANGES))
+        self.cidr_masks = CidrMasks(self.range_sets)
+        self.any_source_mask = self.cidr_masks.containing(ANY_RANGES[0])
+
+        self.source_tag_masks = tag_masks(self.source_tags)
+        self.source_account_masks = tag_masks(self.source_accounts)
+        self.tagged_sources_mask = _bits(
+            [
+                bool(tags or accounts)
+                for tags, accounts in zip(self.source_tags, self.source_accounts)
+            ]
+        )
+
+        self.target_tag_masks = tag_masks(self.target_tags)
+        self.target_account_masks = tag_masks(self.target_accounts)
+        self.all_targets_mask = _bits(
+            [
+                not tags and not accounts
+                for tags, accounts in zip(self.target_tags, self.target_accounts)
+            ]
+        )
+
+        self.layer4_specs = [
+            normalize_allow_deny(rule.deny or rule.allow) or (("all", ()),)
+            for rule in rules
+        ]
+        self.layer4_covers, self.layer4_overlaps = self._layer4_masks()
+
+    def _layer4_masks(self) -> Tuple[Dict[Layer4Spec, int], Dict[Layer4Spec, int]]:
+        # Protocol and port specs repeat a lot, compare the distinct ones only.
+        spec_rules: Dict[Layer4Spec, int] = {}
+        for i, spec in enumerate(self.layer4_specs):
+            spec_rules[spec] = spec_rules.get(spec, 0) | (1 << i)
+        parsed = {spec: _parse_layer4(spec) for spec in spec_rules}
+
+        covers: Dict[Layer4Spec, int] = {}
+        overlaps: Dict[Layer4Spec, int] = {}
+        for spec, inner in parsed.items():
+            covers[spec] = overlaps[spec] = 0
+            for other, outer in parsed.items():
+                if _layer4_covers(outer, inner):
+                    covers[spec] |= spec_rules[other]
+                if _layer4_overlaps(outer, inner):
+                    overlaps[spec] |= spec_rules[other]
+        return covers, overlaps
+
+    def direction(self, j: int) -> int:
+        if self.ingress_mask >> j & 1:
+            return self.ingress_mask
+        return self.everything & ~self.ingress_mask
+
+    def layer4(self, j: int) -> Tuple[int, int]:
+        spec = self.layer4_specs[j]
+        return self.layer4_covers[spec], self.layer4_overlaps[spec]
+
+    def sources(self, j: int) -> Tuple[int, int]:
+        covers, overlaps = self.everything, 0
+        for cidr in self.range_sets[j]:
+            covers &= self.cidr_masks.containing(cidr)
+            overlaps |= self.cidr_masks.overlapping(cidr)
+        if ANY_RANGES[0] in self.range_sets[j]:
+            overlaps |= self.tagged_sources_mask
+
+        # tagged instances are covered by tags or by an any-address rule
+        for tags, masks in (
+            (self.source_tags[j], self.source_tag_masks),
+            (self.source_accounts[j], self.source_account_masks),
+        ):
+            if tags:
+                covers &= (
+                    _subset_mask(masks, tags, self.everything) | self.any_source_mask
+                )
+                overlaps |= _any_mask(masks, tags) | self.any_source_mask
+        return covers, overlaps
+
+    def targets(self, j: int) -> Tuple[int, int]:
+        if not self.target_tags[j] and not self.target_accounts[j]:
+            return self.all_targets_mask, self.everything
+
+        covers = overlaps = self.all_targets_mask
+        for tags, masks in (
+            (self.target_tags[j], self.target_tag_masks),
+            (self.target_accounts[j], self.target_account_masks),
+        ):
+            if tags:
+                covers |= _subset_mask(masks, tags, self.everything)
+                overlaps |= _any_mask(masks, tags)
+        return covers, overlaps
+
+
+def _bits(flags: List[bool]) -> int:
+    return int("".join("1" if flag else "0" for flag in reversed(flags)) or "0", 2)
+
+
+def analyze_firewall_rules(
+    rules: List[Union[Dict[str, Any], FirewallRulesRuleArgs]],
+) -> FirewallAnalysis:
+    """Find shadowed and conflicting firewall rules.
+
+    Every match dimension (direction, ranges, source tags and service
+    accounts, targets, protocols and ports) is turned into bitmasks over all
+    rules, so the pairwise containment and overlap tests run as a handful of
+    big integer AND/OR operations per rule instead of a Python loop over
+    every pair. Network tags and service accounts are treated as independent,
+    a rule on tag ``web`` never covers a rule on a service account.
+    """
+    validated = validate_many(FirewallRulesRuleArgs, rules, "rules")
+    masks = _MatchMasks(validated)
+    is_deny = [bool(rule.deny) for rule in validated]
+    deny_mask = _bits(is_deny)
+
+    # Lower priority values are evaluated first, deny wins priority ties.
+    order = sorted(
+        range(len(validated)),
+        key=lambda i: (validated[i].priority, not is_deny[i], i),
+    )
+    position = {i: n for n, i in enumerate(order)}
+
+    analysis = FirewallAnalysis()
+    evaluated_before = 0
+    for j in order:
+        candidates = evaluated_before & masks.direction(j)
+        evaluated_before |= 1 << j
+        if not candidates:
+            continue
+
+        covers = overlaps = candidates
+        for dimension in (masks.layer4, masks.sources, masks.targets):
+            dimension_covers, dimension_overlaps = dimension(j)
+            covers &= dimension_covers
+            overlaps &= dimension_overlaps
+            if not overlaps:
+                break
+
+        if covers:
+            analysis.shadowed[validated[j].name] = [
+                validated[i].name
+                for i in sorted(iter_bits(covers), key=position.__getitem__)
+            ]
+
+        opposite = (masks.everything & ~deny_mask) if is_deny[j] else deny_mask
+        for i in iter_bits(overlaps & opposite):
+            analysis.conflicts.append((validated[i].name, validated[j].name))
+
+    return analysis
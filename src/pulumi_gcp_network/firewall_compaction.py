@@ -0,0 +1,210 @@
+import dataclasses
+import ipaddress
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple, Union
+
+from .cidr import CidrIndex, parse_cidr
+from .firewall_rules import FirewallRulesAllowDenyArgs, FirewallRulesRuleArgs
+
+PortRanges = Optional[List[Tuple[int, int]]]
+# (protocol, ports) pairs sorted by protocol, see normalize_allow_deny
+NormalizedAllowDeny = Tuple[Tuple[str, Tuple[str, ...]], ...]
+
+
+@dataclasses.dataclass
+class CompactionReport:
+    input_rules: int = 0
+    output_rules: int = 0
+    # name of the kept rule -> names of the rules merged into it
+    merged: Dict[str, List[str]] = dataclasses.field(default_factory=dict)
+    # name of the kept rule -> names of the exact duplicates that were dropped
+    duplicates: Dict[str, List[str]] = dataclasses.field(default_factory=dict)
+    # names of the rules whose port lists were coalesced
+    coalesced_ports: List[str] = dataclasses.field(default_factory=list)
+
+    def summary(self) -> str:
+        return (
+            f"{self.input_rules} firewall rules compacted to {self.output_rules}: "
+            f"{sum(map(len, self.merged.values()))} merged, "
+            f"{sum(map(len, self.duplicates.values()))} duplicates dropped, "
+            f"{len(self.coalesced_ports)} port lists coalesced"
+        )
+
+
+def parse_ports(ports: Union[str, int, Sequence[Union[str, int]]]) -> PortRanges:
+    """Parse firewall ports into sorted, merged intervals (None means all ports)."""
+    port_list: Sequence[Union[str, int]]
+    if isinstance(ports, (str, int)):
+        port_list = [ports]
+    else:
+        port_list = ports
+    if not port_list:
+        return None
+
+    intervals: List[Tuple[int, int]] = []
+    for port in port_list:
+        first, _, last = str(port).strip().partition("-")
+        intervals.append((int(first), int(last or first)))
+    intervals.sort()
+
+    merged = [intervals[0]]
+    for low, high in intervals[1:]:
+        last_low, last_high = merged[-1]
+        if low <= last_high + 1:
+            merged[-1] = (last_low, max(last_high, high))
+        else:
+            merged.append((low, high))
+    return merged
+
+
+def format_ports(intervals: PortRanges) -> List[str]:
+    if intervals is None:
+        return []
+    return [str(low) if low == high else f"{low}-{high}" for low, high in intervals]
+
+
+def normalize_allow_deny(
+    entries: Optional[List[FirewallRulesAllowDenyArgs]],
+) -> NormalizedAllowDeny:
+    """Union the ports of every protocol and return a hashable canonical form."""
+    by_protocol: Dict[str, PortRanges] = {}
+    for entry in entries or []:
+        protocol = entry.protocol.lower()
+        ports = parse_ports(entry.ports)
+        if protocol in by_protocol:
+            current = by_protocol[protocol]
+            if current is None or ports is None:
+                ports = None
+            else:
+                ports = parse_ports(format_ports(current + ports))
+        by_protocol[protocol] = ports
+
+    if "all" in by_protocol:
+        return (("all", ()),)
+    return tuple(
+        (protocol, tuple(format_ports(by_protocol[protocol])))
+        for protocol in sorted(by_protocol)
+    )
+
+
+def collapse_ranges(ranges: Sequence[str]) -> List[str]:
+    networks = [ipaddress.ip_network(cidr, strict=False) for cidr in ranges]
+    ipv4 = [
+        network for network in networks if isinstance(network, ipaddress.IPv4Network)
+    ]
+    ipv6 = [
+        network for network in networks if isinstance(network, ipaddress.IPv6Network)
+    ]
+    collapsed = [str(network) for network in ipaddress.collapse_addresses(ipv4)]
+    collapsed.extend(str(network) for network in ipaddress.collapse_addresses(ipv6))
+    return collapsed
+
+
+def _to_entries(
+    normalized: NormalizedAllowDeny,
+) -> Optional[List[FirewallRulesAllowDenyArgs]]:
+    return [
+        FirewallRulesAllowDenyArgs(protocol=protocol, ports=list(ports))
+        for protocol, ports in normalized
+    ] or None
+
+
+def _merge_key(
+    rule: FirewallRulesRuleArgs,
+    allow: Optional[NormalizedAllowDeny],
+    deny: Optional[NormalizedAllowDeny],
+) -> Tuple[Hashable, ...]:
+    return (
+        rule.direction,
+        rule.priority,
+        frozenset(rule.source_tags or ()),
+        frozenset(rule.source_service_accounts or ()),
+        frozenset(rule.target_tags or ()),
+        frozenset(rule.target_service_accounts or ()),
+        allow,
+        deny,
+        rule.log_config.metadata if rule.log_config else None,
+        # an empty range list matches everything, never merge it with others
+        bool(rule.ranges),
+    )
+
+
+def _is_covered(index: CidrIndex, ranges: List[str]) -> bool:
+    for cidr in ranges:
+        query = parse_cidr(cidr)
+        if not any(
+            found.start <= query.start and query.end <= found.end
+            for found in index.overlapping(cidr)
+        ):
+            return False
+    return True
+
+
+def _ports_changed(
+    entries: Optional[List[FirewallRulesAllowDenyArgs]],
+    normalized: NormalizedAllowDeny,
+) -> bool:
+    original = sum(
+        len(entry.ports) if isinstance(entry.ports, list) else 1
+        for entry in entries or []
+    )
+    return original != sum(len(ports) or 1 for _, ports in normalized)
+
+
+def compact_firewall_rules(
+    rules: List[FirewallRulesRuleArgs], max_ranges: Optional[int] = None
+) -> Tuple[List[FirewallRulesRuleArgs], CompactionReport]:
+    """Merge, dedupe and coalesce firewall rules without changing what they match.
+
+    Rules sharing direction, priority, sources, targets, action and logging are
+    merged into the first of them with the union of their ranges (collapsed
+    into the fewest CIDRs, at most ``max_ranges`` per rule). A rule whose
+    ranges are already covered by such a rule is dropped as a duplicate. Port
+    lists are coalesced into ranges such as ``"80-82"``.
+    """
+    report = CompactionReport(input_rules=len(rules))
+    groups: Dict[Tuple[Hashable, ...], List[int]] = {}
+    compacted: List[Dict[str, Any]] = []
+    indexes: List[CidrIndex] = []
+
+    for rule in rules:
+        allow = normalize_allow_deny(rule.allow) if rule.allow else None
+        deny = normalize_allow_deny(rule.deny) if rule.deny else None
+        if (allow and _ports_changed(rule.allow, allow)) or (
+            deny and _ports_changed(rule.deny, deny)
+        ):
+            report.coalesced_ports.append(rule.name)
+
+        key = _merge_key(rule, allow, deny)
+        ranges = collapse_ranges(rule.ranges)
+
+        absorbed = False
+        for position in groups.get(key, []):
+            kept, index = compacted[position], indexes[position]
+            if _is_covered(index, ranges):
+                report.duplicates.setdefault(kept["name"], []).append(rule.name)
+            elif max_ranges is None or len(index) + len(ranges) <= max_ranges:
+                for cidr in ranges:
+                    index.add(cidr)
+                report.merged.setdefault(kept["name"], []).append(rule.name)
+            else:
+                continue
+            absorbed = True
+            break
+        if absorbed:
+            continue
+
+        values = rule.dict()
+        values.update(
+            allow=_to_entries(allow) if allow else None,
+            deny=_to_entries(deny) if deny else None,
+        )
+        groups.setdefault(key, []).append(len(compacted))
+        compacted.append(values)
+        indexes.append(CidrIndex((rule.name, cidr) for cidr in ranges))
+
+    compacted_rules = []
+    for values, index in zip(compacted, indexes):
+        values["ranges"] = collapse_ranges([cidr_range.cidr for cidr_range in index])
+        compacted_rules.append(FirewallRulesRuleArgs(**values))
+    report.output_rules = len(compacted_rules)
+    return compacted_rules, report
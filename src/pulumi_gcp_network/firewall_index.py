@@ -0,0 +1,172 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from .cidr import CidrIndex
+from .firewall_analysis import ANY_RANGES
+from .firewall_rules import FirewallDirectionEnum, FirewallRulesRuleArgs
+from .records import FirewallRuleRecord
+from .validation import validate_many
+
+Rule = Union[FirewallRulesRuleArgs, FirewallRuleRecord]
+
+# attributes of a rule indexed by value
+FIELDS = (
+    "target_tags",
+    "source_tags",
+    "target_service_accounts",
+    "source_service_accounts",
+)
+
+
+def indexed_ranges(rule: Rule) -> List[str]:
+    """Ranges a rule matches, rules without ranges match any address.
+
+    Unless they are ingress rules matching source tags or service accounts,
+    the same reading as analyze_firewall_rules.
+    """
+    if rule.ranges:
+        return list(rule.ranges)
+    if rule.direction == FirewallDirectionEnum.INGRESS and (
+        rule.source_tags or rule.source_service_accounts
+    ):
+        return []
+    return list(ANY_RANGES)
+
+
+class FirewallRuleIndex:
+    """Firewall rules by name, tag, service account and range.
+
+    Tags and service accounts are looked up in dicts, ranges in a CidrIndex
+    keyed on every prefix of the indexed ranges, so a lookup costs one probe
+    per prefix length instead of a scan of all rules. Rules are added and
+    removed one at a time, found rules are returned in the order they were
+    added. The rules given to the constructor are indexed at once, adding
+    or removing a rule later inserts into (or deletes from) the sorted ranges
+    of the CidrIndex, O(n) per range of the rule.
+    """
+
+    def __init__(self, rules: Iterable[Union[Dict[str, Any], Rule]] = ()):
+        self._rules: Dict[str, Rule] = {}
+        # name -> position the rule was added at, to order the found rules
+        self._order: Dict[str, int] = {}
+        self._added = 0
+        self._by_field: Dict[str, Dict[str, Dict[str, None]]] = {
+            field: {} for field in FIELDS
+        }
+        # rules without target tags and service accounts apply to every instance
+        self._all_targets: Dict[str, None] = {}
+        # replacing a rule moves it to the end, like add does
+        latest: Dict[str, Rule] = {}
+        for rule in rules:
+            validated = self._validate(rule)
+            latest.pop(validated.name, None)
+            latest[validated.name] = validated
+        for validated in latest.values():
+            self._index_fields(validated)
+        self._ranges = CidrIndex(
+            (name, cidr)
+            for name, validated in latest.items()
+            for cidr in indexed_ranges(validated)
+        )
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._rules
+
+    def __iter__(self) -> Iterator[Rule]:
+        return iter(self._rules.values())
+
+    def get(self, name: str) -> Optional[Rule]:
+        return self._rules.get(name)
+
+    def add(self, rule: Union[Dict[str, Any], Rule]) -> Rule:
+        """Index ``rule``, replacing the rule of the same name."""
+        validated = self._validate(rule)
+        if validated.name in self._rules:
+            self.remove(validated.name)
+        self._index_fields(validated)
+        for cidr in indexed_ranges(validated):
+            self._ranges.add(cidr, validated.name)
+        return validated
+
+    @staticmethod
+    def _validate(rule: Union[Dict[str, Any], Rule]) -> Rule:
+        if isinstance(rule, dict):
+            return validate_many(FirewallRulesRuleArgs, [rule], "rules")[0]
+        return rule
+
+    def _index_fields(self, rule: Rule) -> None:
+        """Index everything but the ranges of a rule not indexed yet."""
+        name = rule.name
+        self._rules[name] = rule
+        self._order[name] = self._added
+        self._added += 1
+        for field in FIELDS:
+            by_value = self._by_field[field]
+            for value in getattr(rule, field) or []:
+                by_value.setdefault(value, {})[name] = None
+        if not rule.target_tags and not rule.target_service_accounts:
+            self._all_targets[name] = None
+
+    def remove(self, name: str) -> Rule:
+        """Drop the rule ``name`` from the index, KeyError if there is none."""
+        rule = self._rules.pop(name)
+        del self._order[name]
+        for field in FIELDS:
+            by_value = self._by_field[field]
+            for value in getattr(rule, field) or []:
+                names = by_value[value]
+                names.pop(name, None)
+                if not names:
+                    del by_value[value]
+        self._all_targets.pop(name, None)
+        for cidr in indexed_ranges(rule):
+            self._ranges.remove(cidr, name)
+        return rule
+
+    def _found(self, names: Iterable[str]) -> List[Rule]:
+        return [
+            self._rules[name]
+            for name in sorted(set(names), key=self._order.__getitem__)
+        ]
+
+    def with_target_tag(self, tag: str) -> List[Rule]:
+        return self._found(self._by_field["target_tags"].get(tag, ()))
+
+    def with_source_tag(self, tag: str) -> List[Rule]:
+        return self._found(self._by_field["source_tags"].get(tag, ()))
+
+    def with_target_service_account(self, service_account: str) -> List[Rule]:
+        by_value = self._by_field["target_service_accounts"]
+        return self._found(by_value.get(service_account, ()))
+
+    def with_source_service_account(self, service_account: str) -> List[Rule]:
+        by_value = self._by_field["source_service_accounts"]
+        return self._found(by_value.get(service_account, ()))
+
+    def applying_to(
+        self, tags: Sequence[str] = (), service_account: Optional[str] = None
+    ) -> List[Rule]:
+        """Rules applying to an instance with ``tags`` and ``service_account``.
+
+        Includes the rules without target tags and service accounts.
+        """
+        names = list(self._all_targets)
+        for tag in tags:
+            names.extend(self._by_field["target_tags"].get(tag, ()))
+        if service_account:
+            by_value = self._by_field["target_service_accounts"]
+            names.extend(by_value.get(service_account, ()))
+        return self._found(names)
+
+    def containing(self, cidr: str) -> List[Rule]:
+        """Rules whose ranges contain all of ``cidr``, an address or a range.
+
+        For ingress rules these are the rules admitting the range as source.
+        """
+        return self._found(found.owner for found in self._ranges.containing(cidr))
+
+    def overlapping(self, cidr: str) -> List[Rule]:
+        """Rules whose ranges contain part of ``cidr``."""
+        return self._found(found.owner for found in self._ranges.overlapping(cidr))
@@ -0,0 +1,263 @@
+import bisect
+import ipaddress
+import socket
+import struct
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .cidr import parse_cidr
+from .firewall_analysis import ANY_RANGES, CidrMasks, tag_masks
+from .firewall_compaction import collapse_ranges, normalize_allow_deny, parse_ports
+from .firewall_rules import FirewallDirectionEnum, FirewallRulesRuleArgs
+from .validation import validate_many
+
+# GCP evaluates these after every rule of the network
+IMPLIED_ALLOW_EGRESS = "implied-allow-egress"
+IMPLIED_DENY_INGRESS = "implied-deny-ingress"
+
+# addresses and tag sets whose masks are kept
+CACHE_SIZE = 1 << 16
+
+_IPV4 = struct.Struct(">I")
+MAX_IPV4 = (1 << 32) - 1
+
+PROTOCOL_NUMBERS = {
+    "1": "icmp",
+    "6": "tcp",
+    "17": "udp",
+    "50": "esp",
+    "51": "ah",
+    "132": "sctp",
+}
+
+
+def normalize_protocol(protocol: Union[str, int]) -> str:
+    protocol = str(protocol).lower()
+    return PROTOCOL_NUMBERS.get(protocol, protocol)
+
+
+def parse_address(address: Union[str, int]) -> Tuple[int, int]:
+    """(version, int) of an address, ints are taken as IPv4 addresses."""
+    if isinstance(address, int):
+        if not 0 <= address <= MAX_IPV4:
+            raise ValueError(
+                f"{address} is not an IPv4 address, give IPv6 addresses as strings"
+            )
+        return 4, address
+    try:
+        return 4, _IPV4.unpack(socket.inet_pton(socket.AF_INET, address))[0]
+    except OSError:
+        return 6, int(ipaddress.IPv6Address(address))
+
+
+class FirewallVerdict(NamedTuple):
+    allowed: bool
+    # name of the deciding rule, or one of the implied rules
+    rule: str
+
+
+class _IntervalMasks:
+    """Rules matching ports or addresses, as sorted disjoint intervals."""
+
+    def __init__(self, base: int, ranges: List[Tuple[int, int, int]]):
+        self.base = base
+        events: Dict[int, List[int]] = {}
+        for low, high, bit in ranges:
+            events.setdefault(low, []).append(bit)
+            events.setdefault(high + 1, []).append(-bit)
+        self.starts: List[int] = [0]
+        self.masks: List[int] = [base]
+        mask = 0
+        for start in sorted(events):
+            for bit in events[start]:
+                mask = mask | bit if bit > 0 else mask & ~-bit
+            self.starts.append(start)
+            self.masks.append(base | mask)
+
+    def match(self, value: int) -> int:
+        return self.masks[bisect.bisect_right(self.starts, value) - 1]
+
+
+class FirewallMatcher:
+    """Firewall rules of a network compiled for evaluating single packets.
+
+    Rules are ordered the way GCP evaluates them (lowest priority value
+    first, deny before allow on a tie) and every match dimension is turned
+    into a bitmask over that order. A packet is matched by ANDing one mask
+    per dimension, its lowest set bit is the deciding rule. The masks of
+    addresses, tag sets and ports are cached, so a batch of packets sharing
+    them costs a few integer operations each.
+    """
+
+    def __init__(self, rules: Sequence[Union[Dict[str, Any], FirewallRulesRuleArgs]]):
+        validated = validate_many(FirewallRulesRuleArgs, list(rules), "rules")
+        order = sorted(
+            range(len(validated)),
+            key=lambda i: (validated[i].priority, not validated[i].deny, i),
+        )
+        self.rules: List[FirewallRulesRuleArgs] = [validated[i] for i in order]
+        self.deny_mask = 0
+        self.ingress_mask = 0
+        self.all_targets_mask = 0
+
+        range_sets: List[List[str]] = []
+        source_tags: List[List[str]] = []
+        source_accounts: List[List[str]] = []
+        protocols: Dict[str, List[Tuple[int, int, int]]] = {}
+        any_protocol_mask = 0
+        any_port_masks: Dict[str, int] = {}
+        for i, rule in enumerate(self.rules):
+            bit = 1 << i
+            is_ingress = rule.direction == FirewallDirectionEnum.INGRESS
+            if rule.deny:
+                self.deny_mask |= bit
+            if is_ingress:
+                self.ingress_mask |= bit
+            if not rule.target_tags and not rule.target_service_accounts:
+                self.all_targets_mask |= bit
+
+            source_tags.append((rule.source_tags or []) if is_ingress else [])
+            source_accounts.append(
+                (rule.source_service_accounts or []) if is_ingress else []
+            )
+            # same reading of rules without ranges as analyze_firewall_rules
+            if rule.ranges:
+                range_sets.append(collapse_ranges(rule.ranges))
+            elif source_tags[-1] or source_accounts[-1]:
+                range_sets.append([])
+            else:
+                range_sets.append(list(ANY_RANGES))
+
+            for protocol, ports in normalize_allow_deny(rule.deny or rule.allow) or (
+                ("all", ()),
+            ):
+                protocol = normalize_protocol(protocol)
+                if protocol == "all":
+                    any_protocol_mask |= bit
+                elif not ports:
+                    any_port_masks[protocol] = any_port_masks.get(protocol, 0) | bit
+                else:
+                    protocols.setdefault(protocol, []).extend(
+                        (low, high, bit) for low, high in parse_ports(list(ports)) or []
+                    )
+
+        self._any_protocol_mask = any_protocol_mask
+        self._ports = {
+            protocol: _IntervalMasks(
+                any_protocol_mask | any_port_masks.get(protocol, 0),
+                protocols.get(protocol, []),
+            )
+            for protocol in set(protocols) | set(any_port_masks)
+        }
+        self._ranges = CidrMasks(range_sets)
+        addresses: Dict[int, List[Tuple[int, int, int]]] = {4: [], 6: []}
+        for i, cidrs in enumerate(range_sets):
+            for cidr in cidrs:
+                parsed = parse_cidr(cidr)
+                addresses[parsed.version].append((parsed.start, parsed.end, 1 << i))
+        self._addresses = {
+            version: _IntervalMasks(0, ranges) for version, ranges in addresses.items()
+        }
+        self._source_tags = tag_masks(source_tags)
+        self._source_accounts = tag_masks(source_accounts)
+        self._target_tags = tag_masks([rule.target_tags or [] for rule in self.rules])
+        self._target_accounts = tag_masks(
+            [rule.target_service_accounts or [] for rule in self.rules]
+        )
+        self._range_cache: Dict[Union[str, int], int] = {}
+        self._target_cache: Dict[Tuple[Tuple[str, ...], Optional[str]], int] = {}
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def ranges_mask(self, cidr: Union[str, int]) -> int:
+        """Rules whose ranges contain ``cidr``, an address or a range."""
+        mask = self._range_cache.get(cidr)
+        if mask is None:
+            if len(self._range_cache) >= CACHE_SIZE:
+                self._range_cache.clear()
+            if isinstance(cidr, int) or "/" not in cidr:
+                mask = self.address_mask(cidr)
+            else:
+                mask = self._ranges.containing(cidr)
+            self._range_cache[cidr] = mask
+        return mask
+
+    def address_mask(self, address: Union[str, int]) -> int:
+        """Rules whose ranges contain ``address``, by bisecting its interval."""
+        version, value = parse_address(address)
+        return self._addresses[version].match(value)
+
+    def targets_mask(
+        self, tags: Sequence[str] = (), service_account: Optional[str] = None
+    ) -> int:
+        """Rules applying to an instance with ``tags`` or ``service_account``."""
+        key = (tuple(tags), service_account)
+        mask = self._target_cache.get(key)
+        if mask is None:
+            mask = self.all_targets_mask
+            for tag in tags:
+                mask |= self._target_tags.get(tag, 0)
+            if service_account:
+                mask |= self._target_accounts.get(service_account, 0)
+            if len(self._target_cache) >= CACHE_SIZE:
+                self._target_cache.clear()
+            self._target_cache[key] = mask
+        return mask
+
+    def layer4_mask(self, protocol: Union[str, int], port: Optional[int]) -> int:
+        """Rules matching ``protocol`` on ``port``, None matches all-port rules only."""
+        ports = self._ports.get(normalize_protocol(protocol))
+        if ports is None:
+            return self._any_protocol_mask
+        return ports.base if port is None else ports.match(port)
+
+    def _decide(self, mask: int, default: str) -> FirewallVerdict:
+        if not mask:
+            return FirewallVerdict(default == IMPLIED_ALLOW_EGRESS, default)
+        first = (mask & -mask).bit_length() - 1
+        return FirewallVerdict(not self.deny_mask >> first & 1, self.rules[first].name)
+
+    def egress(
+        self,
+        destination: Union[str, int],
+        protocol: Union[str, int] = "tcp",
+        port: Optional[int] = None,
+        tags: Sequence[str] = (),
+        service_account: Optional[str] = None,
+    ) -> FirewallVerdict:
+        """Decide a packet leaving an instance with ``tags`` or ``service_account``."""
+        mask = (
+            ~self.ingress_mask
+            & self.targets_mask(tags, service_account)
+            & self.layer4_mask(protocol, port)
+            & self.ranges_mask(destination)
+        )
+        return self._decide(mask, IMPLIED_ALLOW_EGRESS)
+
+    def ingress(
+        self,
+        source: Union[str, int],
+        protocol: Union[str, int] = "tcp",
+        port: Optional[int] = None,
+        tags: Sequence[str] = (),
+        service_account: Optional[str] = None,
+        source_tags: Sequence[str] = (),
+        source_service_account: Optional[str] = None,
+    ) -> FirewallVerdict:
+        """Decide a packet from ``source`` arriving at an instance with ``tags``.
+
+        ``source_tags`` and ``source_service_account`` describe the sending
+        instance, when it is one of the network.
+        """
+        sources = self.ranges_mask(source)
+        for tag in source_tags:
+            sources |= self._source_tags.get(tag, 0)
+        if source_service_account:
+            sources |= self._source_accounts.get(source_service_account, 0)
+        mask = (
+            self.ingress_mask
+            & self.targets_mask(tags, service_account)
+            & self.layer4_mask(protocol, port)
+            & sources
+        )
+        return self._decide(mask, IMPLIED_DENY_INGRESS)
@@ -1,12 +1,26 @@
 import dataclasses
 from enum import Enum
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Union
 
 import pulumi
-import pulumi_gcp as gcp
 from pydantic import BaseModel, Field
 
+from .instrumentation import instrumented, span
+from .naming import (
+    ResourceNamingEnum,
+    check_unique_names,
+    root_aliases,
+    stable_resource_name,
+)
+from .records import FirewallRuleRecord
+from .scheduling import RegistrationScheduler
+from .validation import validate_many
+
 if TYPE_CHECKING:
+    import pulumi_gcp as gcp
+
+    from .firewall_index import FirewallRuleIndex
+
     static_check_init_args = dataclasses.dataclass
 else:
 
@@ -29,7 +43,9 @@ class FirewallLogConfigMetadataEnum(str, Enum):
 @static_check_init_args
 class FirewallRulesAllowDenyArgs(BaseModel):
     protocol: str
-    ports: Union[Union[str, int], List[Union[str, int]]]
+    # lists come first, pydantic tries Union members in order and ports are
+    # given as lists far more often than as a single value
+    ports: Union[List[Union[str, int]], str, int]
 
 
 @static_check_init_args
@@ -56,14 +72,53 @@ class FirewallRulesRuleArgs(BaseModel):
 
 
 class FirewallRules(pulumi.ComponentResource):
+    @instrumented("component", "FirewallRules")
     def __init__(
         self,
         resource_name: str,
         project_id: str,
         network_name: str,
         rules: List[Union[Dict[str, Any], FirewallRulesRuleArgs]] = [],
+        resource_naming: ResourceNamingEnum = ResourceNamingEnum.INDEX,
+        compact: bool = False,
+        network: Optional[pulumi.Input[str]] = None,
+        scheduler: Optional[RegistrationScheduler] = None,
         opts: Optional[pulumi.ResourceOptions] = None,
     ):
+        """__init__. # noqa
+
+        :param resource_name: pulumi resource name.
+        :type resource_name: str
+        :param project_id: The ID of the project where the rules will be created.
+        :type project_id: str
+        :param network_name: The name of the network the rules apply to.
+        :type network_name: str
+        :param rules: List of firewall rules.
+        :type rules: List[Union[Dict[str, Any], FirewallRulesRuleArgs]]
+        :param resource_naming: Key resource names on the list position (INDEX) or on the rule name (NAME). Defaults to INDEX
+        :type resource_naming: ResourceNamingEnum
+        :param compact: Merge, dedupe and coalesce the rules first, see compaction_report. Defaults to False
+        :type compact: bool
+        :param network: Self link or id of the network, an output of it makes the rules wait for the network only. Defaults to network_name
+        :type network: Optional[pulumi.Input[str]]
+        :param scheduler: Pace the creates to the API quotas of the project, see scheduling. Defaults to None
+        :type scheduler: Optional[RegistrationScheduler]
+        :param opts: Options for pulumi resource.
+        :type opts: Optional[pulumi.ResourceOptions]
+        """
+        with span("FirewallRulesRuleArgs", "validate"):
+            validated = validate_many(FirewallRulesRuleArgs, rules, "rules")
+
+        self.compaction_report = None
+        if compact:
+            from .firewall_compaction import compact_firewall_rules
+
+            validated, self.compaction_report = compact_firewall_rules(validated)
+            pulumi.log.info(self.compaction_report.summary())
+
+        if resource_naming == ResourceNamingEnum.NAME:
+            check_unique_names([rule.name for rule in validated], "firewall rule")
+
         super().__init__(
             t="zityspace-gcp:network:FirewallRules",
             name=resource_name,
@@ -72,29 +127,87 @@ class FirewallRules(pulumi.ComponentResource):
         )
 
         self.project_id = project_id
+        if network is None:
+            network = network_name
 
-        self.created_firewall_rules = []
-        for i, rule in enumerate(rules):
+        # the validated models are not needed past this point
+        records = [FirewallRuleRecord(rule) for rule in validated]
+        del validated
+        self._records = records
+        self._rule_index: Optional["FirewallRuleIndex"] = None
+
+        self.created_firewall_rules = self.create_firewalls(
+            records, project_id, network, resource_naming, scheduler
+        )
+
+        self.firewall_rules_by_name: Dict[str, "gcp.compute.Firewall"] = {}
+        rule_outputs: Dict[str, Dict[str, Any]] = {}
+        for rule, created in zip(records, self.created_firewall_rules):
+            self.firewall_rules_by_name[rule.name] = created
+            rule_outputs[rule.name] = {
+                "id": created.id,
+                "self_link": created.self_link,
+                "direction": FirewallDirectionEnum(rule.direction).value,
+                "priority": created.priority,
+                "ranges": rule.ranges,
+            }
+        self.registered_outputs: Dict[str, Any] = {"firewall_rules": rule_outputs}
+        self.register_outputs(self.registered_outputs)
+
+    @property
+    def rule_index(self) -> "FirewallRuleIndex":
+        """The rules by tag, service account and range, built when first read."""
+        if self._rule_index is None:
+            from .firewall_index import FirewallRuleIndex
+
+            self._rule_index = FirewallRuleIndex(self._records)
+        return self._rule_index
+
+    def create_firewalls(
+        self,
+        rules: Sequence[Union[FirewallRulesRuleArgs, FirewallRuleRecord]],
+        project_id: str,
+        network: pulumi.Input[str],
+        resource_naming: ResourceNamingEnum,
+        scheduler: Optional[RegistrationScheduler] = None,
+    ) -> List["gcp.compute.Firewall"]:
+        import pulumi_gcp as gcp
 
-            if not isinstance(rule, FirewallRulesRuleArgs):
-                rule = FirewallRulesRuleArgs(**rule)
-
-            _rule = gcp.compute.Firewall(  # type: ignore
-                f"rule-{rule.name}-{i}",
-                name=rule.name,
-                description=rule.description,
-                direction=rule.direction,
-                network=network_name,
-                project=project_id,
-                source_ranges=rule.ranges if rule.direction == "INGRESS" else None,
-                destination_ranges=rule.ranges if rule.direction == "EGRESS" else None,
-                source_tags=rule.source_tags,
-                source_service_accounts=rule.source_service_accounts,
-                target_tags=rule.target_tags,
-                target_service_accounts=rule.target_service_accounts,
-                priority=rule.priority,
-                log_config=rule.log_config,
-                denies=[rule.dict() for rule in rule.deny] if rule.deny else None,
-                allows=[rule.dict() for rule in rule.allow] if rule.allow else None,
+        created_firewall_rules = []
+        for i, rule in enumerate(rules):
+            logical_name, aliases = stable_resource_name(
+                resource_naming, f"rule-{rule.name}-{i}", f"rule-{rule.name}"
             )
-            self.created_firewall_rules.append(_rule)
+
+            with span("gcp.compute.Firewall", "register"):
+                _rule = gcp.compute.Firewall(  # type: ignore
+                    logical_name,
+                    name=rule.name,
+                    description=rule.description,
+                    direction=rule.direction,
+                    network=network,
+                    project=project_id,
+                    source_ranges=(
+                        rule.ranges if rule.direction == "INGRESS" else None
+                    ),
+                    destination_ranges=(
+                        rule.ranges if rule.direction == "EGRESS" else None
+                    ),
+                    source_tags=rule.source_tags,
+                    source_service_accounts=rule.source_service_accounts,
+                    target_tags=rule.target_tags,
+                    target_service_accounts=rule.target_service_accounts,
+                    priority=rule.priority,
+                    log_config=rule.log_config,
+                    denies=[rule.dict() for rule in rule.deny] if rule.deny else None,
+                    allows=[rule.dict() for rule in rule.allow] if rule.allow else None,
+                    opts=pulumi.ResourceOptions(
+                        parent=self,
+                        aliases=root_aliases(aliases),
+                        depends_on=scheduler.depends_on() if scheduler else None,
+                    ),
+                )
+            if scheduler:
+                scheduler.add(_rule)
+            created_firewall_rules.append(_rule)
+        return created_firewall_rules
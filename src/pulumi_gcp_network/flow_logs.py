@@ -0,0 +1,278 @@
+"""Count the firewall rule hits of VPC flow logs exported to JSON lines files.
+
+Each line is a log entry of Cloud Logging, or its ``jsonPayload`` alone. The
+flow of an entry is decided from the side of the instance that reported it:
+entries reported by the source are matched against egress rules, entries
+reported by the destination against ingress rules. Flow logs carry the names
+of the instances but not their network tags or service accounts, those are
+looked up by name in ``instances``.
+
+Files are read one line at a time and only the counts are kept, so memory
+stays flat however large the exports are. The byte offset reached in every
+file is checkpointed, an interrupted run resumes where it stopped and a file
+still being written is read up to its last complete line. The inode and the
+start of every file are checkpointed with it, a file replaced by another
+export under the same name (e.g. by log rotation) is read from its start. A
+checkpoint of other firewall rules is discarded, its hits would be counted
+against the wrong rules.
+"""
+
+import dataclasses
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .cache import READ_ERRORS, read_compressed_json, write_compressed_json
+from .firewall_matcher import (
+    CACHE_SIZE,
+    IMPLIED_ALLOW_EGRESS,
+    IMPLIED_DENY_INGRESS,
+    FirewallMatcher,
+)
+from .flow_replay import Flow, Rules, decide_flow
+from .spec import spec_digest
+
+# lines read between two checkpoints
+CHECKPOINT_LINES = 1 << 20
+# bytes at the start of a file compared to tell a replaced file
+HEAD_BYTES = 4096
+
+# reporter of a flow log -> direction of the rules evaluated on its instance
+REPORTERS = {"SRC": "EGRESS", "DEST": "INGRESS"}
+
+_DECODER = json.JSONDecoder()
+
+# network tags and service account of an instance
+InstanceTargets = Tuple[Sequence[str], Optional[str]]
+
+
+@dataclasses.dataclass
+class FlowLogCheckpoint:
+    # file -> byte offset of its first line not read yet
+    offsets: Dict[str, int] = dataclasses.field(default_factory=dict)
+    # file -> inode and digest of the first HEAD_BYTES bytes read, see _identity
+    identities: Dict[str, str] = dataclasses.field(default_factory=dict)
+    # deciding rule, or implied rule -> flows
+    hits: Dict[str, int] = dataclasses.field(default_factory=dict)
+    flows: int = 0
+    skipped: int = 0
+    # digest of the firewall rules the hits were counted with
+    rules: str = ""
+
+    def save(self, path: Union[str, Path]) -> None:
+        write_compressed_json(Path(path), dataclasses.asdict(self))
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> Optional["FlowLogCheckpoint"]:
+        """Read a checkpoint, None when it is missing or cannot be read."""
+        try:
+            return cls(**read_compressed_json(Path(path)))
+        except READ_ERRORS:
+            return None
+
+
+@dataclasses.dataclass
+class FlowLogReport:
+    flows: int = 0
+    # lines that are not flow logs of an instance
+    skipped: int = 0
+    # name of every rule, and of the implied rules -> flows it decided
+    hits: Dict[str, int] = dataclasses.field(default_factory=dict)
+    # allow rules no flow was decided by, in evaluation order
+    unused: List[str] = dataclasses.field(default_factory=list)
+    # flows that were let through but the rules would deny
+    denied: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"{self.flows} flows read, {self.skipped} lines skipped: "
+            f"{len(self.unused)} allow rules without hits, "
+            f"{self.denied} flows denied by the rules"
+        )
+
+
+def flow_from_log(
+    record: Any, instances: Mapping[str, InstanceTargets] = {}
+) -> Optional[Flow]:
+    """The flow of a flow log entry, None for anything else."""
+    if not isinstance(record, dict):
+        return None
+    payload = record.get("jsonPayload", record)
+    direction = REPORTERS.get(payload.get("reporter"))
+    connection = payload.get("connection")
+    if direction is None or not isinstance(connection, dict):
+        return None
+    instance = payload.get("src_instance" if direction == "EGRESS" else "dest_instance")
+    if not instance:
+        return None
+
+    tags, service_account = instances.get(instance.get("vm_name"), ((), None))
+    source_tags: Sequence[str] = ()
+    source_service_account = None
+    source = payload.get("src_instance")
+    if direction == "INGRESS" and source:
+        # the sending instance is matched by source tags of ingress rules
+        source_tags, source_service_account = instances.get(
+            source.get("vm_name"), ((), None)
+        )
+    return Flow(
+        connection["src_ip"],
+        connection["dest_ip"],
+        str(connection.get("protocol", "")),
+        connection.get("dest_port"),
+        direction,
+        tuple(tags),
+        service_account,
+        tuple(source_tags),
+        source_service_account,
+    )
+
+
+def _identity(inode: int, head: bytes) -> str:
+    return f"{inode}:{hashlib.sha256(head).hexdigest()}"
+
+
+def rules_digest(matcher: FirewallMatcher) -> str:
+    return spec_digest([rule.dict() for rule in matcher.rules])
+
+
+class FlowLogAnalyzer:
+    def __init__(
+        self,
+        rules: Rules,
+        instances: Optional[Mapping[str, InstanceTargets]] = None,
+        checkpoint_path: Optional[Union[str, Path]] = None,
+        checkpoint_lines: int = CHECKPOINT_LINES,
+    ):
+        """Attribute the flows of flow logs to the firewall rules deciding them.
+
+        :param rules: Firewall rules of the network, or their FirewallMatcher.
+        :type rules: Rules
+        :param instances: Network tags and service account by instance name.
+        :type instances: Optional[Mapping[str, InstanceTargets]]
+        :param checkpoint_path: File the progress is saved to and resumed from.
+            A checkpoint saved with other rules is started over.
+        :type checkpoint_path: Optional[Union[str, Path]]
+        :param checkpoint_lines: Lines read between two checkpoints.
+        :type checkpoint_lines: int
+        """
+        if checkpoint_lines < 1:
+            raise ValueError("checkpoint_lines must be at least 1")
+        self.matcher = (
+            rules if isinstance(rules, FirewallMatcher) else FirewallMatcher(rules)
+        )
+        self.instances = instances or {}
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_lines = checkpoint_lines
+        rules_key = rules_digest(self.matcher)
+        checkpoint = None
+        if checkpoint_path is not None:
+            checkpoint = FlowLogCheckpoint.load(checkpoint_path)
+        if checkpoint is None or checkpoint.rules != rules_key:
+            checkpoint = FlowLogCheckpoint(rules=rules_key)
+        self.checkpoint = checkpoint
+        # flow -> name of the deciding rule
+        self._decided: Dict[Flow, str] = {}
+
+    def read(self, paths: Iterable[Union[str, Path]]) -> FlowLogReport:
+        """Read the lines of ``paths`` not read yet and report all hits so far."""
+        for path in paths:
+            self.read_file(path)
+        return self.report()
+
+    def read_file(self, path: Union[str, Path]) -> None:
+        key = os.path.abspath(str(path))
+        offset = self.checkpoint.offsets.get(key, 0)
+        read = 0
+        with open(key, "rb") as lines:
+            stat = os.fstat(lines.fileno())
+            head = lines.read(min(offset, HEAD_BYTES))
+            if offset and (
+                offset > stat.st_size
+                or self.checkpoint.identities.get(key) != _identity(stat.st_ino, head)
+            ):
+                # the file was replaced by a new export
+                offset = 0
+                head = b""
+            lines.seek(offset)
+            for line in lines:
+                if not line.endswith(b"\n"):
+                    # still being written, read again from its start next time
+                    break
+                offset += len(line)
+                if len(head) < HEAD_BYTES:
+                    head += line[: HEAD_BYTES - len(head)]
+                self._count(line)
+                read += 1
+                if read % self.checkpoint_lines == 0:
+                    self._checkpoint_file(key, offset, _identity(stat.st_ino, head))
+        self._checkpoint_file(key, offset, _identity(stat.st_ino, head))
+
+    def _checkpoint_file(self, key: str, offset: int, identity: str) -> None:
+        self.checkpoint.offsets[key] = offset
+        self.checkpoint.identities[key] = identity
+        self.save()
+
+    def _count(self, line: bytes) -> None:
+        checkpoint = self.checkpoint
+        try:
+            flow = flow_from_log(_DECODER.decode(line.decode()), self.instances)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            flow = None
+        if flow is None:
+            if line.strip():
+                checkpoint.skipped += 1
+            return
+
+        rule = self._decided.get(flow)
+        if rule is None:
+            try:
+                rule = decide_flow(self.matcher, flow).rule
+            except (ValueError, TypeError):
+                # addresses or ports that are not ones
+                checkpoint.skipped += 1
+                return
+            if len(self._decided) >= CACHE_SIZE:
+                self._decided.clear()
+            self._decided[flow] = rule
+        checkpoint.hits[rule] = checkpoint.hits.get(rule, 0) + 1
+        checkpoint.flows += 1
+
+    def save(self) -> None:
+        if self.checkpoint_path is not None:
+            self.checkpoint.save(self.checkpoint_path)
+
+    def report(self) -> FlowLogReport:
+        """Hits of the current rules, flow logs only record allowed flows.
+
+        Deny rules are left out of ``unused``: denied traffic never shows up
+        in flow logs, a hit on a deny rule is counted in ``denied`` instead.
+        """
+        hits = self.checkpoint.hits
+        names = [rule.name for rule in self.matcher.rules]
+        names += [IMPLIED_ALLOW_EGRESS, IMPLIED_DENY_INGRESS]
+        deny = {rule.name for rule in self.matcher.rules if rule.deny}
+        deny.add(IMPLIED_DENY_INGRESS)
+        return FlowLogReport(
+            flows=self.checkpoint.flows,
+            skipped=self.checkpoint.skipped,
+            hits={name: hits.get(name, 0) for name in names},
+            unused=[
+                rule.name
+                for rule in self.matcher.rules
+                if not rule.deny and not hits.get(rule.name)
+            ],
+            denied=sum(hits.get(name, 0) for name in deny),
+        )
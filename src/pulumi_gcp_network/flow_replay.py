@@ -0,0 +1,272 @@
+"""Replay flow tables through firewall rules, e.g. to vet a change of the rules.
+
+A flow holds the fields of a packet the firewall rules match on. Flows are
+counted before they are decided, so a table of a week of traffic, where the
+same flows repeat over and over, costs one decision per distinct flow. Each
+decision is a few lookups in the bitmasks of a :class:`FirewallMatcher`.
+
+Flow tables are read from CSV files with a header naming the fields of
+:class:`Flow`, tags separated by ``;``, or given as tuples of those fields,
+e.g. ``zip(*columns)`` of the columns of a captured table. read_flow_counts
+counts the rows of a file before parsing them, which is what makes replaying
+a large capture fast.
+"""
+
+import collections
+import csv
+import dataclasses
+import time
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Counter,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .firewall_matcher import FirewallMatcher, FirewallVerdict
+from .firewall_rules import FirewallRulesRuleArgs
+from .loaders import CSV_LIST_SEPARATOR
+
+Rules = Union[FirewallMatcher, Sequence[Union[Dict[str, Any], FirewallRulesRuleArgs]]]
+# flows, or flows counted by read_flow_counts or count_flows
+Flows = Union[Iterable[Sequence[Any]], Mapping[Any, int]]
+
+
+class Flow(NamedTuple):
+    # addresses, ints are taken as IPv4 addresses
+    source: Union[str, int]
+    destination: Union[str, int]
+    protocol: str = "tcp"
+    # destination port, None for protocols without ports
+    port: Optional[int] = None
+    direction: str = "INGRESS"
+    # of the instance the rules apply to: the destination of an ingress flow,
+    # the source of an egress flow
+    tags: Tuple[str, ...] = ()
+    service_account: Optional[str] = None
+    # of the sending instance of an ingress flow within the network
+    source_tags: Tuple[str, ...] = ()
+    source_service_account: Optional[str] = None
+
+
+class FlowChange(NamedTuple):
+    flow: Flow
+    # times the flow was seen
+    flows: int
+    before: FirewallVerdict
+    after: FirewallVerdict
+
+
+@dataclasses.dataclass
+class ReplayReport:
+    flows: int = 0
+    distinct_flows: int = 0
+    allowed: int = 0
+    denied: int = 0
+    # deciding rule, or implied rule -> flows
+    hits: Dict[str, int] = dataclasses.field(default_factory=dict)
+    seconds: float = 0.0
+
+    @property
+    def per_second(self) -> float:
+        return self.flows / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.flows} flows ({self.distinct_flows} distinct) replayed in "
+            f"{self.seconds:.2f}s: {self.allowed} allowed, {self.denied} denied, "
+            f"{self.per_second:.0f} flows per second"
+        )
+
+
+@dataclasses.dataclass
+class RuleChangeReport:
+    flows: int = 0
+    distinct_flows: int = 0
+    # distinct flows decided differently, most frequent first
+    changed: List[FlowChange] = dataclasses.field(default_factory=list)
+
+    def _count(self, allowed_before: bool, allowed_after: bool) -> int:
+        return sum(
+            change.flows
+            for change in self.changed
+            if change.before.allowed is allowed_before
+            and change.after.allowed is allowed_after
+        )
+
+    @property
+    def newly_allowed(self) -> int:
+        return self._count(False, True)
+
+    @property
+    def newly_denied(self) -> int:
+        return self._count(True, False)
+
+    def summary(self) -> str:
+        changed = sum(change.flows for change in self.changed)
+        other_rule = changed - self.newly_allowed - self.newly_denied
+        return (
+            f"{changed} of {self.flows} flows decided differently: "
+            f"{self.newly_allowed} newly allowed, {self.newly_denied} newly denied, "
+            f"{other_rule} by another rule"
+        )
+
+
+def _matcher(rules: Rules) -> FirewallMatcher:
+    return rules if isinstance(rules, FirewallMatcher) else FirewallMatcher(rules)
+
+
+def decide_flow(matcher: FirewallMatcher, flow: Flow) -> FirewallVerdict:
+    if flow.direction.upper() == "EGRESS":
+        return matcher.egress(
+            flow.destination,
+            flow.protocol,
+            flow.port,
+            flow.tags,
+            flow.service_account,
+        )
+    return matcher.ingress(
+        flow.source,
+        flow.protocol,
+        flow.port,
+        flow.tags,
+        flow.service_account,
+        flow.source_tags,
+        flow.source_service_account,
+    )
+
+
+def count_flows(flows: Flows) -> Counter[Flow]:
+    """Count equal flows, given as Flow or tuples of its fields, or counted."""
+    counts: Mapping[Any, int] = (
+        flows if isinstance(flows, Mapping) else collections.Counter(flows)
+    )
+    return collections.Counter(
+        {
+            flow if isinstance(flow, Flow) else Flow(*flow): count
+            for flow, count in counts.items()
+        }
+    )
+
+
+def replay_flows(rules: Rules, flows: Flows) -> ReplayReport:
+    """Decide ``flows`` with the firewall rules of a network."""
+    start = time.perf_counter()
+    matcher = _matcher(rules)
+    counts = count_flows(flows)
+    report = ReplayReport(distinct_flows=len(counts))
+    hits: Dict[str, int] = {}
+    for flow, count in counts.items():
+        allowed, rule = decide_flow(matcher, flow)
+        if allowed:
+            report.allowed += count
+        else:
+            report.denied += count
+        hits[rule] = hits.get(rule, 0) + count
+    report.flows = report.allowed + report.denied
+    report.hits = dict(sorted(hits.items(), key=lambda item: -item[1]))
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def compare_rules(before: Rules, after: Rules, flows: Flows) -> RuleChangeReport:
+    """Flows the rules ``after`` a change decide differently from the ones ``before``.
+
+    A flow counts as changed when its verdict or the deciding rule changed.
+    """
+    before_matcher = _matcher(before)
+    after_matcher = _matcher(after)
+    counts = count_flows(flows)
+    report = RuleChangeReport(flows=sum(counts.values()), distinct_flows=len(counts))
+    for flow, count in counts.most_common():
+        verdicts = decide_flow(before_matcher, flow), decide_flow(after_matcher, flow)
+        if verdicts[0] != verdicts[1]:
+            report.changed.append(FlowChange(flow, count, *verdicts))
+    return report
+
+
+def _csv_tags(value: str) -> Tuple[str, ...]:
+    return tuple(tag.strip() for tag in value.split(CSV_LIST_SEPARATOR) if tag)
+
+
+# parsers of the CSV cells of the fields that are not strings
+_CSV_FIELDS: Dict[str, Callable[[str], Any]] = {
+    "port": int,
+    "tags": _csv_tags,
+    "source_tags": _csv_tags,
+}
+
+
+class _FlowParser:
+    """Turn the rows of a CSV file with ``header`` into flows."""
+
+    def __init__(self, header: List[str], path: Union[str, Path]):
+        header = [name.strip() for name in header]
+        unknown = set(header) - set(Flow._fields)
+        if unknown:
+            raise ValueError(
+                f"Unknown flow columns in {path}: {', '.join(sorted(unknown))}"
+            )
+        self.columns = [Flow._fields.index(name) for name in header]
+        self.parsers: List[Callable[[str], Any]] = [
+            _CSV_FIELDS.get(name, str) for name in header
+        ]
+        # cells other than addresses repeat, each is parsed once
+        self.caches: List[Optional[Dict[str, Any]]] = [
+            None if name in ("source", "destination") else {} for name in header
+        ]
+        self.defaults: List[Any] = [
+            Flow._field_defaults.get(name) for name in Flow._fields
+        ]
+
+    def __call__(self, row: Sequence[str]) -> Flow:
+        values = list(self.defaults)
+        for column, parse, cache, value in zip(
+            self.columns, self.parsers, self.caches, row
+        ):
+            if not value:
+                continue
+            if cache is None:
+                values[column] = value
+                continue
+            parsed = cache.get(value)
+            if parsed is None:
+                parsed = cache[value] = parse(value)
+            values[column] = parsed
+        return Flow(*values)
+
+
+def read_flows(path: Union[str, Path]) -> Iterator[Flow]:
+    """Read flows from a CSV file, empty cells and missing columns take defaults."""
+    with open(path, newline="", encoding="utf-8-sig") as lines:
+        reader = csv.reader(lines)
+        parse = _FlowParser(next(reader, []), path)
+        for row in reader:
+            if row:
+                yield parse(row)
+
+
+def read_flow_counts(path: Union[str, Path]) -> Counter[Flow]:
+    """Count the flows of a CSV file, parsing each distinct row once.
+
+    Faster than ``count_flows(read_flows(path))`` when rows repeat.
+    """
+    with open(path, newline="", encoding="utf-8-sig") as lines:
+        reader = csv.reader(lines)
+        parse = _FlowParser(next(reader, []), path)
+        rows: Counter[Tuple[str, ...]] = collections.Counter(map(tuple, reader))
+    counts: Counter[Flow] = collections.Counter()
+    for row, count in rows.items():
+        if row:
+            counts[parse(row)] += count
+    return counts
@@ -0,0 +1,237 @@
+"""Opt-in timing of the work done by the components.
+
+Set ``PULUMI_GCP_NETWORK_PROFILE`` to ``1`` (or to the path of the trace file)
+before the program starts, or call :func:`enable`. Spans are recorded for
+pydantic validation, argument conversion, every ``gcp.compute.*`` constructor
+call and each component as a whole. When enabled from the environment a
+summary table is printed to stderr at exit and a Chrome trace (open it with
+chrome://tracing or https://ui.perfetto.dev) is written.
+"""
+
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+ENV_VAR = "PULUMI_GCP_NETWORK_PROFILE"
+DEFAULT_TRACE_PATH = "pulumi-gcp-network-trace.json"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Span(NamedTuple):
+    name: str
+    category: str
+    # seconds since the collector was created
+    start: float
+    duration: float
+    thread_id: int
+
+
+class SpanStats(NamedTuple):
+    category: str
+    name: str
+    calls: int
+    total: float
+    max: float
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls
+
+
+class _RecordingSpan:
+    __slots__ = ("collector", "name", "category", "start")
+
+    def __init__(self, collector: "Collector", name: str, category: str):
+        self.collector = collector
+        self.name = name
+        self.category = category
+
+    def __enter__(self) -> "_RecordingSpan":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        end = time.perf_counter()
+        self.collector.spans.append(
+            Span(
+                self.name,
+                self.category,
+                self.start - self.collector.origin,
+                end - self.start,
+                threading.get_ident(),
+            )
+        )
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Collector:
+    def __init__(self) -> None:
+        self.origin = time.perf_counter()
+        self.spans: List[Span] = []
+
+    def span(self, name: str, category: str = "") -> _RecordingSpan:
+        return _RecordingSpan(self, name, category)
+
+    def stats(self) -> List[SpanStats]:
+        """Aggregate the spans per category and name, largest total first.
+
+        Times are inclusive, a constructor span contains the conversion spans
+        evaluated for its arguments.
+        """
+        totals: Dict[Tuple[str, str], List[float]] = {}
+        for span in self.spans:
+            entry = totals.setdefault((span.category, span.name), [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += span.duration
+            entry[2] = max(entry[2], span.duration)
+        return sorted(
+            (
+                SpanStats(category, name, int(calls), total, longest)
+                for (category, name), (calls, total, longest) in totals.items()
+            ),
+            key=lambda stats: stats.total,
+            reverse=True,
+        )
+
+    def format_summary(self) -> str:
+        rows = [("category", "name", "calls", "total ms", "mean ms", "max ms")]
+        for stats in self.stats():
+            rows.append(
+                (
+                    stats.category,
+                    stats.name,
+                    str(stats.calls),
+                    f"{stats.total * 1000:.3f}",
+                    f"{stats.mean * 1000:.3f}",
+                    f"{stats.max * 1000:.3f}",
+                )
+            )
+        widths = [max(len(row[column]) for row in rows) for column in range(6)]
+        return "\n".join(
+            "  ".join(
+                value.ljust(width) if column < 2 else value.rjust(width)
+                for column, (value, width) in enumerate(zip(row, widths))
+            )
+            for row in rows
+        )
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Spans as complete ("X") events of the Chrome trace event format."""
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": span.start * 1e6,
+                    "dur": span.duration * 1e6,
+                    "pid": pid,
+                    "tid": span.thread_id,
+                }
+                for span in self.spans
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def write_chrome_trace(self, path: str) -> None:
+        with open(path, "w") as trace_file:
+            json.dump(self.chrome_trace(), trace_file)
+
+
+_collector: Optional[Collector] = None
+
+
+def enable() -> Collector:
+    """Start recording spans, returns the active collector."""
+    global _collector
+    if _collector is None:
+        _collector = Collector()
+    return _collector
+
+
+def disable() -> Optional[Collector]:
+    """Stop recording spans, returns the collector that was active."""
+    global _collector
+    collector, _collector = _collector, None
+    return collector
+
+
+def get_collector() -> Optional[Collector]:
+    return _collector
+
+
+def span(name: str, category: str = "") -> Union[_RecordingSpan, _NullSpan]:
+    """Context manager timing a block, free when instrumentation is disabled."""
+    if _collector is None:
+        return _NULL_SPAN
+    return _collector.span(name, category)
+
+
+def instrumented(category: str, name: Optional[str] = None) -> Callable[[F], F]:
+    """Decorator recording a span for every call of the function."""
+
+    def decorator(function: F) -> F:
+        span_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if _collector is None:
+                return function(*args, **kwargs)
+            with _collector.span(span_name, category):
+                return function(*args, **kwargs)
+
+        return wrapper  # type: ignore
+
+    return decorator
+
+
+def _report(collector: Collector, trace_path: str) -> None:
+    print(collector.format_summary(), file=sys.stderr)
+    collector.write_chrome_trace(trace_path)
+    print(f"Chrome trace written to {trace_path}", file=sys.stderr)
+
+
+def configure_from_env(environ: Mapping[str, str] = os.environ) -> Optional[Collector]:
+    """Enable instrumentation and the exit report when ``ENV_VAR`` is set."""
+    value = environ.get(ENV_VAR, "").strip()
+    if not value or value.lower() in ("0", "false", "no"):
+        return None
+    trace_path = DEFAULT_TRACE_PATH
+    if value.lower() not in ("1", "true", "yes"):
+        trace_path = value
+    collector = enable()
+    atexit.register(_report, collector, trace_path)
+    return collector
+
+
+configure_from_env()
@@ -0,0 +1,227 @@
+import heapq
+import ipaddress
+import json
+import math
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple, Union
+
+# GCP keeps the first two and last two addresses of every primary IPv4 range.
+SUBNET_RESERVED_ADDRESSES = 4
+
+
+class IpamError(ValueError):
+    pass
+
+
+def prefix_length_for_hosts(
+    hosts: int, max_prefixlen: int = 32, reserved: int = 0
+) -> int:
+    """Return the longest prefix that fits ``hosts`` usable addresses."""
+    if hosts < 1:
+        raise IpamError(f"Host count must be positive, got {hosts}")
+    return max_prefixlen - math.ceil(math.log2(hosts + reserved))
+
+
+class BuddyAllocator:
+    """Deterministic buddy allocator handing out CIDR blocks of a supernet.
+
+    Free space is kept as one set of free block start addresses per prefix
+    length (plus a heap per prefix length to find the lowest free block), so
+    allocation and release are O(log n) and the free-space representation
+    stays proportional to the fragmentation rather than to the pool size.
+    Blocks are always taken from the lowest address of the tightest fitting
+    free list, so the same sequence of requests yields the same layout.
+    """
+
+    def __init__(self, supernet: str):
+        self.supernet = ipaddress.ip_network(supernet)
+        self.version = self.supernet.version
+        self.max_prefixlen = self.supernet.max_prefixlen
+        self.start = int(self.supernet.network_address)
+        self.end = self.start + self.supernet.num_addresses - 1
+
+        self._free: Dict[int, Set[int]] = {}
+        self._heaps: Dict[int, List[int]] = {}
+        self._push(self.supernet.prefixlen, self.start)
+
+    def _size(self, prefixlen: int) -> int:
+        return 1 << (self.max_prefixlen - prefixlen)
+
+    def _push(self, prefixlen: int, start: int) -> None:
+        self._free.setdefault(prefixlen, set()).add(start)
+        heapq.heappush(self._heaps.setdefault(prefixlen, []), start)
+
+    def _pop_lowest(self, prefixlen: int) -> int:
+        free = self._free.get(prefixlen)
+        heap = self._heaps.get(prefixlen)
+        while heap:
+            start = heapq.heappop(heap)
+            if start in free:  # type: ignore
+                free.remove(start)  # type: ignore
+                return start
+        return -1
+
+    def _split(self, start: int, from_prefixlen: int, to_prefixlen: int) -> None:
+        """Free the unused buddies when carving ``to_prefixlen`` out of a block."""
+        for prefixlen in range(from_prefixlen + 1, to_prefixlen + 1):
+            self._push(prefixlen, start + self._size(prefixlen))
+
+    def _to_cidr(self, start: int, prefixlen: int) -> str:
+        return str(ipaddress.ip_network((start, prefixlen)))
+
+    def _parse(self, cidr: str) -> Tuple[int, int]:
+        network = ipaddress.ip_network(cidr, strict=False)
+        if network.version != self.version:
+            return -1, -1
+        return int(network.network_address), network.prefixlen
+
+    @property
+    def free_blocks(self) -> int:
+        return sum(len(free) for free in self._free.values())
+
+    def allocate(self, prefixlen: int) -> str:
+        if not self.supernet.prefixlen <= prefixlen <= self.max_prefixlen:
+            raise IpamError(f"Cannot allocate a /{prefixlen} from {self.supernet}")
+
+        for candidate in range(prefixlen, self.supernet.prefixlen - 1, -1):
+            start = self._pop_lowest(candidate)
+            if start >= 0:
+                self._split(start, candidate, prefixlen)
+                return self._to_cidr(start, prefixlen)
+
+        raise IpamError(f"No free /{prefixlen} left in {self.supernet}")
+
+    def reserve(self, cidr: str) -> bool:
+        """Mark an explicitly assigned range as used.
+
+        Returns False when the range lies outside of the supernet.
+        """
+        start, prefixlen = self._parse(cidr)
+        if start < 0:
+            return False
+        if prefixlen < self.supernet.prefixlen:
+            if self.start & ~(self._size(prefixlen) - 1) != start:
+                return False
+            # The range covers the whole supernet.
+            self._free.clear()
+            self._heaps.clear()
+            return True
+        if not self.start <= start <= self.end:
+            return False
+        if self._take(start, prefixlen):
+            return True
+
+        # The range is not inside a single free block, drop the free blocks
+        # nested in it (any overlap with used space is reported elsewhere).
+        end = start + self._size(prefixlen) - 1
+        for level in range(prefixlen + 1, self.max_prefixlen + 1):
+            free = self._free.get(level)
+            if free:
+                free.difference_update(
+                    [block for block in free if start <= block <= end]
+                )
+        return True
+
+    def claim(self, cidr: str, prefixlen: Optional[int] = None) -> bool:
+        """Take ``cidr`` when all of it is free, of ``prefixlen`` when given.
+
+        Unlike :meth:`reserve` nothing is taken otherwise, e.g. for a range
+        allocated by a previous run that is now outside of the supernet or
+        used by an explicit range.
+        """
+        try:
+            start, range_prefixlen = self._parse(cidr)
+        except ValueError:
+            return False
+        if start < 0 or prefixlen not in (None, range_prefixlen):
+            return False
+        if (
+            range_prefixlen < self.supernet.prefixlen
+            or not self.start <= start <= self.end
+            or self._to_cidr(start, range_prefixlen) != cidr
+        ):
+            return False
+        return self._take(start, range_prefixlen)
+
+    def _take(self, start: int, prefixlen: int) -> bool:
+        """Take the range when it lies in a single free block."""
+        for candidate in range(prefixlen, self.supernet.prefixlen - 1, -1):
+            block = start & ~(self._size(candidate) - 1)
+            free = self._free.get(candidate)
+            if free and block in free:
+                free.remove(block)
+                # Free every buddy that is not on the path down to the range.
+                for level in range(candidate + 1, prefixlen + 1):
+                    size = self._size(level)
+                    block_start = start & ~(size - 1)
+                    self._push(level, block_start ^ size)
+                return True
+        return False
+
+    def release(self, cidr: str) -> None:
+        start, prefixlen = self._parse(cidr)
+        while prefixlen > self.supernet.prefixlen:
+            buddy = start ^ self._size(prefixlen)
+            free = self._free.get(prefixlen)
+            if not free or buddy not in free:
+                break
+            free.remove(buddy)
+            start = min(start, buddy)
+            prefixlen -= 1
+        self._push(prefixlen, start)
+
+
+# owner of a range, the pool it is allocated from and its prefix length
+AllocationRequest = Tuple[str, BuddyAllocator, int]
+
+
+def allocate_requests(
+    requests: Sequence[AllocationRequest], previous: Mapping[str, str] = {}
+) -> Dict[str, str]:
+    """Allocate a range per owner, in order, returned in the order of ``requests``.
+
+    The ``previous`` range of an owner is claimed before anything is
+    allocated, so it stays with its owner as long as it is free and of the
+    requested size, wherever the owner moved in the requests.
+    """
+    allocations: Dict[str, str] = {}
+    for owner, pool, prefixlen in requests:
+        cidr = previous.get(owner)
+        if cidr and pool.claim(cidr, prefixlen):
+            allocations[owner] = cidr
+    for owner, pool, prefixlen in requests:
+        if owner not in allocations:
+            allocations[owner] = pool.allocate(prefixlen)
+    return {owner: allocations[owner] for owner, _, _ in requests}
+
+
+def read_allocations(path: Union[str, Path]) -> Dict[str, str]:
+    """Allocations written by :func:`write_allocations`, empty when there are none."""
+    try:
+        with open(path, encoding="utf-8") as allocations_file:
+            allocations = json.load(allocations_file)
+    except FileNotFoundError:
+        return {}
+    if not isinstance(allocations, dict):
+        raise IpamError(f"{path} does not hold a mapping of allocated ranges")
+    return {str(owner): str(cidr) for owner, cidr in allocations.items()}
+
+
+def write_allocations(path: Union[str, Path], allocations: Mapping[str, str]) -> None:
+    """Write allocated ranges as sorted JSON, meant to be kept under version control.
+
+    The file is written next to ``path`` and renamed over it, a failed run
+    never leaves a partial file behind.
+    """
+    path = Path(path)
+    payload = json.dumps(dict(allocations), indent=2, sort_keys=True) + "\n"
+    handle, temporary = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
+    try:
+        with os.fdopen(handle, "w", encoding="utf-8") as temporary_file:
+            temporary_file.write(payload)
+        os.replace(temporary, str(path))
+    except BaseException:
+        os.unlink(temporary)
+        raise
@@ -0,0 +1,231 @@
+"""Stream subnets, secondary ranges, routes and firewall rules from files.
+
+Records are read one at a time from JSON lines (``.jsonl``, ``.ndjson``), CSV
+(``.csv``) or YAML (``.yaml``, ``.yml``) files through a read-only memory map
+and validated in chunks, so a large export is never held as dicts next to the
+models built from it. Errors are raised together once the file is exhausted,
+located by line number.
+
+YAML files hold either a sequence of records or one record per document and
+need PyYAML, installed with the ``yaml`` extra. CSV files have one column per
+field, empty cells are left unset, list fields are separated by ``;`` and
+``allow`` / ``deny`` entries are written ``protocol:port,port``, e.g.
+``tcp:22,443;icmp``. Cells starting with ``[`` or ``{`` are read as JSON.
+Secondary ranges carry the name of their subnet in a ``subnet_name`` field.
+"""
+
+import csv
+import json
+import mmap
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type, TypeVar, Union
+
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_LIST
+
+from .firewall_rules import FirewallRulesAllowDenyArgs, FirewallRulesRuleArgs
+from .routes import RoutesArgs
+from .subnets import SubnetsSecondaryRangeArgs, SubnetsSubnetArgs
+from .validation import DEFAULT_CHUNK_SIZE, InvalidItem, validate_iter
+
+Model = TypeVar("Model", bound=BaseModel)
+
+FORMATS = {
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".csv": "csv",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+}
+
+CSV_LIST_SEPARATOR = ";"
+
+
+def _format(path: Path, format: Optional[str]) -> str:
+    name = FORMATS.get(path.suffix.lower()) if format is None else format
+    if name is None or name not in FORMATS.values():
+        raise ValueError(
+            f"Unknown format of {path}, expected one of "
+            + ", ".join(sorted(set(FORMATS.values())))
+        )
+    return name
+
+
+def _mapped_lines(mapped: Any) -> Iterator[Tuple[int, bytes]]:
+    for number, line in enumerate(iter(mapped.readline, b""), 1):
+        yield number, line
+
+
+def _jsonl_records(mapped: Any) -> Iterator[Tuple[int, Any]]:
+    for number, line in _mapped_lines(mapped):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as error:
+            # the line number of the error is the one of the record
+            record = InvalidItem(
+                f"invalid JSON: {error.msg} at column {error.colno}",
+                "value_error.json",
+            )
+        except ValueError as error:  # not UTF-8, UTF-16 or UTF-32
+            record = InvalidItem(f"invalid JSON: {error}", "value_error.json")
+        yield number, record
+
+
+def _csv_records(mapped: Any) -> Iterator[Tuple[int, Dict[str, str]]]:
+    lines = (line.decode("utf-8-sig") for _, line in _mapped_lines(mapped))
+    reader = csv.DictReader(lines)
+    # line_num is the last line read, records may span several lines
+    start = 2
+    for row in reader:
+        yield start, {name: value for name, value in row.items() if value}
+        start = reader.line_num + 1
+
+
+def _yaml_records(mapped: Any) -> Iterator[Tuple[int, Any]]:
+    try:
+        import yaml
+    except ImportError:  # pragma: no cover
+        raise ImportError(
+            "PyYAML is required to load YAML files, install pulumi-gcp-network[yaml]"
+        ) from None
+
+    loader = yaml.SafeLoader(mapped)
+    try:
+        loader.get_event()  # stream start
+        while not loader.check_event(yaml.StreamEndEvent):
+            loader.get_event()  # document start
+            if loader.check_event(yaml.SequenceStartEvent):
+                # compose one item of the top level sequence at a time
+                loader.get_event()
+                while not loader.check_event(yaml.SequenceEndEvent):
+                    node = loader.compose_node(None, None)
+                    yield node.start_mark.line + 1, loader.construct_document(node)
+                loader.get_event()
+            elif not loader.check_event(yaml.DocumentEndEvent):
+                node = loader.compose_node(None, None)
+                yield node.start_mark.line + 1, loader.construct_document(node)
+            loader.get_event()  # document end
+            loader.anchors = {}
+    finally:
+        loader.dispose()
+
+
+def _csv_list(value: str, item_type: Any) -> List[Any]:
+    items = [item.strip() for item in value.split(CSV_LIST_SEPARATOR)]
+    if item_type is FirewallRulesAllowDenyArgs:
+        entries = []
+        for item in items:
+            protocol, _, ports = item.partition(":")
+            entries.append(
+                {
+                    "protocol": protocol,
+                    "ports": [port.strip() for port in ports.split(",") if port],
+                }
+            )
+        return entries
+    return items
+
+
+def _from_csv(model: Type[BaseModel], record: Any) -> Any:
+    """Turn the string cells of a CSV record into list and nested values."""
+    if not isinstance(record, dict):
+        return record
+    for name, value in record.items():
+        field = model.__fields__.get(name)
+        if field is None:
+            continue
+        if value[:1] in ("[", "{"):
+            try:
+                record[name] = json.loads(value)
+            except ValueError:
+                pass
+            continue
+        if field.shape == SHAPE_LIST:
+            record[name] = _csv_list(value, field.type_)
+    return record
+
+
+def iter_records(
+    path: Union[str, Path], format: Optional[str] = None
+) -> Iterator[Tuple[int, Any]]:
+    """Yield ``(line number, record)`` of every record of a file.
+
+    ``format`` is one of ``jsonl``, ``csv`` and ``yaml``, by default it is
+    guessed from the file suffix.
+    """
+    path = Path(path)
+    format = _format(path, format)
+    with open(path, "rb") as records_file:
+        if not path.stat().st_size:
+            # empty files cannot be memory mapped
+            return
+        with mmap.mmap(records_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if format == "jsonl":
+                yield from _jsonl_records(mapped)
+            elif format == "csv":
+                yield from _csv_records(mapped)
+            else:
+                yield from _yaml_records(mapped)
+
+
+def load_models(
+    model: Type[Model],
+    path: Union[str, Path],
+    format: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    kind: Optional[str] = None,
+) -> Iterator[Model]:
+    """Lazily yield the validated records of a file as ``model`` instances.
+
+    Raises :class:`~pulumi_gcp_network.validation.BulkValidationError` with
+    the errors of every invalid record, located by line, once all valid
+    records were yielded.
+    """
+    path = Path(path)
+    records = iter_records(path, format)
+    if _format(path, format) == "csv":
+        records = ((line, _from_csv(model, record)) for line, record in records)
+    kind = f"{kind or model.__name__} in {path}"
+    return validate_iter(model, records, kind, chunk_size)
+
+
+def load_subnets(
+    path: Union[str, Path], format: Optional[str] = None
+) -> Iterator[SubnetsSubnetArgs]:
+    return load_models(SubnetsSubnetArgs, path, format)
+
+
+def load_routes(
+    path: Union[str, Path], format: Optional[str] = None
+) -> Iterator[RoutesArgs]:
+    return load_models(RoutesArgs, path, format)
+
+
+def load_firewall_rules(
+    path: Union[str, Path], format: Optional[str] = None
+) -> Iterator[FirewallRulesRuleArgs]:
+    return load_models(FirewallRulesRuleArgs, path, format)
+
+
+class _LocatedSecondaryRangeArgs(SubnetsSecondaryRangeArgs):
+    subnet_name: str
+
+
+def load_secondary_ranges(
+    path: Union[str, Path], format: Optional[str] = None
+) -> Dict[str, List[SubnetsSecondaryRangeArgs]]:
+    """Secondary ranges of a file grouped by their ``subnet_name`` field."""
+    by_subnet: Dict[str, List[SubnetsSecondaryRangeArgs]] = {}
+    for located in load_models(
+        _LocatedSecondaryRangeArgs, path, format, kind="SubnetsSecondaryRangeArgs"
+    ):
+        values = dict(located.__dict__)
+        subnet_name = values.pop("subnet_name")
+        by_subnet.setdefault(subnet_name, []).append(
+            SubnetsSecondaryRangeArgs.construct(
+                located.__fields_set__ - {"subnet_name"}, **values
+            )
+        )
+    return by_subnet
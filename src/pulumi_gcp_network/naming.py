@@ -0,0 +1,86 @@
+import dataclasses
+import hashlib
+from enum import Enum
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
+
+import pulumi
+
+if TYPE_CHECKING:  # pragma: no cover
+    static_check_init_args = dataclasses.dataclass
+else:
+
+    def static_check_init_args(cls):
+        return cls
+
+
+@static_check_init_args
+class ResourceNamingEnum(str, Enum):
+    """How the logical names of child resources are derived.
+
+    Switching a stack from INDEX to NAME aliases every resource to the index
+    name of its current position. Deploy the switch with the entries in the
+    order of the last update, no entry added, removed or moved: an entry at
+    another position would take over the state of the entry previously
+    there and be updated in place into it. Change the list in a later
+    update, once the resources carry their NAME names.
+    """
+
+    # logical names carry the position in the input list (legacy behaviour)
+    INDEX = "INDEX"
+    # logical names are keyed on the identity of the entry (rule name, ...)
+    NAME = "NAME"
+
+
+def stable_resource_name(
+    resource_naming: ResourceNamingEnum,
+    index_name: str,
+    key_name: str,
+) -> Tuple[str, Optional[List[pulumi.Alias]]]:
+    """Pick the logical name of a child resource.
+
+    In ``NAME`` mode the resource is aliased to its index based name so that
+    stacks created with ``INDEX`` naming migrate without a replacement, as
+    long as the positions did not change in the same update (see
+    :class:`ResourceNamingEnum`).
+    """
+    if resource_naming == ResourceNamingEnum.INDEX:
+        return index_name, None
+    if key_name == index_name:
+        return key_name, None
+    return key_name, [pulumi.Alias(name=index_name)]
+
+
+def root_aliases(aliases: Optional[List[pulumi.Alias]]) -> List[pulumi.Alias]:
+    """Add the aliases of a resource that was registered without a parent.
+
+    Resources registered at the stack root before they got a parent keep
+    their URN, under their current name as well as under the aliased ones.
+    """
+    aliases = list(aliases or [])
+    return (
+        aliases
+        + [pulumi.Alias(parent=pulumi.ROOT_STACK_RESOURCE)]
+        + [
+            pulumi.Alias(name=alias.name, parent=pulumi.ROOT_STACK_RESOURCE)
+            for alias in aliases
+        ]
+    )
+
+
+def check_unique_names(names: Iterable[str], kind: str) -> None:
+    seen = set()
+    duplicates = []
+    for name in names:
+        if name in seen:
+            duplicates.append(name)
+        seen.add(name)
+    if duplicates:
+        raise ValueError(
+            f"Duplicate {kind} names cannot be used as stable resource names: "
+            + ", ".join(sorted(set(duplicates)))
+        )
+
+
+def digest(*values: object, length: int = 8) -> str:
+    """Short deterministic digest used to key entries without a name."""
+    return hashlib.sha1(repr(values).encode()).hexdigest()[:length]
@@ -1,14 +1,26 @@
-from typing import Any, Dict, List, Optional, Union
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
 
 import pulumi
 
+from .cache import SpecCache
 from .firewall_rules import FirewallRules, FirewallRulesRuleArgs
+from .instrumentation import instrumented
+from .naming import ResourceNamingEnum, root_aliases
 from .routes import Routes, RoutesArgs
+from .scheduling import RegistrationReport, RegistrationScheduler
+from .snapshot import SpecDiff, SpecSnapshot, update_spec
+from .spec import NetworkSpec
 from .subnets import Subnets, SubnetsSecondaryRangeArgs, SubnetsSubnetArgs
+from .validation import DEFAULT_CHUNK_SIZE
 from .vpc import Vpc, VpcRoutingModeEnum
 
 
 class Network(pulumi.ComponentResource):
+    @instrumented("component", "Network")
     def __init__(
         self,
         resource_name: str,
@@ -24,8 +36,44 @@ class Network(pulumi.ComponentResource):
         auto_create_subnetworks: bool = False,
         delete_default_internet_gateway_routes: bool = False,
         mtu: int = 0,
+        check_overlaps: bool = True,
+        supernet: Optional[str] = None,
+        secondary_supernet: Optional[str] = None,
+        subnet_allocations_path: Optional[Union[str, Path]] = None,
+        resource_naming: ResourceNamingEnum = ResourceNamingEnum.INDEX,
+        compact_firewall_rules: bool = False,
+        summarize_routes: bool = False,
+        validation_workers: int = 0,
+        spec_cache: Optional[SpecCache] = None,
+        spec_snapshot: Optional[Union[str, Path]] = None,
+        registration_scheduler: Optional[RegistrationScheduler] = None,
         opts: Optional[pulumi.ResourceOptions] = None,
     ):
+        self.spec = None
+        self.spec_diff = None
+        if spec_snapshot is not None:
+            if spec_cache is not None:
+                raise ValueError("spec_cache and spec_snapshot cannot be combined")
+            self.spec, self.spec_diff = self.diff_inputs(
+                subnets, secondary_ranges, routes, firewall_rules, spec_snapshot
+            )
+            pulumi.log.info(self.spec_diff.summary())
+        elif validation_workers > 0 or spec_cache is not None:
+            self.spec = self.validate_inputs(
+                subnets,
+                secondary_ranges,
+                routes,
+                firewall_rules,
+                workers=validation_workers,
+                spec_cache=spec_cache,
+            )
+
+        if self.spec is not None:
+            subnets = self.spec.subnets
+            secondary_ranges = self.spec.secondary_ranges
+            routes = self.spec.routes  # type: ignore
+            firewall_rules = self.spec.firewall_rules  # type: ignore
+
         super().__init__(
             t="zityspace-gcp:network:Network",
             name=resource_name,
@@ -33,6 +81,9 @@ class Network(pulumi.ComponentResource):
             opts=opts,
         )
 
+        # The components keep the URNs they had at the stack root. Every
+        # resource waits for the outputs it uses only, so subnets, routes and
+        # firewall rules are registered together once the network exists.
         self.vpc = Vpc(
             "vpc",
             project_id=project_id,
@@ -43,6 +94,7 @@ class Network(pulumi.ComponentResource):
             description=description,
             delete_default_internet_gateway_routes=delete_default_internet_gateway_routes,  # noqa
             mtu=mtu,
+            opts=self.child_opts(),
         )
 
         self.subnets = Subnets(
@@ -51,6 +103,14 @@ class Network(pulumi.ComponentResource):
             network_name=network_name,
             subnets=subnets,  # type: ignore
             secondary_ranges=secondary_ranges,
+            check_overlaps=check_overlaps,
+            supernet=supernet,
+            secondary_supernet=secondary_supernet,
+            allocations_path=subnet_allocations_path,
+            resource_naming=resource_naming,
+            network=self.vpc.vpc.self_link,
+            scheduler=registration_scheduler,
+            opts=self.child_opts(),
         )
 
         self.routes = Routes(
@@ -58,6 +118,14 @@ class Network(pulumi.ComponentResource):
             project_id=project_id,
             network_name=network_name,
             routes=routes,
+            module_depends_on=self.subnets.subnetworks_containing(
+                self.get_next_hop_addresses(routes)
+            ),
+            resource_naming=resource_naming,
+            summarize=summarize_routes,
+            network=self.vpc.vpc.self_link,
+            scheduler=registration_scheduler,
+            opts=self.child_opts(),
         )
 
         self.firewall_rules = FirewallRules(
@@ -65,4 +133,131 @@ class Network(pulumi.ComponentResource):
             project_id=project_id,
             network_name=network_name,
             rules=firewall_rules,
+            resource_naming=resource_naming,
+            compact=compact_firewall_rules,
+            network=self.vpc.vpc.self_link,
+            scheduler=registration_scheduler,
+            opts=self.child_opts(),
+        )
+
+        self.registered_outputs = {
+            **self.vpc.registered_outputs,
+            **self.subnets.registered_outputs,
+            **self.routes.registered_outputs,
+            **self.firewall_rules.registered_outputs,
+        }
+        self.register_outputs(self.registered_outputs)
+
+        # Resolves once every resource was created, so never during a preview,
+        # the planned waves are logged instead.
+        self.registration_report: Optional[pulumi.Output[RegistrationReport]] = None
+        if registration_scheduler is not None:
+            self.registration_report = registration_scheduler.report()
+            if pulumi.runtime.is_dry_run():
+                pulumi.log.info(
+                    f"{registration_scheduler.resources} resources planned in waves "
+                    f"of {registration_scheduler.wave_size}"
+                )
+            else:
+                self.registration_report.apply(
+                    lambda report: pulumi.log.info(report.summary())
+                )
+
+    def child_opts(self) -> pulumi.ResourceOptions:
+        return pulumi.ResourceOptions(parent=self, aliases=root_aliases(None))
+
+    @staticmethod
+    def get_next_hop_addresses(
+        routes: List[Union[Dict[str, Any], RoutesArgs]],
+    ) -> Set[str]:
+        """Next hops of the routes that may be addresses in the subnets."""
+        addresses = set()
+        for route in routes:
+            values = route if isinstance(route, dict) else route.__dict__
+            for key in ("next_hop_ip", "next_hop_ilb"):
+                if values.get(key):
+                    addresses.add(values[key])
+        return addresses
+
+    @staticmethod
+    def validate_inputs(
+        subnets: Sequence[Union[Dict[str, Any], SubnetsSubnetArgs]],
+        secondary_ranges: Dict[str, List[SubnetsSecondaryRangeArgs]],
+        routes: List[Union[Dict[str, Any], RoutesArgs]],
+        firewall_rules: List[Union[Dict[str, Any], FirewallRulesRuleArgs]],
+        workers: int = 0,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        spec_cache: Optional[SpecCache] = None,
+    ) -> NetworkSpec:
+        """Validate every input list, reusing a cached spec when there is one.
+
+        With ``workers`` the lists are validated in chunks across a pool of
+        processes. The components take the validated instances as they are,
+        so resources are still registered in this process and in input
+        order. Unpickling the validated models here costs about half as much
+        as validating them, so a pool pays off for large inputs with several
+        workers only.
+
+        The workers are spawned rather than forked: the Pulumi program runs
+        gRPC threads, and forking a threaded process can deadlock the child.
+        Python 3.6 cannot pick the start method of the pool, there the lists
+        are validated in this process.
+        """
+
+        key = None
+        if spec_cache is not None:
+            key = spec_cache.key(subnets, secondary_ranges, routes, firewall_rules)
+            cached = spec_cache.get(key)
+            if cached is not None:
+                return cached
+
+        if workers > 0 and sys.version_info >= (3, 7):
+            with ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                spec = NetworkSpec.validate(
+                    subnets,
+                    secondary_ranges,
+                    routes,
+                    firewall_rules,
+                    executor,
+                    chunk_size,
+                )
+        else:
+            spec = NetworkSpec.validate(
+                subnets, secondary_ranges, routes, firewall_rules
+            )
+
+        if spec_cache is not None and key is not None:
+            spec_cache.put(key, spec)
+        return spec
+
+    @staticmethod
+    def diff_inputs(
+        subnets: Sequence[Union[Dict[str, Any], SubnetsSubnetArgs]],
+        secondary_ranges: Dict[str, List[SubnetsSecondaryRangeArgs]],
+        routes: List[Union[Dict[str, Any], RoutesArgs]],
+        firewall_rules: List[Union[Dict[str, Any], FirewallRulesRuleArgs]],
+        snapshot_path: Union[str, Path],
+    ) -> Tuple[NetworkSpec, SpecDiff]:
+        """Validate the inputs changed since the snapshot at ``snapshot_path``.
+
+        Items are matched by name against the snapshot written by the
+        previous run, only added and changed ones are validated. The snapshot
+        is replaced once the inputs are valid and differ from it, a missing
+        or unreadable one validates everything. A preview leaves the snapshot
+        as it is, the next update diffs against what was last deployed.
+        """
+
+        previous = SpecSnapshot.load(snapshot_path)
+        spec, diff, snapshot = update_spec(
+            previous, subnets, secondary_ranges, routes, firewall_rules
+        )
+        unchanged = (
+            previous is not None
+            and previous.version == snapshot.version
+            and diff.is_empty
         )
+        if not unchanged and not pulumi.runtime.is_dry_run():
+            snapshot.save(snapshot_path)
+        return spec, diff
@@ -0,0 +1,172 @@
+import ipaddress
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from .firewall_matcher import FirewallMatcher, FirewallVerdict
+from .firewall_rules import FirewallRulesRuleArgs
+from .route_table import RouteEntry, RouteTable
+from .routes import RoutesArgs
+from .spec import NetworkSpec
+from .subnets import SubnetsSecondaryRangeArgs, SubnetsSubnetArgs
+from .validation import validate_many, validate_many_by_key
+
+
+class ReachabilityQuery(NamedTuple):
+    # subnet name, "<subnet name>/<range name>", address or range
+    source: str
+    destination: str
+    port: Optional[int] = None
+    protocol: str = "tcp"
+    source_tags: Tuple[str, ...] = ()
+    source_service_account: Optional[str] = None
+    destination_tags: Tuple[str, ...] = ()
+    destination_service_account: Optional[str] = None
+
+
+class Reachability(NamedTuple):
+    reachable: bool
+    # route(s) taken from the source, empty when the packet is dropped
+    routes: Tuple[RouteEntry, ...]
+    egress: FirewallVerdict
+    # None unless the destination is in a subnet of the network
+    ingress: Optional[FirewallVerdict]
+
+    def describe(self) -> str:
+        if not self.routes:
+            return "no route"
+        if not self.egress.allowed:
+            return f"egress denied by {self.egress.rule}"
+        if self.ingress is not None and not self.ingress.allowed:
+            return f"ingress denied by {self.ingress.rule}"
+        rules = self.egress.rule
+        if self.ingress is not None:
+            rules += f" and {self.ingress.rule}"
+        return f"allowed by {rules} via {', '.join(r.name for r in self.routes)}"
+
+
+class ReachabilityEngine:
+    """Answer whether traffic between instances of a network is let through.
+
+    A query is decided the way GCP would: the route the source instance
+    takes to the destination, the egress rules of the source and, when the
+    destination is in a subnet of the network, the ingress rules of the
+    destination. Only the first hop is modelled, traffic routed to a next
+    hop IP, instance, load balancer or tunnel is not followed further.
+
+    A subnet (or secondary range) given as source stands for every instance
+    in it: ingress rules match it only when their ranges contain all of it.
+    Given as destination, egress rules match it only when their ranges
+    contain all of it and the route to its first address is taken.
+    Both the routes and the firewall rules are compiled once, see
+    RouteTable.lookup_many and FirewallMatcher, so batches of queries run at
+    tens of thousands per second.
+    """
+
+    def __init__(
+        self,
+        route_table: RouteTable,
+        firewall: FirewallMatcher,
+        source_ranges: Optional[Dict[str, str]] = None,
+    ):
+        self.route_table = route_table
+        self.firewall = firewall
+        # subnet and "<subnet>/<range>" names -> CIDR
+        self.source_ranges = source_ranges or {}
+
+    @classmethod
+    def from_args(
+        cls,
+        subnets: List[Union[Dict[str, Any], SubnetsSubnetArgs]] = [],
+        secondary_ranges: Dict[str, List[SubnetsSecondaryRangeArgs]] = {},
+        routes: List[Union[Dict[str, Any], RoutesArgs]] = [],
+        firewall_rules: List[Union[Dict[str, Any], FirewallRulesRuleArgs]] = [],
+    ) -> "ReachabilityEngine":
+        validated_subnets = validate_many(SubnetsSubnetArgs, subnets, "subnets")
+        validated_secondary_ranges = validate_many_by_key(
+            SubnetsSecondaryRangeArgs, secondary_ranges, "secondary_ranges"
+        )
+        source_ranges: Dict[str, str] = {}
+        for subnet in validated_subnets:
+            source_ranges.setdefault(subnet.subnet_name, str(subnet.subnet_ip))
+            for _range in validated_secondary_ranges.get(subnet.subnet_name, []):
+                source_ranges.setdefault(
+                    f"{subnet.subnet_name}/{_range.range_name}",
+                    str(_range.ip_cidr_range),
+                )
+        return cls(
+            RouteTable.from_args(
+                routes, validated_subnets, validated_secondary_ranges  # type: ignore
+            ),
+            FirewallMatcher(firewall_rules),
+            source_ranges,
+        )
+
+    @classmethod
+    def from_spec(cls, spec: NetworkSpec) -> "ReachabilityEngine":
+        return cls.from_args(
+            spec.subnets,  # type: ignore
+            spec.secondary_ranges,
+            spec.routes,  # type: ignore
+            spec.firewall_rules,  # type: ignore
+        )
+
+    def _resolve(self, name: str) -> Tuple[str, str]:
+        """Range (or address) of ``name`` and the address its route is looked up for."""
+        cidr = self.source_ranges.get(name, name)
+        if "/" not in cidr:
+            return cidr, cidr
+        return cidr, str(ipaddress.ip_network(cidr, strict=False).network_address)
+
+    def check(self, query: ReachabilityQuery) -> Reachability:
+        destination, address = self._resolve(query.destination)
+        return self._decide(
+            query, destination, self.route_table.lookup(address, query.source_tags)
+        )
+
+    def check_many(self, queries: Iterable[ReachabilityQuery]) -> List[Reachability]:
+        """Decide every query, sharing the route lookups of equal source tags."""
+        queries = list(queries)
+        destinations = [self._resolve(query.destination) for query in queries]
+        by_tags: Dict[Tuple[str, ...], List[int]] = {}
+        for i, query in enumerate(queries):
+            by_tags.setdefault(tuple(sorted(query.source_tags)), []).append(i)
+
+        routes: List[Tuple[RouteEntry, ...]] = [()] * len(queries)
+        for tags, indexes in by_tags.items():
+            found = self.route_table.lookup_many(
+                [destinations[i][1] for i in indexes], tags
+            )
+            for i, entries in zip(indexes, found):
+                routes[i] = entries
+        return [
+            self._decide(query, destination, entries)
+            for query, (destination, _), entries in zip(queries, destinations, routes)
+        ]
+
+    def _decide(
+        self,
+        query: ReachabilityQuery,
+        destination: str,
+        routes: Tuple[RouteEntry, ...],
+    ) -> Reachability:
+        egress = self.firewall.egress(
+            destination,
+            query.protocol,
+            query.port,
+            query.source_tags,
+            query.source_service_account,
+        )
+        ingress = None
+        if routes and routes[0].is_subnet_route:
+            ingress = self.firewall.ingress(
+                self.source_ranges.get(query.source, query.source),
+                query.protocol,
+                query.port,
+                query.destination_tags,
+                query.destination_service_account,
+                query.source_tags,
+                query.source_service_account,
+            )
+        reachable = (
+            bool(routes) and egress.allowed and (ingress is None or ingress.allowed)
+        )
+        return Reachability(reachable, routes, egress, ingress)
@@ -0,0 +1,213 @@
+"""Slotted records the components register their resources from.
+
+Validated args are turned into records once every check passed. Strings that
+repeat across items (regions, tags, service accounts, protocols, next hops)
+are interned, so all resources share one copy of them. CIDR ranges and ports
+are kept as ints and only turned back into strings when read. Records expose
+the attributes of the args they were built from, as lists where the args
+have lists, so the components read both the same way.
+"""
+
+import sys
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+
+from .cidr import pack_cidr, unpack_cidr
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .firewall_rules import (
+        FirewallDirectionEnum,
+        FirewallRulesAllowDenyArgs,
+        FirewallRulesLogConfigArgs,
+        FirewallRulesRuleArgs,
+    )
+    from .routes import RoutesArgs
+    from .subnets import SubnetsSecondaryRangeArgs, SubnetsSubnetArgs
+
+# flag of a packed port range, the bounds take 16 bits each
+_PORT_RANGE = 1 << 32
+
+
+def intern_str(value: Optional[str]) -> Optional[str]:
+    return None if value is None else sys.intern(value)
+
+
+def intern_strs(values: Optional[List[str]]) -> Optional[Tuple[str, ...]]:
+    return None if values is None else tuple(map(sys.intern, values))
+
+
+def pack_port(port: str) -> Union[int, str]:
+    """``22`` as 22, ``8000-8080`` as one int, anything else stays a string."""
+    first, separator, last = port.partition("-")
+    bounds = [first, last] if separator else [first]
+    if not all(bound.isdigit() and str(int(bound)) == bound for bound in bounds):
+        return sys.intern(port)
+    if any(int(bound) > 0xFFFF for bound in bounds):
+        return sys.intern(port)
+    if not separator:
+        return int(first)
+    return _PORT_RANGE | int(first) << 16 | int(last)
+
+
+def unpack_port(packed: Union[int, str]) -> str:
+    if isinstance(packed, str):
+        return packed
+    if packed & _PORT_RANGE:
+        return f"{packed >> 16 & 0xFFFF}-{packed & 0xFFFF}"
+    return str(packed)
+
+
+def _listed(slot: str) -> property:
+    """Read a tuple slot as a list."""
+
+    def get(self: Any) -> Optional[List[Any]]:
+        values = getattr(self, slot)
+        return None if values is None else list(values)
+
+    return property(get)
+
+
+class SubnetRecord:
+    __slots__ = (
+        "subnet_name",
+        "subnet_region",
+        "_subnet_ip",
+        "subnet_description",
+        "subnet_private_access",
+        "subnet_flow_logs",
+        "subnet_flow_logs_interval",
+        "subnet_flow_logs_sampling",
+        "subnet_flow_logs_metadata",
+    )
+
+    def __init__(self, subnet: "SubnetsSubnetArgs"):
+        # the range of the subnet was allocated by now
+        self.subnet_name = sys.intern(subnet.subnet_name)
+        self.subnet_region = sys.intern(subnet.subnet_region)
+        self._subnet_ip = pack_cidr(str(subnet.subnet_ip))
+        self.subnet_description = intern_str(subnet.subnet_description)
+        self.subnet_private_access = subnet.subnet_private_access
+        self.subnet_flow_logs = subnet.subnet_flow_logs
+        self.subnet_flow_logs_interval = subnet.subnet_flow_logs_interval
+        self.subnet_flow_logs_sampling = subnet.subnet_flow_logs_sampling
+        self.subnet_flow_logs_metadata = sys.intern(subnet.subnet_flow_logs_metadata)
+
+    @property
+    def subnet_ip(self) -> str:
+        return unpack_cidr(self._subnet_ip)
+
+
+class SecondaryRangeRecord:
+    __slots__ = ("range_name", "_ip_cidr_range")
+
+    def __init__(self, secondary_range: "SubnetsSecondaryRangeArgs"):
+        self.range_name = sys.intern(secondary_range.range_name)
+        self._ip_cidr_range = pack_cidr(str(secondary_range.ip_cidr_range))
+
+    @property
+    def ip_cidr_range(self) -> str:
+        return unpack_cidr(self._ip_cidr_range)
+
+
+class RouteRecord:
+    __slots__ = (
+        "_destination_range",
+        "tags",
+        "name",
+        "next_hop_internet",
+        "next_hop_ip",
+        "description",
+        "next_hop_instance",
+        "next_hop_instance_zone",
+        "next_hop_vpn_tunnel",
+        "next_hop_ilb",
+        "priority",
+    )
+
+    def __init__(self, route: "RoutesArgs"):
+        self._destination_range = pack_cidr(route.destination_range)
+        self.tags = intern_str(route.tags)
+        self.name = intern_str(route.name)
+        self.next_hop_internet = route.next_hop_internet
+        self.next_hop_ip = intern_str(route.next_hop_ip)
+        self.description = intern_str(route.description)
+        self.next_hop_instance = intern_str(route.next_hop_instance)
+        self.next_hop_instance_zone = intern_str(route.next_hop_instance_zone)
+        self.next_hop_vpn_tunnel = intern_str(route.next_hop_vpn_tunnel)
+        self.next_hop_ilb = intern_str(route.next_hop_ilb)
+        self.priority = route.priority
+
+    @property
+    def destination_range(self) -> str:
+        return unpack_cidr(self._destination_range)
+
+
+class AllowDenyRecord:
+    __slots__ = ("protocol", "_ports")
+
+    def __init__(self, entry: "FirewallRulesAllowDenyArgs"):
+        self.protocol = sys.intern(entry.protocol)
+        ports = entry.ports
+        # a tuple for a list of ports, a single port as it is
+        self._ports: Any = (
+            tuple(pack_port(str(port)) for port in ports)
+            if isinstance(ports, list)
+            else pack_port(str(ports))
+        )
+
+    @property
+    def ports(self) -> Union[List[str], str]:
+        if isinstance(self._ports, tuple):
+            return [sys.intern(unpack_port(port)) for port in self._ports]
+        return sys.intern(unpack_port(self._ports))
+
+    def dict(self) -> Dict[str, Any]:
+        return {"protocol": self.protocol, "ports": self.ports}
+
+
+def _entries(
+    entries: Optional[List["FirewallRulesAllowDenyArgs"]],
+) -> Optional[Tuple[AllowDenyRecord, ...]]:
+    return None if entries is None else tuple(map(AllowDenyRecord, entries))
+
+
+class FirewallRuleRecord:
+    __slots__ = (
+        "name",
+        "description",
+        "direction",
+        "priority",
+        "_ranges",
+        "_source_tags",
+        "_source_service_accounts",
+        "_target_tags",
+        "_target_service_accounts",
+        "_allow",
+        "_deny",
+        "log_config",
+    )
+
+    def __init__(self, rule: "FirewallRulesRuleArgs"):
+        self.name = sys.intern(rule.name)
+        self.description = intern_str(rule.description)
+        self.direction: "FirewallDirectionEnum" = rule.direction
+        self.priority = rule.priority
+        self._ranges = tuple(map(pack_cidr, rule.ranges))
+        self._source_tags = intern_strs(rule.source_tags)
+        self._source_service_accounts = intern_strs(rule.source_service_accounts)
+        self._target_tags = intern_strs(rule.target_tags)
+        self._target_service_accounts = intern_strs(rule.target_service_accounts)
+        self._allow = _entries(rule.allow)
+        self._deny = _entries(rule.deny)
+        self.log_config: Optional["FirewallRulesLogConfigArgs"] = rule.log_config
+
+    @property
+    def ranges(self) -> List[str]:
+        # the same ranges are used by many rules
+        return [sys.intern(unpack_cidr(cidr)) for cidr in self._ranges]
+
+    source_tags = _listed("_source_tags")
+    source_service_accounts = _listed("_source_service_accounts")
+    target_tags = _listed("_target_tags")
+    target_service_accounts = _listed("_target_service_accounts")
+    allow = _listed("_allow")
+    deny = _listed("_deny")
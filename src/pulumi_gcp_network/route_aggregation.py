@@ -0,0 +1,164 @@
+import dataclasses
+import ipaddress
+from typing import (
+    Any,
+    Dict,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .cidr import CidrIndex, parse_cidr
+from .routes import Routes, RoutesArgs
+from .validation import validate_many
+
+
+@dataclasses.dataclass
+class RouteSummary:
+    destination_range: str
+    name: Optional[str]
+    # destination ranges and names of the routes replaced by this one
+    merged_ranges: List[str]
+    merged_names: List[Optional[str]]
+
+
+@dataclasses.dataclass
+class RouteSummaryReport:
+    input_routes: int = 0
+    output_routes: int = 0
+    summaries: List[RouteSummary] = dataclasses.field(default_factory=list)
+
+    def summary(self) -> str:
+        return (
+            f"{self.input_routes} routes summarized to {self.output_routes} "
+            f"using {len(self.summaries)} supernets"
+        )
+
+
+def _group_key(route: RoutesArgs) -> Tuple[Hashable, ...]:
+    return (
+        tuple(sorted(Routes.get_tags(route.tags))),
+        route.priority,
+        route.next_hop_internet,
+        route.next_hop_ip,
+        route.next_hop_instance,
+        route.next_hop_instance_zone,
+        route.next_hop_vpn_tunnel,
+        route.next_hop_ilb,
+    )
+
+
+def _is_safe(
+    supernet: str,
+    group: int,
+    members: List[int],
+    routes: List[RoutesArgs],
+    index: CidrIndex,
+) -> bool:
+    """Check that widening the members to ``supernet`` keeps every lookup result.
+
+    Any other route nested in the supernet that contains one of the members
+    would become more specific than (or tie with) the summary and take over
+    traffic the member used to win.
+    """
+    summary = parse_cidr(supernet)
+    originals = [parse_cidr(routes[i].destination_range) for i in members]
+    for other in index.overlapping(supernet):
+        if other.owner == str(group):
+            continue
+        if not (summary.start <= other.start and other.end <= summary.end):
+            continue
+        if any(
+            other.start <= original.start and original.end <= other.end
+            for original in originals
+        ):
+            return False
+    return True
+
+
+def _collapse(ranges: Dict[int, str]) -> Iterator[Tuple[str, List[int]]]:
+    """Yield the fewest supernets of the ranges, with the keys of those they cover.
+
+    The supernets come out disjoint and in address order, so one pass over
+    the ranges sorted the same way hands every range to its supernet.
+    """
+    networks = {
+        i: ipaddress.ip_network(cidr, strict=False) for i, cidr in ranges.items()
+    }
+    ipv4 = [n for n in networks.values() if isinstance(n, ipaddress.IPv4Network)]
+    ipv6 = [n for n in networks.values() if isinstance(n, ipaddress.IPv6Network)]
+    supernets: List[Union[ipaddress.IPv4Network, ipaddress.IPv6Network]] = []
+    supernets.extend(ipaddress.collapse_addresses(ipv4))
+    supernets.extend(ipaddress.collapse_addresses(ipv6))
+    starts = sorted(
+        (network.version, int(network.network_address), i)
+        for i, network in networks.items()
+    )
+    position = 0
+    for supernet in supernets:
+        last = (supernet.version, int(supernet.broadcast_address))
+        covered = []
+        while position < len(starts) and starts[position][:2] <= last:
+            covered.append(starts[position][2])
+            position += 1
+        yield str(supernet), sorted(covered)
+
+
+def summarize_routes(
+    routes: Sequence[Union[Dict[str, Any], RoutesArgs]],
+) -> Tuple[List[RoutesArgs], RouteSummaryReport]:
+    """Merge adjacent or covered destination ranges sharing next hop, tags and priority.
+
+    Each group of equivalent routes is collapsed into the fewest supernets
+    that cover exactly the same addresses. A supernet is only used when no
+    route of another group would win traffic from it, otherwise the group's
+    routes are kept as they are. The summary route keeps the name and
+    description of its first member.
+    """
+    validated = validate_many(RoutesArgs, routes, "routes")
+    report = RouteSummaryReport(input_routes=len(validated))
+
+    groups: Dict[Tuple[Hashable, ...], int] = {}
+    members: Dict[int, List[int]] = {}
+    route_groups = []
+    for i, route in enumerate(validated):
+        group = groups.setdefault(_group_key(route), len(groups))
+        members.setdefault(group, []).append(i)
+        route_groups.append(group)
+    index = CidrIndex(
+        (str(group), route.destination_range)
+        for group, route in zip(route_groups, validated)
+    )
+
+    outputs: List[Tuple[int, RoutesArgs]] = []
+    for group, group_members in members.items():
+        for supernet, covered in _collapse(
+            {i: validated[i].destination_range for i in group_members}
+        ):
+            if len(covered) > 1 and not _is_safe(
+                supernet, group, covered, validated, index
+            ):
+                outputs.extend((i, validated[i]) for i in covered)
+                continue
+
+            first = validated[covered[0]]
+            outputs.append(
+                (covered[0], first.copy(update={"destination_range": supernet}))
+            )
+            if len(covered) > 1:
+                report.summaries.append(
+                    RouteSummary(
+                        destination_range=supernet,
+                        name=first.name,
+                        merged_ranges=[validated[i].destination_range for i in covered],
+                        merged_names=[validated[i].name for i in covered],
+                    )
+                )
+
+    summarized = [route for _, route in sorted(outputs, key=lambda output: output[0])]
+    report.output_routes = len(summarized)
+    return summarized, report
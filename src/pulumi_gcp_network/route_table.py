@@ -0,0 +1,279 @@
+import bisect
+import ipaddress
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .routes import Routes, RoutesArgs
+from .subnets import SubnetsSecondaryRangeArgs, SubnetsSubnetArgs
+from .validation import validate_many, validate_many_by_key
+
+Address = Union[str, int, ipaddress.IPv4Address, ipaddress.IPv6Address]
+
+
+class RouteEntry(NamedTuple):
+    name: str
+    destination_range: str
+    priority: int
+    tags: Tuple[str, ...]
+    next_hop_type: str
+    next_hop: str
+
+    @property
+    def is_subnet_route(self) -> bool:
+        return self.next_hop_type == "subnet"
+
+    def applies_to(self, tags: Iterable[str]) -> bool:
+        return not self.tags or any(tag in self.tags for tag in tags)
+
+
+def get_next_hop(route: RoutesArgs) -> Tuple[str, str]:
+    if route.next_hop_internet:
+        return "gateway", "default-internet-gateway"
+    if route.next_hop_ip:
+        return "ip", route.next_hop_ip
+    if route.next_hop_instance:
+        if route.next_hop_instance_zone:
+            return (
+                "instance",
+                f"{route.next_hop_instance_zone}/{route.next_hop_instance}",
+            )
+        return "instance", route.next_hop_instance
+    if route.next_hop_vpn_tunnel:
+        return "vpn_tunnel", route.next_hop_vpn_tunnel
+    if route.next_hop_ilb:
+        return "ilb", route.next_hop_ilb
+    return "none", ""
+
+
+# start addresses of disjoint intervals and the route(s) each resolves to
+_Intervals = Tuple[List[int], List[Tuple[RouteEntry, ...]]]
+
+
+class _Node:
+    __slots__ = ("start", "prefixlen", "routes", "children")
+
+    def __init__(self, start: int, prefixlen: int):
+        self.start = start
+        self.prefixlen = prefixlen
+        self.routes: List[RouteEntry] = []
+        self.children: List[Optional["_Node"]] = [None, None]
+
+
+class _RadixTrie:
+    """Path compressed binary trie keyed on CIDR prefixes of one IP version."""
+
+    def __init__(self, bits: int):
+        self.bits = bits
+        self.root = _Node(0, 0)
+
+    def _bit(self, value: int, position: int) -> int:
+        return (value >> (self.bits - 1 - position)) & 1
+
+    def _common_prefixlen(self, first: int, second: int, limit: int) -> int:
+        diff = first ^ second
+        if not diff:
+            return limit
+        return min(limit, self.bits - diff.bit_length())
+
+    def _mask(self, value: int, prefixlen: int) -> int:
+        host_bits = self.bits - prefixlen
+        return value >> host_bits << host_bits
+
+    def insert(self, start: int, prefixlen: int, route: RouteEntry) -> None:
+        node = self.root
+        while True:
+            if node.prefixlen == prefixlen:
+                node.routes.append(route)
+                return
+            branch = self._bit(start, node.prefixlen)
+            child = node.children[branch]
+            if child is None:
+                leaf = _Node(start, prefixlen)
+                leaf.routes.append(route)
+                node.children[branch] = leaf
+                return
+            common = self._common_prefixlen(
+                start, child.start, min(prefixlen, child.prefixlen)
+            )
+            if common == child.prefixlen:
+                node = child
+                continue
+            # split the compressed edge at the first differing bit
+            split = _Node(self._mask(start, common), common)
+            split.children[self._bit(child.start, common)] = child
+            node.children[branch] = split
+            node = split
+
+    def matches(self, address: int) -> List[_Node]:
+        """Nodes with routes whose prefix contains ``address``, shortest first."""
+        found = []
+        node: Optional[_Node] = self.root
+        while node is not None:
+            if self._mask(address, node.prefixlen) != node.start:
+                break
+            if node.routes:
+                found.append(node)
+            if node.prefixlen == self.bits:
+                break
+            node = node.children[self._bit(address, node.prefixlen)]
+        return found
+
+
+def _select(routes: List[RouteEntry], tags: Sequence[str]) -> Tuple[RouteEntry, ...]:
+    applicable = [route for route in routes if route.applies_to(tags)]
+    if not applicable:
+        return ()
+    subnet_routes = tuple(route for route in applicable if route.is_subnet_route)
+    if subnet_routes:
+        return subnet_routes
+    best = min(route.priority for route in applicable)
+    return tuple(route for route in applicable if route.priority == best)
+
+
+class RouteTable:
+    """Offline model of the routes of a VPC network.
+
+    Routes are looked up like GCP does: routes whose tags do not match the
+    instance are ignored, then the most specific destination wins, then the
+    lowest priority value. Subnet routes win over custom routes with the same
+    destination and routes sharing the best priority are all returned (ECMP).
+    An empty result means the packet is dropped.
+    """
+
+    def __init__(self, entries: Iterable[RouteEntry] = ()):
+        self._tries = {4: _RadixTrie(32), 6: _RadixTrie(128)}
+        self._flattened: Dict[Tuple[int, Tuple[str, ...]], _Intervals] = {}
+        self.entries: List[RouteEntry] = []
+        for entry in entries:
+            self.add(entry)
+
+    @classmethod
+    def from_args(
+        cls,
+        routes: List[Union[Dict[str, Any], RoutesArgs]] = [],
+        subnets: List[Union[Dict[str, Any], SubnetsSubnetArgs]] = [],
+        secondary_ranges: Dict[str, List[SubnetsSecondaryRangeArgs]] = {},
+    ) -> "RouteTable":
+        table = cls()
+        validated_secondary_ranges = validate_many_by_key(
+            SubnetsSecondaryRangeArgs, secondary_ranges, "secondary_ranges"
+        )
+        for subnet in validate_many(SubnetsSubnetArgs, subnets, "subnets"):
+            if not subnet.subnet_ip:
+                raise ValueError(f"{subnet.subnet_name} has no subnet_ip")
+            ranges = [subnet.subnet_ip] + [
+                _range.ip_cidr_range
+                for _range in validated_secondary_ranges.get(subnet.subnet_name, [])
+            ]
+            for cidr in ranges:
+                table.add(
+                    RouteEntry(
+                        name=f"subnet-{subnet.subnet_name}",
+                        destination_range=str(cidr),
+                        priority=0,
+                        tags=(),
+                        next_hop_type="subnet",
+                        next_hop=subnet.subnet_name,
+                    )
+                )
+
+        for i, route in enumerate(validate_many(RoutesArgs, routes, "routes")):
+            next_hop_type, next_hop = get_next_hop(route)
+            table.add(
+                RouteEntry(
+                    name=route.name or f"route-{i}",
+                    destination_range=route.destination_range,
+                    priority=route.priority,
+                    tags=tuple(Routes.get_tags(route.tags)),
+                    next_hop_type=next_hop_type,
+                    next_hop=next_hop,
+                )
+            )
+        return table
+
+    def add(self, entry: RouteEntry) -> None:
+        network = ipaddress.ip_network(entry.destination_range, strict=False)
+        self._tries[network.version].insert(
+            int(network.network_address), network.prefixlen, entry
+        )
+        self.entries.append(entry)
+        self._flattened.clear()
+
+    @staticmethod
+    def _parse_address(address: Address) -> Tuple[int, int]:
+        if isinstance(address, int):
+            return (4 if address < 1 << 32 else 6), address
+        parsed = ipaddress.ip_address(address)
+        return parsed.version, int(parsed)
+
+    def lookup(
+        self, address: Address, tags: Sequence[str] = ()
+    ) -> Tuple[RouteEntry, ...]:
+        """Return the route(s) a packet to ``address`` from an instance takes."""
+        version, value = self._parse_address(address)
+        for node in reversed(self._tries[version].matches(value)):
+            selected = _select(node.routes, tags)
+            if selected:
+                return selected
+        return ()
+
+    def _flatten(self, version: int, tags: Tuple[str, ...]) -> _Intervals:
+        """Disjoint, sorted address intervals with the route(s) they resolve to."""
+        key = (version, tags)
+        if key in self._flattened:
+            return self._flattened[key]
+
+        trie = self._tries[version]
+        starts: List[int] = []
+        results: List[Tuple[RouteEntry, ...]] = []
+
+        def emit(start: int, result: Tuple[RouteEntry, ...]) -> None:
+            if results and results[-1] == result:
+                return
+            starts.append(start)
+            results.append(result)
+
+        def walk(node: _Node, inherited: Tuple[RouteEntry, ...]) -> None:
+            current = _select(node.routes, tags) or inherited
+            cursor = node.start
+            end = node.start + (1 << (trie.bits - node.prefixlen))
+            for child in node.children:
+                if child is None:
+                    continue
+                if cursor < child.start:
+                    emit(cursor, current)
+                walk(child, current)
+                cursor = child.start + (1 << (trie.bits - child.prefixlen))
+            if cursor < end:
+                emit(cursor, current)
+
+        walk(trie.root, ())
+        self._flattened[key] = (starts, results)
+        return starts, results
+
+    def lookup_many(
+        self, addresses: Iterable[Address], tags: Sequence[str] = ()
+    ) -> List[Tuple[RouteEntry, ...]]:
+        """Batch lookup for one set of instance tags.
+
+        The trie is flattened once per tag set into sorted intervals, after
+        which every address is a single binary search. Integer addresses below
+        2**32 are read as IPv4.
+        """
+        tag_key = tuple(sorted(tags))
+        tables = {version: self._flatten(version, tag_key) for version in (4, 6)}
+        resolved = []
+        for address in addresses:
+            version, value = self._parse_address(address)
+            starts, results = tables[version]
+            resolved.append(results[bisect.bisect_right(starts, value) - 1])
+        return resolved
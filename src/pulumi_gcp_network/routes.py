@@ -2,9 +2,14 @@ import dataclasses
 from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Union
 
 import pulumi
-import pulumi_gcp as gcp
 from pydantic import BaseModel, Field
 
+from .instrumentation import instrumented, span
+from .naming import ResourceNamingEnum, check_unique_names, digest
+from .records import RouteRecord
+from .scheduling import RegistrationScheduler
+from .validation import validate_many
+
 if TYPE_CHECKING:  # pragma: no cover
     static_check_init_args = dataclasses.dataclass
 else:
@@ -32,6 +37,7 @@ class RoutesArgs(BaseModel):
 
 
 class Routes(pulumi.ComponentResource):
+    @instrumented("component", "Routes")
     def __init__(
         self,
         resource_name: str,
@@ -39,9 +45,13 @@ class Routes(pulumi.ComponentResource):
         network_name: str,
         routes: List[Union[Dict[str, Any], RoutesArgs]] = [],
         module_depends_on: pulumi.Input[Sequence[pulumi.Input[Any]]] = [],
+        resource_naming: ResourceNamingEnum = ResourceNamingEnum.INDEX,
+        summarize: bool = False,
+        network: Optional[pulumi.Input[str]] = None,
+        scheduler: Optional[RegistrationScheduler] = None,
         opts: Optional[pulumi.ResourceOptions] = None,
     ):
-        """__init__.
+        """__init__. # noqa
 
         :param resource_name: pulumi resource name.
         :type resource_name: str
@@ -51,11 +61,44 @@ class Routes(pulumi.ComponentResource):
         :type network_name: str
         :param routes: List of routes being created in this VPC.
         :type routes: List[Union[Dict[str, Any], RoutesArgs]]
-        :param module_depends_on: List of modules or resources this module depends on.
+        :param module_depends_on: List of modules or resources every route depends on, e.g. the subnets of next hop IPs and load balancers.
         :type module_depends_on: pulumi.Input[Sequence[pulumi.Input[Any]]]
+        :param resource_naming: How routes without a name are named: by list position (INDEX) or by a digest of the route itself (NAME). Changing it replaces unnamed routes once. Defaults to INDEX
+        :type resource_naming: ResourceNamingEnum
+        :param summarize: Merge routes sharing next hop, tags and priority into the fewest supernets first, see summary_report. Defaults to False
+        :type summarize: bool
+        :param network: Self link or id of the network, an output of it makes the routes wait for the network only. Defaults to network_name
+        :type network: Optional[pulumi.Input[str]]
+        :param scheduler: Pace the creates to the API quotas of the project, see scheduling. Defaults to None
+        :type scheduler: Optional[RegistrationScheduler]
         :param opts: Options for pulumi resource.
         :type opts: Optional[pulumi.ResourceOptions]
         """
+        with span("RoutesArgs", "validate"):
+            validated = validate_many(RoutesArgs, routes, "routes")
+
+        self.summary_report = None
+        if summarize:
+            from .route_aggregation import summarize_routes
+
+            validated, self.summary_report = summarize_routes(validated)
+            pulumi.log.info(self.summary_report.summary())
+
+        validated = [
+            route
+            if route.name
+            else route.copy(
+                update={
+                    "name": self.get_route_name(
+                        route, network_name, i, resource_naming
+                    )
+                }
+            )
+            for i, route in enumerate(validated)
+        ]
+        if resource_naming == ResourceNamingEnum.NAME:
+            check_unique_names([str(route.name) for route in validated], "route")
+
         super().__init__(
             t="zityspace-gcp:network:Routes",
             name=resource_name,
@@ -65,37 +108,88 @@ class Routes(pulumi.ComponentResource):
 
         self.project_id = project_id
 
-        self.created_routes = []
+        import pulumi_gcp as gcp
 
-        for i, route in enumerate(routes):
-            if not isinstance(route, RoutesArgs):
-                route = RoutesArgs(**route)
-
-            if not route.name:
-                route.name = f"route-{network_name}-{i}"
-
-            _created_route = gcp.compute.Route(  # type: ignore
-                route.name,
-                project=project_id,
-                network=network_name,
-                name=route.name,
-                description=route.description,
-                tags=self.get_tags(route.tags),
-                dest_range=route.destination_range,
-                next_hop_gateway="default-internet-gateway"
-                if route.next_hop_internet
-                else None,
-                next_hop_ip=route.next_hop_ip,
-                next_hop_instance=route.next_hop_instance,
-                next_hop_instance_zone=route.next_hop_instance_zone,
-                next_hop_vpn_tunnel=route.next_hop_vpn_tunnel,
-                next_hop_ilb=route.next_hop_ilb,
-                priority=route.priority,
-                opts=pulumi.ResourceOptions(parent=self),
-            )
+        if network is None:
+            network = network_name
+
+        self.created_routes = []
+        self.routes_by_name: Dict[str, "gcp.compute.Route"] = {}
+        route_outputs: Dict[str, Dict[str, Any]] = {}
+
+        # the validated models are not needed past this point
+        records = [RouteRecord(route) for route in validated]
+        del validated
+
+        for route in records:
+            # every route is named by now
+            route_name = str(route.name)
+            depends_on = module_depends_on
+            if scheduler:
+                depends_on = scheduler.depends_on(module_depends_on)
+
+            with span("gcp.compute.Route", "register"):
+                _created_route = gcp.compute.Route(  # type: ignore
+                    route_name,
+                    project=project_id,
+                    network=network,
+                    name=route.name,
+                    description=route.description,
+                    tags=self.get_tags(route.tags),
+                    dest_range=route.destination_range,
+                    next_hop_gateway="default-internet-gateway"
+                    if route.next_hop_internet
+                    else None,
+                    next_hop_ip=route.next_hop_ip,
+                    next_hop_instance=route.next_hop_instance,
+                    next_hop_instance_zone=route.next_hop_instance_zone,
+                    next_hop_vpn_tunnel=route.next_hop_vpn_tunnel,
+                    next_hop_ilb=route.next_hop_ilb,
+                    priority=route.priority,
+                    opts=pulumi.ResourceOptions(parent=self, depends_on=depends_on),
+                )
+            if scheduler:
+                scheduler.add(_created_route)
             self.created_routes.append(_created_route)
 
+            self.routes_by_name[route_name] = _created_route
+            route_outputs[route_name] = {
+                "id": _created_route.id,
+                "self_link": _created_route.self_link,
+                "destination_range": route.destination_range,
+                "priority": route.priority,
+            }
+
+        self.registered_outputs = {"routes": route_outputs}
+        self.register_outputs(self.registered_outputs)
+
+    @staticmethod
+    def get_route_name(
+        route: Union[RoutesArgs, RouteRecord],
+        network_name: str,
+        index: int,
+        resource_naming: ResourceNamingEnum = ResourceNamingEnum.INDEX,
+    ) -> str:
+        if resource_naming == ResourceNamingEnum.INDEX:
+            return f"route-{network_name}-{index}"
+
+        return "route-{}-{}".format(
+            network_name,
+            digest(
+                route.destination_range,
+                Routes.get_tags(route.tags),
+                route.priority,
+                route.next_hop_internet,
+                route.next_hop_ip,
+                route.next_hop_instance,
+                route.next_hop_instance_zone,
+                route.next_hop_vpn_tunnel,
+                route.next_hop_ilb,
+            ),
+        )
+
     @staticmethod
+    @instrumented("convert")
     def get_tags(tags: Optional[str] = None) -> List[str]:
 
         if tags is None:
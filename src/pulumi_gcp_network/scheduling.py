@@ -0,0 +1,147 @@
+"""Pace the creation of many resources to the API quotas of the project.
+
+Creating thousands of routes or firewall rules at once runs into the rate
+quotas of the Compute Engine API, the provider then retries with backoff
+and ``pulumi up`` ends up slower than with a moderate concurrency. A
+:class:`RegistrationScheduler` shared by the components makes every resource
+depend on the one registered ``wave_size`` resources before it, so at most
+``wave_size`` creates are in flight. Each resource gets one dependency only,
+a barrier between whole waves would record ``wave_size`` dependencies on
+every resource of the stack.
+"""
+
+import collections
+import dataclasses
+import math
+import time
+from typing import Any, Deque, List, Optional, Sequence
+
+import pulumi
+
+# Default per project rate quotas of the Compute Engine API, per minute. Read
+# the quotas of the project from its Quotas page and pass them instead.
+DEFAULT_WRITES_PER_MINUTE = 1500
+DEFAULT_READS_PER_MINUTE = 1500
+
+
+@dataclasses.dataclass
+class RegistrationQuota:
+    writes_per_minute: int = DEFAULT_WRITES_PER_MINUTE
+    reads_per_minute: int = DEFAULT_READS_PER_MINUTE
+    # seconds a create operation of a route, firewall or subnetwork takes
+    operation_seconds: float = 10.0
+    # the provider polls a pending operation this often
+    poll_seconds: float = 2.0
+    # share of the quotas left to everything else using the project
+    headroom: float = 0.2
+
+    @property
+    def reads_per_create(self) -> int:
+        return 1 + math.ceil(self.operation_seconds / self.poll_seconds)
+
+    @property
+    def creates_per_minute(self) -> float:
+        """Creates the quotas sustain: one write and the polls of its operation."""
+        return (1 - self.headroom) * min(
+            self.writes_per_minute, self.reads_per_minute / self.reads_per_create
+        )
+
+    def wave_size(self) -> int:
+        """Creates in flight at once to keep up ``creates_per_minute``."""
+        return max(1, int(self.creates_per_minute * self.operation_seconds / 60))
+
+
+@dataclasses.dataclass
+class RegistrationReport:
+    resources: int = 0
+    wave_size: int = 0
+    # seconds from the first registration to the last created resource
+    seconds: float = 0.0
+    # creates per minute the quota allows, None without a quota
+    expected_per_minute: Optional[float] = None
+
+    @property
+    def per_minute(self) -> float:
+        return 60 * self.resources / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        expected = ""
+        if self.expected_per_minute is not None:
+            expected = f", the quota allows {self.expected_per_minute:.0f}"
+        return (
+            f"{self.resources} resources created in {self.seconds:.1f}s in waves "
+            f"of {self.wave_size}: {self.per_minute:.0f} per minute{expected}"
+        )
+
+
+class RegistrationScheduler:
+    def __init__(
+        self,
+        quota: Optional[RegistrationQuota] = None,
+        wave_size: Optional[int] = None,
+    ):
+        """Pace resources to ``wave_size`` creates, derived from ``quota`` by default.
+
+        :param quota: Rate quotas of the project. Defaults to RegistrationQuota()
+        :type quota: Optional[RegistrationQuota]
+        :param wave_size: Creates in flight at once, overrides the one of the quota.
+        :type wave_size: Optional[int]
+        """
+        if wave_size is not None and wave_size < 1:
+            raise ValueError("wave_size must be at least 1")
+        if quota is None and wave_size is None:
+            quota = RegistrationQuota()
+        self.quota = quota
+        self.wave_size = wave_size or quota.wave_size()  # type: ignore
+        self._window: Deque[pulumi.Resource] = collections.deque(maxlen=self.wave_size)
+        self._ids: List[pulumi.Output[Any]] = []
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+
+    def depends_on(
+        self, others: pulumi.Input[Sequence[pulumi.Input[Any]]] = ()
+    ) -> pulumi.Input[Sequence[pulumi.Input[Any]]]:
+        """Dependencies of the next resource: ``others`` and the one a wave before."""
+        if len(self._window) < self.wave_size:
+            return others
+        paced = self._window[0]
+        if isinstance(others, (list, tuple)):
+            return [*others, paced]
+        return pulumi.Output.from_input(others).apply(
+            lambda resources: [*resources, paced]
+        )
+
+    def add(self, resource: pulumi.CustomResource) -> None:
+        """Record a resource registered with the ``depends_on`` of the scheduler."""
+        if self._started is None:
+            self._started = time.monotonic()
+        self._window.append(resource)
+        self._ids.append(resource.id.apply(self._created))
+
+    def _created(self, resource_id: Any) -> Any:
+        self._finished = time.monotonic()
+        return resource_id
+
+    @property
+    def resources(self) -> int:
+        """Resources added so far."""
+        return len(self._ids)
+
+    def report(self) -> pulumi.Output[RegistrationReport]:
+        """Throughput achieved, once every resource added so far was created.
+
+        The ids of the resources are unknown during a preview, the report
+        only resolves on an update.
+        """
+        return pulumi.Output.all(*self._ids).apply(lambda _: self._report())
+
+    def _report(self) -> RegistrationReport:
+        seconds = 0.0
+        if self._started is not None and self._finished is not None:
+            seconds = self._finished - self._started
+        return RegistrationReport(
+            resources=len(self._ids),
+            wave_size=self.wave_size,
+            seconds=seconds,
+            expected_per_minute=self.quota.creates_per_minute if self.quota else None,
+        )
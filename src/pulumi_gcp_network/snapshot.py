@@ -0,0 +1,388 @@
+"""Incremental validation of Network inputs against the previous run.
+
+A :class:`SpecSnapshot` keeps the validated items of a run together with a
+digest of their raw input, keyed by the identity of the item (subnet, range,
+route or rule name). :func:`update_spec` validates only the items that were
+added or whose digest changed and reuses the instances of the snapshot for
+everything else.
+
+On disk a snapshot is a base file plus a journal of the items changed since
+the base was written, so saving the result of a small change does not
+serialize every item again.
+"""
+
+import dataclasses
+import hashlib
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Type, Union
+
+from pydantic import BaseModel
+
+from .cache import (
+    READ_ERRORS,
+    gc_paused,
+    read_compressed_json,
+    write_compressed_json,
+)
+from .firewall_rules import FirewallRulesRuleArgs
+from .routes import RoutesArgs
+from .spec import NetworkSpec, from_table, spec_digest, to_table
+from .subnets import SubnetsSecondaryRangeArgs, SubnetsSubnetArgs
+from .validation import BulkValidationError, validate_many
+
+MODELS: Dict[str, Type[BaseModel]] = {
+    "subnets": SubnetsSubnetArgs,
+    "secondary_ranges": SubnetsSecondaryRangeArgs,
+    "routes": RoutesArgs,
+    "firewall_rules": FirewallRulesRuleArgs,
+}
+KINDS = tuple(MODELS)
+
+JOURNAL_SUFFIX = ".journal"
+# the whole snapshot is written again once the journal holds this share of
+# the items of the base file
+COMPACT_RATIO = 0.1
+
+# identity -> (digest of the raw input, validated instance)
+Entries = Dict[str, Tuple[str, Any]]
+
+# (position of the item in its input, identity, raw item)
+_Item = Tuple[Any, str, Any]
+
+
+def _get(item: Any, name: str) -> Any:
+    if isinstance(item, dict):
+        return item.get(name)
+    return getattr(item, name, None)
+
+
+def item_digest(item: Any) -> str:
+    """Digest of the ``repr`` of one raw input item.
+
+    Half the cost of canonical JSON. Inputs built by the same code keep their
+    key order between runs, a reordered item only counts as changed.
+    """
+    return hashlib.blake2b(repr(item).encode(), digest_size=8).hexdigest()
+
+
+def _with_identities(items: Iterable[Tuple[Any, str, Any]]) -> List[_Item]:
+    """Make identities unique, repeats get ``#<n>`` appended in input order."""
+    seen: Dict[str, int] = {}
+    unique = []
+    for position, identity, item in items:
+        count = seen.get(identity, 0)
+        seen[identity] = count + 1
+        unique.append((position, f"{identity}#{count}" if count else identity, item))
+    return unique
+
+
+def _input_items(
+    subnets: Iterable[Any],
+    secondary_ranges: Mapping[str, Optional[Iterable[Any]]],
+    routes: Iterable[Any],
+    firewall_rules: Iterable[Any],
+) -> Dict[str, List[_Item]]:
+    return {
+        "subnets": _with_identities(
+            (i, str(_get(subnet, "subnet_name")), subnet)
+            for i, subnet in enumerate(subnets)
+        ),
+        "secondary_ranges": _with_identities(
+            ((subnet_name, i), f"{subnet_name}/{_get(_range, 'range_name')}", _range)
+            for subnet_name, ranges in secondary_ranges.items()
+            for i, _range in enumerate(ranges or [])
+        ),
+        "routes": _with_identities(
+            (i, str(_get(route, "name") or _get(route, "destination_range")), route)
+            for i, route in enumerate(routes)
+        ),
+        "firewall_rules": _with_identities(
+            (i, str(_get(rule, "name")), rule) for i, rule in enumerate(firewall_rules)
+        ),
+    }
+
+
+@dataclasses.dataclass
+class SpecDiff:
+    """Identities of the items added, removed and changed, per kind."""
+
+    added: Dict[str, List[str]] = dataclasses.field(default_factory=dict)
+    removed: Dict[str, List[str]] = dataclasses.field(default_factory=dict)
+    changed: Dict[str, List[str]] = dataclasses.field(default_factory=dict)
+    unchanged: Dict[str, int] = dataclasses.field(default_factory=dict)
+
+    @property
+    def is_empty(self) -> bool:
+        return not any(
+            self.added.get(kind) or self.removed.get(kind) or self.changed.get(kind)
+            for kind in KINDS
+        )
+
+    def summary(self) -> str:
+        return "spec diff: " + ", ".join(
+            f"{kind} +{len(self.added.get(kind, []))} "
+            f"-{len(self.removed.get(kind, []))} "
+            f"~{len(self.changed.get(kind, []))} "
+            f"={self.unchanged.get(kind, 0)}"
+            for kind in KINDS
+        )
+
+
+def _dump_entries(kind: str, entries: Entries) -> Dict[str, Any]:
+    identities = list(entries)
+    return {
+        "identities": identities,
+        "digests": [entries[identity][0] for identity in identities],
+        **to_table(MODELS[kind], [entries[identity][1] for identity in identities]),
+    }
+
+
+def _load_entries(kind: str, data: Mapping[str, Any]) -> Entries:
+    instances = from_table(MODELS[kind], data)
+    return dict(zip(data["identities"], zip(data["digests"], instances)))
+
+
+def _digests(entries: Entries) -> Dict[str, str]:
+    return {identity: item_hash for identity, (item_hash, _) in entries.items()}
+
+
+def _journal_path(path: Path) -> Path:
+    return path.with_name(path.name + JOURNAL_SUFFIX)
+
+
+@dataclasses.dataclass
+class SpecSnapshot:
+    """Validated items of a run and the digest of their raw input, per kind."""
+
+    entries: Dict[str, Entries] = dataclasses.field(default_factory=dict)
+    # library, pydantic and spec format, validated instances of another
+    # version are not reused
+    version: str = dataclasses.field(default_factory=spec_digest)
+    # identity -> digest per kind of the base file on disk and its generation,
+    # save() journals the difference to it
+    base: Optional[Dict[str, Dict[str, str]]] = dataclasses.field(
+        default=None, repr=False, compare=False
+    )
+    generation: Optional[str] = dataclasses.field(
+        default=None, repr=False, compare=False
+    )
+
+    def save(
+        self, path: Union[str, Path], compact_ratio: float = COMPACT_RATIO
+    ) -> None:
+        """Journal the changes to the base file, or write a new base file.
+
+        A new base file is written when there is none, when it is of another
+        version or when the journal would exceed ``compact_ratio`` of it.
+        """
+        path = Path(path)
+        with gc_paused():
+            if self.base is not None and self.generation is not None:
+                upserts = {
+                    kind: {
+                        identity: entry
+                        for identity, entry in self.entries.get(kind, {}).items()
+                        if self.base.get(kind, {}).get(identity) != entry[0]
+                    }
+                    for kind in KINDS
+                }
+                removed = {
+                    kind: [
+                        identity
+                        for identity in self.base.get(kind, {})
+                        if identity not in self.entries.get(kind, {})
+                    ]
+                    for kind in KINDS
+                }
+                changes = sum(len(upserts[kind]) + len(removed[kind]) for kind in KINDS)
+                if changes <= compact_ratio * sum(map(len, self.base.values())):
+                    write_compressed_json(
+                        _journal_path(path),
+                        {
+                            "generation": self.generation,
+                            "upserts": {
+                                kind: _dump_entries(kind, upserts[kind])
+                                for kind in KINDS
+                            },
+                            "removed": removed,
+                        },
+                    )
+                    return
+
+            generation = uuid.uuid4().hex
+            write_compressed_json(
+                path,
+                {
+                    "generation": generation,
+                    "version": self.version,
+                    "entries": {
+                        kind: _dump_entries(kind, self.entries.get(kind, {}))
+                        for kind in KINDS
+                    },
+                },
+            )
+            # a journal left behind refers to the previous generation and is
+            # ignored, removing it only saves reading it
+            try:
+                _journal_path(path).unlink()
+            except OSError:
+                pass
+            self.base = {kind: _digests(self.entries.get(kind, {})) for kind in KINDS}
+            self.generation = generation
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> Optional["SpecSnapshot"]:
+        """Read a snapshot, None when it is missing or cannot be read.
+
+        An unreadable journal is ignored, the items it recorded are then
+        validated again by :func:`update_spec`.
+        """
+        path = Path(path)
+        with gc_paused():
+            try:
+                data = read_compressed_json(path)
+                entries = {
+                    kind: _load_entries(kind, data["entries"][kind]) for kind in KINDS
+                }
+            except READ_ERRORS:
+                return None
+            base = {kind: _digests(entries[kind]) for kind in KINDS}
+
+            try:
+                journal = read_compressed_json(_journal_path(path))
+                if journal["generation"] == data["generation"]:
+                    upserts = {
+                        kind: _load_entries(kind, journal["upserts"][kind])
+                        for kind in KINDS
+                    }
+                    for kind in KINDS:
+                        entries[kind].update(upserts[kind])
+                        for identity in journal["removed"][kind]:
+                            entries[kind].pop(identity, None)
+            except READ_ERRORS:
+                pass
+        return cls(entries, data["version"], base, data["generation"])
+
+
+def _update_kind(
+    model: Type[BaseModel],
+    kind: str,
+    items: List[_Item],
+    previous: Entries,
+    diff: SpecDiff,
+) -> Entries:
+    instances: List[Any] = [None] * len(items)
+    digests = []
+    stale = []
+    added, changed = [], []
+    for i, (_, identity, item) in enumerate(items):
+        item_hash = item_digest(item)
+        digests.append(item_hash)
+        if identity not in previous:
+            added.append(identity)
+            stale.append(i)
+            continue
+        previous_hash, instance = previous[identity]
+        if previous_hash != item_hash:
+            changed.append(identity)
+            stale.append(i)
+        elif instance is None:
+            stale.append(i)
+        else:
+            instances[i] = instance
+
+    try:
+        validated = validate_many(model, [items[i][2] for i in stale], kind)
+    except BulkValidationError as error:
+        for item_error in error.errors:
+            position, *loc = item_error["loc"]
+            item_position = items[stale[position]][0]
+            if not isinstance(item_position, tuple):
+                item_position = (item_position,)
+            item_error["loc"] = item_position + tuple(loc)
+        raise BulkValidationError(error.kind, error.errors) from None
+    for i, instance in zip(stale, validated):
+        instances[i] = instance
+
+    entries = {
+        identity: (item_hash, instance)
+        for (_, identity, _), item_hash, instance in zip(items, digests, instances)
+    }
+    diff.added[kind] = added
+    diff.changed[kind] = changed
+    diff.removed[kind] = [identity for identity in previous if identity not in entries]
+    diff.unchanged[kind] = len(items) - len(added) - len(changed)
+    return entries
+
+
+def update_spec(
+    snapshot: Optional[SpecSnapshot],
+    subnets: Iterable[Any] = (),
+    secondary_ranges: Mapping[str, Optional[Iterable[Any]]] = {},
+    routes: Iterable[Any] = (),
+    firewall_rules: Iterable[Any] = (),
+) -> Tuple[NetworkSpec, SpecDiff, SpecSnapshot]:
+    """Validate the inputs reusing the unchanged items of ``snapshot``.
+
+    Items are matched by identity, not by position, so reordering the inputs
+    changes nothing. Returns the spec, the diff against the snapshot and the
+    snapshot of this run. A snapshot of another library version only serves
+    the diff, every item is validated again. The cyclic garbage collector is
+    paused meanwhile, as when loading a cached spec.
+    """
+    with gc_paused():
+        return _update_spec(
+            snapshot or SpecSnapshot(),
+            subnets,
+            secondary_ranges,
+            routes,
+            firewall_rules,
+        )
+
+
+def _update_spec(
+    snapshot: SpecSnapshot,
+    subnets: Iterable[Any],
+    secondary_ranges: Mapping[str, Optional[Iterable[Any]]],
+    routes: Iterable[Any],
+    firewall_rules: Iterable[Any],
+) -> Tuple[NetworkSpec, SpecDiff, SpecSnapshot]:
+    items = _input_items(subnets, secondary_ranges, routes, firewall_rules)
+    reusable = snapshot.version == spec_digest()
+
+    diff = SpecDiff()
+    entries: Dict[str, Entries] = {}
+    for kind in KINDS:
+        previous = snapshot.entries.get(kind, {})
+        if not reusable:
+            previous = {
+                identity: (item_hash, None)
+                for identity, (item_hash, _) in previous.items()
+            }
+        entries[kind] = _update_kind(MODELS[kind], kind, items[kind], previous, diff)
+
+    def instances(kind: str) -> List[Any]:
+        return [instance for _, instance in entries[kind].values()]
+
+    by_subnet: Dict[str, List[SubnetsSecondaryRangeArgs]] = {
+        subnet_name: [] for subnet_name in secondary_ranges
+    }
+    for ((subnet_name, _), _, _), _range in zip(
+        items["secondary_ranges"], instances("secondary_ranges")
+    ):
+        by_subnet[subnet_name].append(_range)
+
+    spec = NetworkSpec(
+        subnets=instances("subnets"),
+        secondary_ranges=by_subnet,
+        routes=instances("routes"),
+        firewall_rules=instances("firewall_rules"),
+    )
+    if reusable:
+        return (
+            spec,
+            diff,
+            SpecSnapshot(entries, base=snapshot.base, generation=snapshot.generation),
+        )
+    return spec, diff, SpecSnapshot(entries)
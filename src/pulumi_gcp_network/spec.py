@@ -0,0 +1,193 @@
+import dataclasses
+import hashlib
+import json
+import operator
+from concurrent.futures import Executor
+from enum import Enum
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Type,
+    TypeVar,
+)
+
+import pydantic
+from pydantic import BaseModel
+
+from . import __version__
+from .firewall_rules import FirewallRulesRuleArgs
+from .routes import RoutesArgs
+from .subnets import SubnetsSecondaryRangeArgs, SubnetsSubnetArgs
+from .validation import (
+    DEFAULT_CHUNK_SIZE,
+    nested_fields,
+    validate_many,
+    validate_many_by_key,
+)
+
+# bump when the serialized form of NetworkSpec changes
+SPEC_FORMAT = 1
+
+Model = TypeVar("Model", bound=BaseModel)
+
+
+def json_default(value: Any) -> Any:
+    """``default`` of ``json.dumps`` for models, enums and sets."""
+    if isinstance(value, BaseModel):
+        return value.dict(exclude_unset=True)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def spec_digest(*inputs: Any) -> str:
+    """Stable hash of raw Network inputs, the library and the pydantic version.
+
+    Dicts are hashed independently of their key order, lists by position.
+    """
+    payload = json.dumps(
+        [SPEC_FORMAT, __version__, pydantic.VERSION, inputs],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=json_default,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def to_table(model: Type[BaseModel], instances: List[Any]) -> Dict[str, Any]:
+    """Rows of field values in field order and a bitmask of the fields set."""
+    names = list(model.__fields__)
+    bits = {name: 1 << i for i, name in enumerate(names)}
+    row_of = operator.itemgetter(*names)
+    masks: Dict[FrozenSet[str], int] = {}
+    rows = []
+    fields_set = []
+    for instance in instances:
+        # nested models are left to json_default
+        rows.append(row_of(instance.__dict__))
+        names_set = frozenset(instance.__fields_set__)
+        if names_set not in masks:
+            masks[names_set] = sum(bits[name] for name in names_set)
+        fields_set.append(masks[names_set])
+    return {"fields": names, "rows": rows, "fields_set": fields_set}
+
+
+def from_table(model: Type[Model], table: Mapping[str, Any]) -> List[Model]:
+    """Instances of the rows of :func:`to_table`, they are not validated again."""
+    names = list(model.__fields__)
+    if table["fields"] != names:
+        raise ValueError(f"{model.__name__} fields changed")
+
+    nested = nested_fields(model)
+    set_names: Dict[int, Set[str]] = {}
+    instances = []
+    for row, mask in zip(table["rows"], table["fields_set"]):
+        data = dict(zip(names, row))
+        for name, rebuild in nested:
+            data[name] = rebuild(data[name])
+        if mask not in set_names:
+            set_names[mask] = {name for i, name in enumerate(names) if mask >> i & 1}
+
+        instance = model.__new__(model)
+        object.__setattr__(instance, "__dict__", data)
+        object.__setattr__(instance, "__fields_set__", set(set_names[mask]))
+        if model.__private_attributes__:
+            instance._init_private_attributes()
+        instances.append(instance)
+    return instances
+
+
+@dataclasses.dataclass
+class NetworkSpec:
+    """Validated and normalized inputs of a Network."""
+
+    subnets: List[SubnetsSubnetArgs] = dataclasses.field(default_factory=list)
+    secondary_ranges: Dict[str, List[SubnetsSecondaryRangeArgs]] = dataclasses.field(
+        default_factory=dict
+    )
+    routes: List[RoutesArgs] = dataclasses.field(default_factory=list)
+    firewall_rules: List[FirewallRulesRuleArgs] = dataclasses.field(
+        default_factory=list
+    )
+
+    @classmethod
+    def validate(
+        cls,
+        subnets: Iterable[Any] = (),
+        secondary_ranges: Mapping[str, Optional[Iterable[Any]]] = {},
+        routes: Iterable[Any] = (),
+        firewall_rules: Iterable[Any] = (),
+        executor: Optional[Executor] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> "NetworkSpec":
+        return cls(
+            subnets=validate_many(
+                SubnetsSubnetArgs, subnets, "subnets", executor, chunk_size
+            ),
+            secondary_ranges=validate_many_by_key(
+                SubnetsSecondaryRangeArgs,
+                secondary_ranges,
+                "secondary_ranges",
+                executor,
+                chunk_size,
+            ),
+            routes=validate_many(RoutesArgs, routes, "routes", executor, chunk_size),
+            firewall_rules=validate_many(
+                FirewallRulesRuleArgs,
+                firewall_rules,
+                "firewall_rules",
+                executor,
+                chunk_size,
+            ),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """One table of rows per input list, dump it with ``json_default``.
+
+        Rows hold every field value in field order, so loading them back is a
+        ``zip`` per item instead of a per field lookup.
+        """
+        secondary_ranges = [
+            _range for ranges in self.secondary_ranges.values() for _range in ranges
+        ]
+        return {
+            "subnets": to_table(SubnetsSubnetArgs, self.subnets),
+            "secondary_ranges": {
+                "subnets": [
+                    [subnet_name, len(ranges)]
+                    for subnet_name, ranges in self.secondary_ranges.items()
+                ],
+                **to_table(SubnetsSecondaryRangeArgs, secondary_ranges),
+            },
+            "routes": to_table(RoutesArgs, self.routes),
+            "firewall_rules": to_table(FirewallRulesRuleArgs, self.firewall_rules),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "NetworkSpec":
+        """Rebuild a spec produced by :meth:`to_dict` without validating it.
+
+        Raises ValueError when the fields of a model changed since it was
+        written.
+        """
+        secondary_ranges: Dict[str, List[SubnetsSecondaryRangeArgs]] = {}
+        flattened = iter(
+            from_table(SubnetsSecondaryRangeArgs, data["secondary_ranges"])
+        )
+        for subnet_name, count in data["secondary_ranges"]["subnets"]:
+            secondary_ranges[subnet_name] = [next(flattened) for _ in range(count)]
+
+        return cls(
+            subnets=from_table(SubnetsSubnetArgs, data["subnets"]),
+            secondary_ranges=secondary_ranges,
+            routes=from_table(RoutesArgs, data["routes"]),
+            firewall_rules=from_table(FirewallRulesRuleArgs, data["firewall_rules"]),
+        )
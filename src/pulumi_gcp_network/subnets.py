@@ -1,12 +1,41 @@
 import dataclasses
 from enum import Enum
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 import pulumi
-import pulumi_gcp as gcp
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, root_validator
+
+from .cidr import CidrIndex
+from .instrumentation import instrumented, span
+from .ipam import (
+    SUBNET_RESERVED_ADDRESSES,
+    AllocationRequest,
+    BuddyAllocator,
+    allocate_requests,
+    prefix_length_for_hosts,
+    read_allocations,
+    write_allocations,
+)
+from .naming import ResourceNamingEnum, check_unique_names, stable_resource_name
+from .records import SecondaryRangeRecord, SubnetRecord
+from .scheduling import RegistrationScheduler
+from .validation import validate_many, validate_many_by_key
 
 if TYPE_CHECKING:  # pragma: no cover
+    import pulumi_gcp as gcp
+
     static_check_init_args = dataclasses.dataclass
 else:
 
@@ -40,9 +69,13 @@ class SubnetLogsIntervalEnum(str, Enum):
 class SubnetsSubnetArgs(BaseModel):
     # required
     subnet_name: str
-    subnet_ip: str
     subnet_region: str
 
+    # either an explicit range or a size allocated from the subnets supernet
+    subnet_ip: Optional[str] = None
+    subnet_prefix_length: Optional[int] = Field(default=None, ge=0, le=128)
+    subnet_host_count: Optional[int] = Field(default=None, ge=1)
+
     # optional
     subnet_description: Optional[str] = None
     subnet_private_access: bool = False
@@ -53,14 +86,44 @@ class SubnetsSubnetArgs(BaseModel):
     subnet_flow_logs_sampling: float = 0.5
     subnet_flow_logs_metadata: str = "INCLUDE_ALL_METADATA"
 
+    @root_validator(skip_on_failure=True)
+    def check_subnet_ip(cls, values):
+        if not (
+            values.get("subnet_ip")
+            or values.get("subnet_prefix_length") is not None
+            or values.get("subnet_host_count") is not None
+        ):
+            raise ValueError(
+                "one of subnet_ip, subnet_prefix_length or subnet_host_count "
+                "is required"
+            )
+        return values
+
 
 @static_check_init_args
 class SubnetsSecondaryRangeArgs(BaseModel):
     range_name: str
-    ip_cidr_range: str
+
+    # either an explicit range or a size allocated from the secondary supernet
+    ip_cidr_range: Optional[str] = None
+    prefix_length: Optional[int] = Field(default=None, ge=0, le=128)
+    host_count: Optional[int] = Field(default=None, ge=1)
+
+    @root_validator(skip_on_failure=True)
+    def check_ip_cidr_range(cls, values):
+        if not (
+            values.get("ip_cidr_range")
+            or values.get("prefix_length") is not None
+            or values.get("host_count") is not None
+        ):
+            raise ValueError(
+                "one of ip_cidr_range, prefix_length or host_count is required"
+            )
+        return values
 
 
 class Subnets(pulumi.ComponentResource):
+    @instrumented("component", "Subnets")
     def __init__(
         self,
         resource_name: str,
@@ -68,6 +131,13 @@ class Subnets(pulumi.ComponentResource):
         network_name: str,
         subnets: List[Union[Dict[str, Any], SubnetsSubnetArgs]] = [],
         secondary_ranges: Dict[str, List[SubnetsSecondaryRangeArgs]] = {},
+        check_overlaps: bool = True,
+        supernet: Optional[str] = None,
+        secondary_supernet: Optional[str] = None,
+        allocations_path: Optional[Union[str, Path]] = None,
+        resource_naming: ResourceNamingEnum = ResourceNamingEnum.INDEX,
+        network: Optional[pulumi.Input[str]] = None,
+        scheduler: Optional[RegistrationScheduler] = None,
         opts: Optional[pulumi.ResourceOptions] = None,
     ):
         """__init__. # noqa
@@ -82,10 +152,60 @@ class Subnets(pulumi.ComponentResource):
         :type subnets: List[Union[Dict[str, Any], SubnetsSubnetArgs]]
         :param secondary_ranges: Secondary ranges that will be used in some of the subnets. Defaults to {}
         :type secondary_ranges: Dict[str, List[SubnetsSecondaryRangeArgs]]
+        :param check_overlaps: Reject overlapping primary and secondary ranges before any resource is registered. Defaults to True
+        :type check_overlaps: bool
+        :param supernet: Parent range that subnets without subnet_ip are allocated from. Defaults to None
+        :type supernet: Optional[str]
+        :param secondary_supernet: Parent range that secondary ranges without ip_cidr_range are allocated from. Defaults to supernet
+        :type secondary_supernet: Optional[str]
+        :param allocations_path: JSON file the allocated ranges are kept in, ranges allocated by a previous update keep their subnet however the list changes. Defaults to None
+        :type allocations_path: Optional[Union[str, Path]]
+        :param resource_naming: Key resource names on the list position (INDEX) or on region and subnet name (NAME). Defaults to INDEX
+        :type resource_naming: ResourceNamingEnum
+        :param network: Self link or id of the network, an output of it makes the subnets wait for the network only. Defaults to network_name
+        :type network: Optional[pulumi.Input[str]]
+        :param scheduler: Pace the creates to the API quotas of the project, see scheduling. Defaults to None
+        :type scheduler: Optional[RegistrationScheduler]
         :param opts: Options for pulumi resource.
         :type opts: Optional[pulumi.ResourceOptions]
         """
 
+        with span("SubnetsSubnetArgs", "validate"):
+            validated_subnets = validate_many(SubnetsSubnetArgs, subnets, "subnets")
+        with span("SubnetsSecondaryRangeArgs", "validate"):
+            secondary_ranges = validate_many_by_key(
+                SubnetsSecondaryRangeArgs, secondary_ranges, "secondary_ranges"
+            )
+
+        previous = read_allocations(allocations_path) if allocations_path else {}
+        self.allocations = self.allocate_ranges(
+            validated_subnets, secondary_ranges, supernet, secondary_supernet, previous
+        )
+        if self.allocations:
+            validated_subnets, secondary_ranges = self.apply_allocations(
+                validated_subnets, secondary_ranges, self.allocations
+            )
+
+        if check_overlaps:
+            self.check_overlaps(validated_subnets, secondary_ranges)
+
+        # a preview leaves the file as the last update wrote it
+        if (
+            allocations_path
+            and self.allocations != previous
+            and not pulumi.runtime.is_dry_run()
+        ):
+            write_allocations(allocations_path, self.allocations)
+
+        if resource_naming == ResourceNamingEnum.NAME:
+            check_unique_names(
+                [
+                    f"{subnet.subnet_region}-{subnet.subnet_name}"
+                    for subnet in validated_subnets
+                ],
+                "subnet",
+            )
+
         super().__init__(
             t="zityspace-gcp:network:Subnets",
             name=resource_name,
@@ -95,47 +215,261 @@ class Subnets(pulumi.ComponentResource):
 
         self.project_id = project_id
 
-        self.created_subnetworks = []
-        for i, subnet in enumerate(subnets):
+        # the validated models are not needed past this point
+        records = [SubnetRecord(subnet) for subnet in validated_subnets]
+        range_records = {
+            subnet_name: [SecondaryRangeRecord(_range) for _range in ranges]
+            for subnet_name, ranges in secondary_ranges.items()
+        }
+        del validated_subnets, secondary_ranges
+        self._subnet_ips = [subnet.subnet_ip for subnet in records]
+
+        import pulumi_gcp as gcp
 
-            if not isinstance(subnet, SubnetsSubnetArgs):
-                subnet = SubnetsSubnetArgs(**subnet)
+        if network is None:
+            network = network_name
 
-            _subnetwork = gcp.compute.Subnetwork(  # type: ignore
+        self.created_subnetworks = []
+        # "<region>/<name>" -> subnetwork, and region -> name -> subnetwork
+        self.subnetworks: Dict[str, "gcp.compute.Subnetwork"] = {}
+        self.subnetworks_by_region: Dict[
+            str, Dict[str, "gcp.compute.Subnetwork"]
+        ] = {}
+        subnet_outputs: Dict[str, Dict[str, Any]] = {}
+        for i, subnet in enumerate(records):
+            logical_name, aliases = stable_resource_name(
+                resource_naming,
                 f"subnetwork-{i}",
-                name=subnet.subnet_name,
-                ip_cidr_range=subnet.subnet_ip,
-                region=subnet.subnet_region,
-                private_ip_google_access=subnet.subnet_private_access,
-                network=network_name,
-                project=project_id,
-                description=subnet.subnet_description,
-                log_config=gcp.compute.SubnetworkLogConfigArgs(  # type: ignore
-                    aggregation_interval=subnet.subnet_flow_logs_interval,
-                    flow_sampling=subnet.subnet_flow_logs_sampling,
-                    metadata=subnet.subnet_flow_logs_metadata,
-                )
-                if subnet.subnet_flow_logs
-                else {},
-                secondary_ip_ranges=[]
-                if not secondary_ranges.get(subnet.subnet_name)
-                else [
-                    self.get_secondary_ip_range(_secondary_range)
-                    for _secondary_range in secondary_ranges[subnet.subnet_name]
-                ],
-                opts=pulumi.ResourceOptions(parent=self),
+                f"subnetwork-{subnet.subnet_region}-{subnet.subnet_name}",
             )
+
+            with span("gcp.compute.Subnetwork", "register"):
+                _subnetwork = gcp.compute.Subnetwork(  # type: ignore
+                    logical_name,
+                    name=subnet.subnet_name,
+                    ip_cidr_range=subnet.subnet_ip,
+                    region=subnet.subnet_region,
+                    private_ip_google_access=subnet.subnet_private_access,
+                    network=network,
+                    project=project_id,
+                    description=subnet.subnet_description,
+                    log_config=gcp.compute.SubnetworkLogConfigArgs(  # type: ignore
+                        aggregation_interval=subnet.subnet_flow_logs_interval,
+                        flow_sampling=subnet.subnet_flow_logs_sampling,
+                        metadata=subnet.subnet_flow_logs_metadata,
+                    )
+                    if subnet.subnet_flow_logs
+                    else {},
+                    secondary_ip_ranges=[]
+                    if not range_records.get(subnet.subnet_name)
+                    else [
+                        self.get_secondary_ip_range(_secondary_range)
+                        for _secondary_range in range_records[subnet.subnet_name]
+                    ],
+                    opts=pulumi.ResourceOptions(
+                        parent=self,
+                        aliases=aliases,
+                        depends_on=scheduler.depends_on() if scheduler else None,
+                    ),
+                )
+            if scheduler:
+                scheduler.add(_subnetwork)
             self.created_subnetworks.append(_subnetwork)
 
+            key = f"{subnet.subnet_region}/{subnet.subnet_name}"
+            self.subnetworks[key] = _subnetwork
+            self.subnetworks_by_region.setdefault(subnet.subnet_region, {})[
+                subnet.subnet_name
+            ] = _subnetwork
+            subnet_outputs[key] = {
+                "name": subnet.subnet_name,
+                "region": subnet.subnet_region,
+                "id": _subnetwork.id,
+                "self_link": _subnetwork.self_link,
+                "ip_cidr_range": subnet.subnet_ip,
+                "secondary_ranges": {
+                    _range.range_name: _range.ip_cidr_range
+                    for _range in range_records.get(subnet.subnet_name, [])
+                },
+            }
+
+        # what StackReference readers and parent components look subnets up by
+        self.registered_outputs = {
+            "subnets": subnet_outputs,
+            "subnets_by_region": {
+                region: {
+                    name: subnetwork.self_link
+                    for name, subnetwork in subnetworks.items()
+                }
+                for region, subnetworks in self.subnetworks_by_region.items()
+            },
+        }
+        self.register_outputs(self.registered_outputs)
+
+    def subnetworks_containing(
+        self, addresses: Iterable[str]
+    ) -> List["gcp.compute.Subnetwork"]:
+        """Return the subnetworks whose primary range holds one of ``addresses``.
+
+        Anything but an IP address, e.g. the name of a forwarding rule, is
+        skipped.
+        """
+        index = None
+        positions: Set[int] = set()
+        for address in addresses:
+            if index is None:
+                index = CidrIndex(
+                    (str(i), subnet_ip) for i, subnet_ip in enumerate(self._subnet_ips)
+                )
+            try:
+                found = index.overlapping(address)
+            except ValueError:
+                continue
+            positions.update(int(cidr_range.owner) for cidr_range in found)
+        return [self.created_subnetworks[i] for i in sorted(positions)]
+
+    @staticmethod
+    def allocate_ranges(
+        subnets: List[SubnetsSubnetArgs],
+        secondary_ranges: Dict[str, List[SubnetsSecondaryRangeArgs]],
+        supernet: Optional[str] = None,
+        secondary_supernet: Optional[str] = None,
+        previous: Mapping[str, str] = {},
+    ) -> Dict[str, str]:
+        """Allocate ranges for subnets and secondary ranges given only by size.
+
+        Explicit ranges are reserved first, then the ``previous`` allocations
+        of subnets and secondary ranges that still ask for a range of that
+        size and whose range is still free, so they keep their ranges however
+        the list changes around them. The remaining requests are served in
+        declaration order (each subnet followed by its secondary ranges).
+        Without ``previous`` only appending subnets is stable, inserting or
+        removing one moves the ranges allocated after it.
+        Returns the allocated CIDR keyed by subnet name and by
+        ``<subnet name>/<range name>`` for secondary ranges.
+        """
+
+        primary_pool = BuddyAllocator(supernet) if supernet else None
+        secondary_pool = primary_pool
+        if secondary_supernet and secondary_supernet != supernet:
+            secondary_pool = BuddyAllocator(secondary_supernet)
+        pools = {pool for pool in (primary_pool, secondary_pool) if pool}
+
+        for subnet in subnets:
+            ranges = [subnet.subnet_ip] + [
+                _range.ip_cidr_range
+                for _range in secondary_ranges.get(subnet.subnet_name, [])
+            ]
+            for cidr in ranges:
+                if cidr:
+                    for pool in pools:
+                        pool.reserve(cidr)
+
+        def request(
+            pool: Optional[BuddyAllocator],
+            owner: str,
+            prefix_length: Optional[int],
+            host_count: Optional[int],
+            reserved: int,
+        ) -> AllocationRequest:
+            if pool is None:
+                raise ValueError(f"{owner} has no explicit range and no supernet")
+            if prefix_length is None:
+                prefix_length = prefix_length_for_hosts(
+                    host_count or 0, pool.max_prefixlen, reserved
+                )
+            return owner, pool, prefix_length
+
+        requests: List[AllocationRequest] = []
+        for subnet in subnets:
+            if not subnet.subnet_ip:
+                requests.append(
+                    request(
+                        primary_pool,
+                        subnet.subnet_name,
+                        subnet.subnet_prefix_length,
+                        subnet.subnet_host_count,
+                        SUBNET_RESERVED_ADDRESSES,
+                    )
+                )
+            for _range in secondary_ranges.get(subnet.subnet_name, []):
+                if not _range.ip_cidr_range:
+                    requests.append(
+                        request(
+                            secondary_pool,
+                            f"{subnet.subnet_name}/{_range.range_name}",
+                            _range.prefix_length,
+                            _range.host_count,
+                            0,
+                        )
+                    )
+
+        return allocate_requests(requests, previous)
+
+    @staticmethod
+    def apply_allocations(
+        subnets: List[SubnetsSubnetArgs],
+        secondary_ranges: Dict[str, List[SubnetsSecondaryRangeArgs]],
+        allocations: Dict[str, str],
+    ) -> Tuple[List[SubnetsSubnetArgs], Dict[str, List[SubnetsSecondaryRangeArgs]]]:
+        """Return copies of the args with the allocated ranges filled in."""
+
+        allocated_subnets = []
+        for subnet in subnets:
+            if not subnet.subnet_ip:
+                subnet = subnet.copy(
+                    update={"subnet_ip": allocations[subnet.subnet_name]}
+                )
+            allocated_subnets.append(subnet)
+
+        allocated_secondary_ranges: Dict[str, List[SubnetsSecondaryRangeArgs]] = {}
+        for subnet_name, _ranges in secondary_ranges.items():
+            allocated_secondary_ranges[subnet_name] = []
+            for _range in _ranges:
+                if not _range.ip_cidr_range:
+                    owner = f"{subnet_name}/{_range.range_name}"
+                    _range = _range.copy(update={"ip_cidr_range": allocations[owner]})
+                allocated_secondary_ranges[subnet_name].append(_range)
+
+        return allocated_subnets, allocated_secondary_ranges
+
+    @staticmethod
+    def check_overlaps(
+        subnets: List[SubnetsSubnetArgs],
+        secondary_ranges: Dict[str, List[SubnetsSecondaryRangeArgs]],
+    ) -> CidrIndex:
+        """Index every range of the network and raise CidrOverlapError on overlap."""
+
+        ranges = []
+        for subnet in subnets:
+            ranges.append((subnet.subnet_name, str(subnet.subnet_ip)))
+            for secondary_range in secondary_ranges.get(subnet.subnet_name) or []:
+                if not isinstance(secondary_range, SubnetsSecondaryRangeArgs):
+                    secondary_range = SubnetsSecondaryRangeArgs(**secondary_range)
+                ranges.append(
+                    (
+                        f"{subnet.subnet_name}/{secondary_range.range_name}",
+                        str(secondary_range.ip_cidr_range),
+                    )
+                )
+        # sorted once instead of one insert per range
+        index = CidrIndex(ranges)
+        index.check()
+        return index
+
     @staticmethod
+    @instrumented("convert")
     def get_secondary_ip_range(
-        secondary_range: Union[Dict[str, str], SubnetsSecondaryRangeArgs],
-    ) -> gcp.compute.SubnetworkSecondaryIpRangeArgs:  # type: ignore
+        secondary_range: Union[
+            Dict[str, Any], SubnetsSecondaryRangeArgs, SecondaryRangeRecord
+        ],
+    ) -> "gcp.compute.SubnetworkSecondaryIpRangeArgs":  # type: ignore
+        import pulumi_gcp as gcp
 
-        if not isinstance(secondary_range, SubnetsSecondaryRangeArgs):
+        if isinstance(secondary_range, dict):
             secondary_range = SubnetsSecondaryRangeArgs(**secondary_range)
 
         return gcp.compute.SubnetworkSecondaryIpRangeArgs(  # type: ignore
             range_name=secondary_range.range_name,
-            ip_cidr_range=secondary_range.ip_cidr_range,
+            ip_cidr_range=str(secondary_range.ip_cidr_range),
         )
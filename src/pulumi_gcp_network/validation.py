@@ -0,0 +1,269 @@
+import functools
+import itertools
+from concurrent.futures import Executor
+from enum import Enum
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    cast,
+)
+
+from pydantic import BaseModel, validate_model
+from pydantic.error_wrappers import display_errors
+from pydantic.fields import SHAPE_LIST, SHAPE_SINGLETON
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pydantic.error_wrappers import ErrorDict
+
+Model = TypeVar("Model", bound=BaseModel)
+
+# Items per task sent to an executor, large enough that pickling the chunk
+# and its result stays small next to validating it.
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class InvalidItem(NamedTuple):
+    """Stands in for an item that could not be read, e.g. a line of bad JSON.
+
+    Validating it reports ``msg`` and ``type`` as the error of the item.
+    """
+
+    msg: str
+    type: str
+
+
+class BulkValidationError(ValueError):
+    """Every validation error of a list of inputs, located by list index.
+
+    ``errors`` has the format of ``pydantic.ValidationError.errors()`` with the
+    position of the item prepended to each ``loc``.
+    """
+
+    def __init__(self, kind: str, errors: List[Dict[str, Any]]):
+        self.kind = kind
+        self.errors = errors
+        # the errors of pydantic with a longer loc
+        details = display_errors(cast(List["ErrorDict"], errors))
+        super().__init__(
+            f"{len(errors)} validation error{'' if len(errors) == 1 else 's'} "
+            f"for {kind}\n{details}"
+        )
+
+
+def _validate_chunk(
+    model: Type[Model], items: Sequence[Any], offset: int = 0
+) -> Tuple[List[Model], List[Dict[str, Any]]]:
+    """Validate ``items`` and return the instances and the errors.
+
+    Module level so that process pools can pickle it. ``offset`` is added to
+    the positions in the error locations.
+    """
+    validated = []
+    errors: List[Dict[str, Any]] = []
+    for index, item in enumerate(items, offset):
+        if isinstance(item, model):
+            validated.append(item)
+            continue
+        if isinstance(item, InvalidItem):
+            errors.append({"loc": (index,), "msg": item.msg, "type": item.type})
+            continue
+        try:
+            values = item if isinstance(item, dict) else dict(item)
+        except (TypeError, ValueError):
+            errors.append(
+                {
+                    "loc": (index,),
+                    "msg": "value is not a valid dict",
+                    "type": "type_error.dict",
+                }
+            )
+            continue
+
+        values, fields_set, error = validate_model(model, values)
+        if error:
+            errors.extend(
+                {**item_error, "loc": (index,) + tuple(item_error["loc"])}
+                for item_error in error.errors()
+            )
+            continue
+        # what BaseModel.__init__ does with the result of validate_model,
+        # construct() would copy the defaults a second time
+        instance = model.__new__(model)
+        object.__setattr__(instance, "__dict__", values)
+        object.__setattr__(instance, "__fields_set__", fields_set)
+        instance._init_private_attributes()
+        validated.append(instance)
+    return validated, errors
+
+
+def validate_many(
+    model: Type[Model],
+    items: Iterable[Any],
+    kind: Optional[str] = None,
+    executor: Optional[Executor] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> List[Model]:
+    """Validate a list of inputs into ``model`` instances in one pass.
+
+    Instances of ``model`` are taken as they are, the per-item ``validate``
+    would copy them. Every other item is validated with the compiled
+    ``validate_model`` and the errors of all items are raised together as
+    :class:`BulkValidationError` instead of stopping at the first one.
+
+    With an ``executor`` (typically a ``ProcessPoolExecutor``) lists longer
+    than ``chunk_size`` are validated in chunks concurrently. Results keep
+    the input order.
+    """
+    items = list(items)
+    if executor is None or len(items) <= chunk_size:
+        validated, errors = _validate_chunk(model, items)
+    else:
+        offsets = range(0, len(items), chunk_size)
+        validated, errors = [], []
+        for chunk_validated, chunk_errors in executor.map(
+            _validate_chunk,
+            [model] * len(offsets),
+            [items[offset : offset + chunk_size] for offset in offsets],
+            offsets,
+        ):
+            validated.extend(chunk_validated)
+            errors.extend(chunk_errors)
+
+    if errors:
+        raise BulkValidationError(kind or model.__name__, errors)
+    return validated
+
+
+def validate_many_by_key(
+    model: Type[Model],
+    items: Mapping[str, Optional[Iterable[Any]]],
+    kind: Optional[str] = None,
+    executor: Optional[Executor] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Dict[str, List[Model]]:
+    """:func:`validate_many` for lists keyed by name, errors located by key."""
+    keys: List[Tuple[str, int]] = []
+    flattened = []
+    for key, values in items.items():
+        for index, value in enumerate(values or []):
+            keys.append((key, index))
+            flattened.append(value)
+
+    try:
+        validated = validate_many(model, flattened, kind, executor, chunk_size)
+    except BulkValidationError as error:
+        for item_error in error.errors:
+            position, *loc = item_error["loc"]
+            item_error["loc"] = keys[position] + tuple(loc)
+        raise BulkValidationError(error.kind, error.errors) from None
+
+    by_key: Dict[str, List[Model]] = {key: [] for key in items}
+    for (key, _), instance in zip(keys, validated):
+        by_key[key].append(instance)
+    return by_key
+
+
+def validate_iter(
+    model: Type[Model],
+    located_items: Iterable[Tuple[Any, Any]],
+    kind: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Model]:
+    """Lazily validate ``(location, item)`` pairs, e.g. records read from a file.
+
+    Items are validated ``chunk_size`` at a time, so at most one chunk of raw
+    items is held. Invalid items are skipped, once the input is exhausted
+    their errors are raised together as :class:`BulkValidationError`, located
+    by ``location`` instead of the position.
+    """
+    errors: List[Dict[str, Any]] = []
+    iterator = iter(located_items)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            break
+        validated, chunk_errors = _validate_chunk(model, [item for _, item in chunk])
+        for item_error in chunk_errors:
+            position, *loc = item_error["loc"]
+            item_error["loc"] = (chunk[position][0],) + tuple(loc)
+        errors.extend(chunk_errors)
+        yield from validated
+
+    if errors:
+        raise BulkValidationError(kind or model.__name__, errors)
+
+
+@functools.lru_cache(maxsize=None)
+def _trusted_plan(model: Type[BaseModel]) -> List[Tuple[str, Any, Any, bool]]:
+    """(name, field, nested type to rebuild or None, is a list) per field."""
+    plan = []
+    for name, field in model.__fields__.items():
+        nested = None
+        if isinstance(field.type_, type) and issubclass(field.type_, (BaseModel, Enum)):
+            nested = field.type_
+        if field.shape not in (SHAPE_SINGLETON, SHAPE_LIST):
+            nested = None
+        plan.append((name, field, nested, field.shape == SHAPE_LIST))
+    return plan
+
+
+def _rebuild(nested: Any, value: Any) -> Any:
+    if value is None or isinstance(value, nested):
+        return value
+    if issubclass(nested, BaseModel):
+        return construct_trusted(nested, value)
+    return nested(value)
+
+
+def _rebuild_list(nested: Any, value: Any) -> Any:
+    if value is None:
+        return value
+    return [_rebuild(nested, item) for item in value]
+
+
+def nested_fields(model: Type[BaseModel]) -> List[Tuple[str, Callable[[Any], Any]]]:
+    """(name, rebuild) of the fields holding nested models or enums.
+
+    ``rebuild`` turns the plain value of such a field (as found in JSON) back
+    into the models or enum members :func:`construct_trusted` would build.
+    """
+    return [
+        (name, functools.partial(_rebuild_list if is_list else _rebuild, nested))
+        for name, _, nested, is_list in _trusted_plan(model)
+        if nested is not None
+    ]
+
+
+def construct_trusted(model: Type[Model], values: Mapping[str, Any]) -> Model:
+    """Build a model from values that were validated before, e.g. a cached spec.
+
+    Nothing is validated, only nested models and enums that were serialized
+    to plain values are rebuilt and missing fields get their default.
+    """
+    data = {}
+    for name, field, nested, is_list in _trusted_plan(model):
+        if name not in values:
+            data[name] = field.get_default()
+            continue
+        value = values[name]
+        if nested is not None:
+            value = (_rebuild_list if is_list else _rebuild)(nested, value)
+        data[name] = value
+
+    instance = model.__new__(model)
+    object.__setattr__(instance, "__dict__", data)
+    object.__setattr__(instance, "__fields_set__", set(values))
+    instance._init_private_attributes()
+    return instance
@@ -3,7 +3,9 @@ from enum import Enum
 from typing import TYPE_CHECKING, Optional
 
 import pulumi
-import pulumi_gcp as gcp
+
+from .instrumentation import instrumented, span
+from .naming import root_aliases
 
 if TYPE_CHECKING:  # pragma: no cover
     static_check_init_args = dataclasses.dataclass
@@ -20,6 +22,7 @@ class VpcRoutingModeEnum(str, Enum):
 
 
 class Vpc(pulumi.ComponentResource):
+    @instrumented("component", "Vpc")
     def __init__(
         self,
         resource_name: str,
@@ -40,22 +43,37 @@ class Vpc(pulumi.ComponentResource):
             opts=opts,
         )
 
+        import pulumi_gcp as gcp
+
         self.project_id = project_id
 
-        self.vpc = gcp.compute.Network(  # type: ignore
-            "vpc",
-            name=network_name,
-            auto_create_subnetworks=auto_create_subnetworks,
-            routing_mode=routing_mode,
-            project=project_id,
-            description=description,
-            delete_default_routes_on_create=delete_default_internet_gateway_routes,
-            mtu=mtu,
-        )
+        with span("gcp.compute.Network", "register"):
+            self.vpc = gcp.compute.Network(  # type: ignore
+                "vpc",
+                name=network_name,
+                auto_create_subnetworks=auto_create_subnetworks,
+                routing_mode=routing_mode,
+                project=project_id,
+                description=description,
+                delete_default_routes_on_create=delete_default_internet_gateway_routes,
+                mtu=mtu,
+                opts=pulumi.ResourceOptions(parent=self, aliases=root_aliases(None)),
+            )
 
         self.shared_vpc_host = None
         if shared_vpc_host:
-            self.shared_vpc_host = gcp.compute.SharedVPCHostProject(  # type: ignore
-                "shared_vpc_host",
-                project=project_id,
-            )
+            with span("gcp.compute.SharedVPCHostProject", "register"):
+                self.shared_vpc_host = gcp.compute.SharedVPCHostProject(  # type: ignore
+                    "shared_vpc_host",
+                    project=project_id,
+                    opts=pulumi.ResourceOptions(
+                        parent=self, aliases=root_aliases(None)
+                    ),
+                )
+
+        self.registered_outputs = {
+            "network_name": self.vpc.name,
+            "network_id": self.vpc.id,
+            "network_self_link": self.vpc.self_link,
+        }
+        self.register_outputs(self.registered_outputs)
@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+
+from pulumi_gcp_network.binary import decode_spec, encode_spec, read_spec, write_spec
+from pulumi_gcp_network.firewall_rules import (
+    FirewallDirectionEnum,
+    FirewallRulesAllowDenyArgs,
+)
+from pulumi_gcp_network.spec import NetworkSpec
+
+TEST_SUBNETS = [
+    {
+        "subnet_name": f"subnet-{i}",
+        "subnet_ip": f"10.10.{i}.0/24",
+        "subnet_region": "us-west1",
+        "subnet_flow_logs": i % 2 == 0,
+        "subnet_flow_logs_sampling": 0.25,
+    }
+    for i in range(3)
+]
+TEST_SECONDARY_RANGES = {
+    "subnet-0": [
+        {"range_name": "pods", "ip_cidr_range": "10.100.0.0/16"},
+        {"range_name": "services", "ip_cidr_range": "fd00:10::/64"},
+    ],
+    "subnet-1": None,
+    "subnet-2": [{"range_name": "pods", "ip_cidr_range": "10.102.0.0/16"}],
+}
+TEST_ROUTES = [
+    {"destination_range": "0.0.0.0/0", "next_hop_internet": True, "tags": "a, b"},
+    {"destination_range": "10.0.0.0/8", "next_hop_ip": "10.10.0.2", "priority": 10},
+    {"destination_range": "2001:db8::/32", "next_hop_ilb": "ilb"},
+]
+TEST_FIREWALL_RULES = [
+    {
+        "name": "ssh",
+        "ranges": ["35.235.240.0/20", "10.0.0.0/8"],
+        "target_tags": ["bastion", "ssh"],
+        "allow": [{"protocol": "tcp", "ports": [22]}],
+        "log_config": {},
+    },
+    {
+        "name": "deny-all",
+        "direction": "EGRESS",
+        "target_service_accounts": ["sa@project.iam.gserviceaccount.com"],
+        "deny": [{"protocol": "all", "ports": []}],
+    },
+]
+
+
+class TestingBinarySpec(unittest.TestCase):
+    def setUp(self):
+        self.spec = NetworkSpec.validate(
+            TEST_SUBNETS, TEST_SECONDARY_RANGES, TEST_ROUTES, TEST_FIREWALL_RULES
+        )
+
+    def test_roundtrip(self):
+        loaded = decode_spec(encode_spec(self.spec))
+        self.assertEqual(self.spec, loaded)
+        self.assertEqual(
+            ["subnet-0", "subnet-1", "subnet-2"], list(loaded.secondary_ranges)
+        )
+        self.assertEqual([], loaded.secondary_ranges["subnet-1"])
+        for before, after in zip(self.spec.firewall_rules, loaded.firewall_rules):
+            self.assertEqual(before.__fields_set__, after.__fields_set__)
+
+    def test_roundtrip_types(self):
+        loaded = decode_spec(encode_spec(self.spec))
+        self.assertIs(FirewallDirectionEnum.EGRESS, loaded.firewall_rules[1].direction)
+        self.assertIsInstance(
+            loaded.firewall_rules[0].allow[0], FirewallRulesAllowDenyArgs
+        )
+        self.assertIsNone(loaded.firewall_rules[1].allow)
+        self.assertIsNone(loaded.subnets[0].subnet_prefix_length)
+        self.assertEqual(10, loaded.routes[1].priority)
+        self.assertEqual(0.25, loaded.subnets[0].subnet_flow_logs_sampling)
+
+    def test_strings_are_interned(self):
+        rules = [dict(TEST_FIREWALL_RULES[0], name=f"ssh-{i}") for i in range(100)]
+        one = NetworkSpec.validate(firewall_rules=rules[:1])
+        many = NetworkSpec.validate(firewall_rules=rules)
+        # the tags, ranges and allow entries are shared by every rule
+        per_rule = (len(encode_spec(many)) - len(encode_spec(one))) / 99
+        self.assertLess(per_rule, 64)
+
+    def test_non_canonical_cidrs(self):
+        spec = NetworkSpec(
+            routes=[
+                NetworkSpec.validate(routes=[TEST_ROUTES[1]])
+                .routes[0]
+                .copy(update={"destination_range": cidr})
+                for cidr in ("10.1/16", "10.0.0.1/8", "2001:DB8::/32", "10.0.0.0/08")
+            ]
+        )
+        self.assertEqual(spec, decode_spec(encode_spec(spec)))
+
+    def test_other_version(self):
+        encoded = bytearray(encode_spec(self.spec))
+        with self.assertRaisesRegex(ValueError, "another version"):
+            decode_spec(encoded.replace(b'"format": 1', b'"format": 0'))
+        with self.assertRaisesRegex(ValueError, "Not a binary"):
+            decode_spec(b"{}")
+
+    def test_empty(self):
+        self.assertEqual(NetworkSpec(), decode_spec(encode_spec(NetworkSpec())))
+
+    def test_read_write(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "spec.bin")
+            write_spec(path, self.spec)
+            self.assertEqual(self.spec, read_spec(path))
+            self.assertEqual(
+                [], [name for name in os.listdir(directory) if "tmp" in name]
+            )
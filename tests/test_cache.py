@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+from pulumi_gcp_network.cache import SpecCache
+from pulumi_gcp_network.spec import NetworkSpec
+
+TEST_ROUTES = [
+    {"destination_range": f"172.16.{i}.0/24", "next_hop_ip": "10.10.0.2"}
+    for i in range(5)
+]
+
+
+class TestingSpecCache(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.cache = SpecCache(self.directory)
+        self.spec = NetworkSpec.validate(routes=TEST_ROUTES)
+
+    def put(self, cache: SpecCache, name: str, mtime: float) -> str:
+        key = cache.key(name)
+        cache.put(key, self.spec)
+        os.utime(cache.path(key), (mtime, mtime))
+        return key
+
+    def test_get_put(self):
+        key = self.cache.key([], {}, TEST_ROUTES, [])
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, self.spec)
+        self.assertEqual(self.spec, self.cache.get(key))
+        self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+
+    def test_corrupt_entry(self):
+        key = self.cache.key("corrupt")
+        self.cache.path(key).write_bytes(b"not zlib")
+        self.assertIsNone(self.cache.get(key))
+        self.assertFalse(self.cache.path(key).exists())
+        self.assertEqual(1, self.cache.misses)
+
+    def test_evicts_least_recently_used(self):
+        cache = SpecCache(self.directory, max_entries=2)
+        first = self.put(cache, "first", 1000)
+        second = self.put(cache, "second", 2000)
+        os.utime(cache.path(first), (3000, 3000))
+        self.put(cache, "third", 4000)
+        self.assertTrue(cache.path(first).exists())
+        self.assertFalse(cache.path(second).exists())
+        self.assertEqual(2, len(cache.entries()))
+
+    def test_evicts_by_size(self):
+        cache = SpecCache(self.directory)
+        self.put(cache, "first", 1000)
+        size = cache.entries()[0][1]
+        cache.max_bytes = size * 2
+        self.put(cache, "second", 2000)
+        self.put(cache, "third", 3000)
+        self.assertEqual(
+            [cache.path(cache.key("second")), cache.path(cache.key("third"))],
+            [path for _, _, path in cache.entries()],
+        )
@@ -0,0 +1,125 @@
+import unittest
+
+from pulumi_gcp_network.cidr import (
+    CidrIndex,
+    CidrOverlapError,
+    pack_cidr,
+    parse_cidr,
+    split_cidr,
+    unpack_cidr,
+)
+
+
+class TestingCidrIndex(unittest.TestCase):
+    def test_parse_cidr(self):
+        cidr_range = parse_cidr("10.0.0.0/24", "subnet")
+        self.assertEqual(cidr_range.owner, "subnet")
+        self.assertEqual(cidr_range.end - cidr_range.start, 255)
+        self.assertEqual(cidr_range.version, 4)
+
+    def test_disjoint_ranges(self):
+        index = CidrIndex(
+            [
+                ("a", "10.0.0.0/24"),
+                ("b", "10.0.1.0/24"),
+                ("c", "192.168.0.0/16"),
+                ("d", "fd00::/64"),
+            ]
+        )
+        self.assertEqual(len(index), 4)
+        self.assertEqual([], index.find_overlaps())
+        index.check()
+
+    def test_nested_and_duplicate_ranges(self):
+        index = CidrIndex(
+            [
+                ("wide", "10.0.0.0/16"),
+                ("nested", "10.0.4.0/24"),
+                ("other", "10.1.0.0/24"),
+                ("duplicate", "10.1.0.0/24"),
+            ]
+        )
+        overlaps = [(a.owner, b.owner) for a, b in index.find_overlaps()]
+        self.assertEqual([("wide", "nested"), ("other", "duplicate")], overlaps)
+        with self.assertRaises(CidrOverlapError) as context:
+            index.check()
+        self.assertEqual(2, len(context.exception.overlaps))
+
+    def test_versions_do_not_overlap(self):
+        index = CidrIndex([("v4", "0.0.0.0/0"), ("v6", "::/0")])
+        self.assertEqual([], index.find_overlaps())
+
+    def test_overlapping_query(self):
+        index = CidrIndex(
+            [
+                ("wide", "10.0.0.0/16"),
+                ("nested", "10.0.4.0/24"),
+                ("other", "10.1.0.0/24"),
+            ]
+        )
+        owners = lambda cidr: sorted(r.owner for r in index.overlapping(cidr))  # noqa
+        self.assertEqual(["nested", "wide"], owners("10.0.4.128/25"))
+        self.assertEqual(["nested", "wide"], owners("10.0.0.0/16"))
+        self.assertEqual(["nested", "other", "wide"], owners("10.0.0.0/8"))
+        self.assertEqual([], owners("172.16.0.0/12"))
+
+    def test_containing_and_remove(self):
+        index = CidrIndex(
+            [
+                ("wide", "10.0.0.0/16"),
+                ("nested", "10.0.4.0/24"),
+                ("duplicate", "10.0.4.0/24"),
+            ]
+        )
+        owners = lambda cidr: sorted(r.owner for r in index.containing(cidr))  # noqa
+        self.assertEqual(["duplicate", "nested", "wide"], owners("10.0.4.0/24"))
+        self.assertEqual(["wide"], owners("10.0.0.0/22"))
+        self.assertEqual([], owners("10.0.0.0/8"))
+
+        index.remove("10.0.4.0/24", "nested")
+        self.assertEqual(["duplicate", "wide"], owners("10.0.4.1"))
+        self.assertEqual(["duplicate", "wide"], sorted(r.owner for r in index))
+        index.remove("10.0.4.0/24", "duplicate")
+        self.assertEqual(["wide"], owners("10.0.4.1"))
+        with self.assertRaises(KeyError):
+            index.remove("10.0.4.0/24", "duplicate")
+
+    def test_constructor_matches_add(self):
+        ranges = [
+            ("b", "10.1.0.0/24"),
+            ("v6", "fd00::/64"),
+            ("nested", "10.0.4.0/24"),
+            ("wide", "10.0.0.0/16"),
+            ("duplicate", "10.0.4.0/24"),
+        ]
+        added = CidrIndex()
+        for owner, cidr in ranges:
+            added.add(cidr, owner)
+        built = CidrIndex(ranges)
+        self.assertEqual(list(added), list(built))
+        self.assertEqual(added.find_overlaps(), built.find_overlaps())
+        self.assertEqual(
+            ["wide", "nested", "duplicate"],
+            [r.owner for r in built.containing("10.0.4.7")],
+        )
+
+
+class TestingPackCidr(unittest.TestCase):
+    def test_roundtrip(self):
+        for cidr in (
+            "0.0.0.0/0",
+            "10.0.0.0/8",
+            "192.168.1.128/25",
+            "::/0",
+            "fd00::/64",
+        ):
+            packed = pack_cidr(cidr)
+            self.assertIsInstance(packed, int)
+            self.assertEqual(cidr, unpack_cidr(packed))
+        self.assertNotEqual(pack_cidr("0.0.0.0/0"), pack_cidr("::/0"))
+
+    def test_non_canonical_ranges_are_kept(self):
+        for cidr in ("10.1/16", "10.0.0.1/8", "10.0.0.0/08", "FD00::/64", "x", "::/-1"):
+            self.assertIsNone(split_cidr(cidr))
+            self.assertEqual(cidr, pack_cidr(cidr))
+            self.assertEqual(cidr, unpack_cidr(pack_cidr(cidr)))
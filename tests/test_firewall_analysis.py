@@ -0,0 +1,84 @@
+import unittest
+
+from pulumi_gcp_network.firewall_analysis import analyze_firewall_rules, iter_bits
+
+
+def allow(name, ranges, ports=("22",), **kwargs):
+    return dict(
+        name=name,
+        ranges=ranges,
+        allow=[{"protocol": "tcp", "ports": list(ports)}],
+        **kwargs,
+    )
+
+
+def deny(name, ranges, ports=("22",), **kwargs):
+    return dict(
+        name=name,
+        ranges=ranges,
+        deny=[{"protocol": "tcp", "ports": list(ports)}],
+        **kwargs,
+    )
+
+
+class TestingFirewallAnalysis(unittest.TestCase):
+    def test_iter_bits(self):
+        self.assertEqual([0, 3, 64], list(iter_bits(1 | 1 << 3 | 1 << 64)))
+
+    def test_shadowed_by_wider_rule(self):
+        analysis = analyze_firewall_rules(
+            [
+                deny("deny-all-ssh", ["0.0.0.0/0"], ports=["1-1024"], priority=100),
+                allow("allow-ssh", ["10.0.0.0/8"]),
+                allow("allow-web", ["10.0.0.0/8"], ports=["8080"]),
+            ]
+        )
+        self.assertEqual({"allow-ssh": ["deny-all-ssh"]}, analysis.shadowed)
+        self.assertEqual([("deny-all-ssh", "allow-ssh")], analysis.conflicts)
+
+    def test_priority_and_direction(self):
+        analysis = analyze_firewall_rules(
+            [
+                allow("late", ["10.0.0.0/8"], priority=2000),
+                allow("early", ["10.1.0.0/16"], priority=10),
+                allow("egress", ["10.1.0.0/16"], direction="EGRESS"),
+            ]
+        )
+        self.assertEqual({}, analysis.shadowed)
+
+    def test_deny_wins_priority_ties(self):
+        analysis = analyze_firewall_rules(
+            [allow("allow", ["10.0.0.0/24"]), deny("deny", ["10.0.0.0/8"])]
+        )
+        self.assertEqual({"allow": ["deny"]}, analysis.shadowed)
+
+    def test_targets(self):
+        analysis = analyze_firewall_rules(
+            [
+                allow("web-db", ["10.0.0.0/8"], target_tags=["web", "db"], priority=1),
+                allow("web", ["10.0.0.0/8"], target_tags=["web"]),
+                allow("all", ["10.0.0.0/8"]),
+                allow("sa", ["10.0.0.0/8"], target_service_accounts=["a@b"]),
+            ]
+        )
+        self.assertEqual({"web": ["web-db"], "sa": ["all"]}, analysis.shadowed)
+
+    def test_source_tags(self):
+        analysis = analyze_firewall_rules(
+            [
+                allow("any", [], priority=1),
+                allow("tagged", [], source_tags=["bastion"]),
+                deny("other-tag", [], source_tags=["jump"], priority=0),
+            ]
+        )
+        self.assertEqual({"tagged": ["any"]}, analysis.shadowed)
+        self.assertEqual([("other-tag", "any")], analysis.conflicts)
+
+    def test_all_protocols(self):
+        analysis = analyze_firewall_rules(
+            [
+                {"name": "allow-all", "ranges": ["10.0.0.0/8"], "priority": 1},
+                allow("tcp", ["10.0.0.0/24"], ports=[]),
+            ]
+        )
+        self.assertEqual({"tcp": ["allow-all"]}, analysis.shadowed)
@@ -0,0 +1,113 @@
+import unittest
+
+from pulumi_gcp_network.firewall_compaction import (
+    collapse_ranges,
+    compact_firewall_rules,
+    format_ports,
+    normalize_allow_deny,
+    parse_ports,
+)
+from pulumi_gcp_network.firewall_rules import (
+    FirewallRulesAllowDenyArgs,
+    FirewallRulesRuleArgs,
+)
+
+
+def make_rule(name, ranges, ports=("22",), **kwargs):
+    return FirewallRulesRuleArgs(
+        name=name,
+        ranges=ranges,
+        allow=[{"protocol": "tcp", "ports": list(ports)}],
+        **kwargs,
+    )
+
+
+class TestingPorts(unittest.TestCase):
+    def test_parse_ports(self):
+        self.assertEqual([(80, 82), (443, 443)], parse_ports(["81", 80, "443", "82"]))
+        self.assertEqual([(8000, 8090)], parse_ports(["8000-8080", "8081-8090"]))
+        self.assertEqual([(22, 22)], parse_ports(22))
+        self.assertIsNone(parse_ports([]))
+
+    def test_format_ports(self):
+        self.assertEqual(["80-82", "443"], format_ports([(80, 82), (443, 443)]))
+        self.assertEqual([], format_ports(None))
+
+    def test_normalize_allow_deny(self):
+        entries = [
+            FirewallRulesAllowDenyArgs(protocol="tcp", ports=["80", "81"]),
+            FirewallRulesAllowDenyArgs(protocol="UDP", ports=[53]),
+            FirewallRulesAllowDenyArgs(protocol="tcp", ports=["82"]),
+        ]
+        self.assertEqual(
+            (("tcp", ("80-82",)), ("udp", ("53",))), normalize_allow_deny(entries)
+        )
+
+    def test_normalize_all_ports_wins(self):
+        entries = [
+            FirewallRulesAllowDenyArgs(protocol="tcp", ports=["80"]),
+            FirewallRulesAllowDenyArgs(protocol="tcp", ports=[]),
+        ]
+        self.assertEqual((("tcp", ()),), normalize_allow_deny(entries))
+
+
+class TestingCompaction(unittest.TestCase):
+    def test_collapse_ranges(self):
+        self.assertEqual(
+            ["10.0.0.0/23", "fd00::/64"],
+            collapse_ranges(["10.0.1.0/24", "fd00::/64", "10.0.0.0/24"]),
+        )
+
+    def test_merge_ranges(self):
+        rules, report = compact_firewall_rules(
+            [
+                make_rule("a", ["10.0.0.0/24"]),
+                make_rule("b", ["10.0.1.0/24"]),
+                make_rule("c", ["10.0.1.0/24"], priority=900),
+            ]
+        )
+        self.assertEqual(["a", "c"], [rule.name for rule in rules])
+        self.assertEqual(["10.0.0.0/23"], rules[0].ranges)
+        self.assertEqual({"a": ["b"]}, report.merged)
+        self.assertEqual((3, 2), (report.input_rules, report.output_rules))
+
+    def test_drop_duplicates(self):
+        rules, report = compact_firewall_rules(
+            [
+                make_rule("a", ["10.0.0.0/16"]),
+                make_rule("b", ["10.0.4.0/24"]),
+                make_rule("c", ["10.0.0.0/16"], target_tags=["web"]),
+            ]
+        )
+        self.assertEqual(["a", "c"], [rule.name for rule in rules])
+        self.assertEqual({"a": ["b"]}, report.duplicates)
+        self.assertEqual({}, report.merged)
+
+    def test_coalesce_ports(self):
+        rules, report = compact_firewall_rules(
+            [
+                make_rule("a", ["10.0.0.0/24"], ports=["80", "81", "82"]),
+                make_rule("b", ["10.0.1.0/24"], ports=["82", "80-81"]),
+            ]
+        )
+        self.assertEqual(1, len(rules))
+        self.assertEqual(["80-82"], rules[0].allow[0].ports)
+        self.assertEqual(["a", "b"], report.coalesced_ports)
+
+    def test_empty_ranges_are_not_merged(self):
+        rules, _ = compact_firewall_rules(
+            [make_rule("a", []), make_rule("b", ["10.0.0.0/24"])]
+        )
+        self.assertEqual([[], ["10.0.0.0/24"]], [rule.ranges for rule in rules])
+
+    def test_max_ranges(self):
+        rules, report = compact_firewall_rules(
+            [
+                make_rule("a", ["10.0.0.0/24"]),
+                make_rule("b", ["10.0.2.0/24"]),
+                make_rule("c", ["10.0.4.0/24"]),
+            ],
+            max_ranges=2,
+        )
+        self.assertEqual(["a", "c"], [rule.name for rule in rules])
+        self.assertEqual({"a": ["b"]}, report.merged)
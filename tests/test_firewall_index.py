@@ -0,0 +1,119 @@
+import unittest
+
+from pulumi_gcp_network.firewall_index import FirewallRuleIndex
+
+TEST_RULES = [
+    {
+        "name": "allow-web",
+        "ranges": ["0.0.0.0/0"],
+        "target_tags": ["web"],
+        "allow": [{"protocol": "tcp", "ports": ["443"]}],
+    },
+    {
+        "name": "allow-db-from-web",
+        "source_tags": ["web"],
+        "target_tags": ["db"],
+        "allow": [{"protocol": "tcp", "ports": ["5432"]}],
+    },
+    {
+        "name": "allow-backup",
+        "source_service_accounts": ["backup@test.iam.gserviceaccount.com"],
+        "target_service_accounts": ["db@test.iam.gserviceaccount.com"],
+        "allow": [{"protocol": "all", "ports": []}],
+    },
+    {
+        "name": "allow-internal",
+        "ranges": ["10.0.0.0/8", "fd00::/8"],
+        "allow": [{"protocol": "all", "ports": []}],
+    },
+    {
+        "name": "deny-egress-smtp",
+        "direction": "EGRESS",
+        "deny": [{"protocol": "tcp", "ports": ["25"]}],
+    },
+]
+
+
+def _names(rules):
+    return [rule.name for rule in rules]
+
+
+class TestingFirewallRuleIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = FirewallRuleIndex(TEST_RULES)
+
+    def test_tags_and_service_accounts(self):
+        self.assertEqual(["allow-web"], _names(self.index.with_target_tag("web")))
+        self.assertEqual(
+            ["allow-db-from-web"], _names(self.index.with_source_tag("web"))
+        )
+        self.assertEqual(
+            ["allow-backup"],
+            _names(
+                self.index.with_source_service_account(
+                    "backup@test.iam.gserviceaccount.com"
+                )
+            ),
+        )
+        self.assertEqual(
+            ["allow-db-from-web", "allow-backup", "allow-internal", "deny-egress-smtp"],
+            _names(self.index.applying_to(["db"], "db@test.iam.gserviceaccount.com")),
+        )
+        self.assertEqual([], self.index.with_target_tag("unknown"))
+
+    def test_ranges(self):
+        # rules without ranges match any address, unless they match sources
+        self.assertEqual(
+            ["allow-web", "allow-internal", "deny-egress-smtp"],
+            _names(self.index.containing("10.1.2.3")),
+        )
+        self.assertEqual(
+            ["allow-web", "deny-egress-smtp"],
+            _names(self.index.containing("10.0.0.0/7")),
+        )
+        self.assertEqual(
+            ["allow-web", "allow-internal", "deny-egress-smtp"],
+            _names(self.index.overlapping("10.0.0.0/7")),
+        )
+        self.assertEqual(
+            ["allow-internal", "deny-egress-smtp"],
+            _names(self.index.containing("fd00::1")),
+        )
+
+    def test_add_and_remove(self):
+        self.assertEqual(5, len(self.index))
+        removed = self.index.remove("allow-internal")
+        self.assertEqual("allow-internal", removed.name)
+        self.assertNotIn("allow-internal", self.index)
+        self.assertEqual(
+            ["allow-web", "deny-egress-smtp"],
+            _names(self.index.containing("10.1.2.3")),
+        )
+        self.assertEqual(["deny-egress-smtp"], _names(self.index.containing("fd00::1")))
+        with self.assertRaises(KeyError):
+            self.index.remove("allow-internal")
+
+        # a rule of the same name replaces the indexed one
+        self.index.add(dict(TEST_RULES[0], target_tags=["frontend"]))
+        self.assertEqual([], self.index.with_target_tag("web"))
+        self.assertEqual(["allow-web"], _names(self.index.with_target_tag("frontend")))
+        self.assertEqual(
+            ["allow-db-from-web", "allow-backup", "deny-egress-smtp", "allow-web"],
+            _names(self.index),
+        )
+
+    def test_constructor_matches_add(self):
+        rules = TEST_RULES + [dict(TEST_RULES[3], ranges=["192.168.0.0/16"])]
+        added = FirewallRuleIndex()
+        for rule in rules:
+            added.add(rule)
+        built = FirewallRuleIndex(rules)
+        self.assertEqual(_names(added), _names(built))
+        for cidr in ("10.1.2.3", "192.168.1.1", "fd00::1"):
+            self.assertEqual(
+                _names(added.containing(cidr)), _names(built.containing(cidr))
+            )
+        self.assertEqual(
+            ["allow-web", "deny-egress-smtp", "allow-internal"],
+            _names(built.containing("192.168.1.1")),
+        )
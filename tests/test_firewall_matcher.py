@@ -0,0 +1,97 @@
+import unittest
+
+from pulumi_gcp_network.firewall_matcher import (
+    IMPLIED_ALLOW_EGRESS,
+    IMPLIED_DENY_INGRESS,
+    FirewallMatcher,
+    FirewallVerdict,
+    parse_address,
+)
+
+TEST_RULES = [
+    {
+        "name": "allow-web",
+        "ranges": ["0.0.0.0/0"],
+        "target_tags": ["web"],
+        "allow": [{"protocol": "tcp", "ports": ["80", "8000-8080"]}],
+    },
+    {
+        "name": "deny-web-debug",
+        "ranges": ["0.0.0.0/0"],
+        "target_tags": ["web"],
+        "deny": [{"protocol": "6", "ports": ["8080"]}],
+    },
+    {
+        "name": "allow-icmp",
+        "ranges": ["10.0.0.0/8"],
+        "allow": [{"protocol": "icmp", "ports": []}],
+    },
+    {
+        "name": "allow-backup",
+        "source_service_accounts": ["backup@test.iam.gserviceaccount.com"],
+        "target_service_accounts": ["db@test.iam.gserviceaccount.com"],
+        "allow": [{"protocol": "all", "ports": []}],
+        "priority": 500,
+    },
+    {
+        "name": "deny-egress-smtp",
+        "direction": "EGRESS",
+        "ranges": ["0.0.0.0/0"],
+        "deny": [{"protocol": "tcp", "ports": ["25"]}],
+    },
+]
+
+
+class TestingFirewallMatcher(unittest.TestCase):
+    def setUp(self):
+        self.matcher = FirewallMatcher(TEST_RULES)
+
+    def test_ports(self):
+        for port, expected in ((80, "allow-web"), (8001, "allow-web"), (81, None)):
+            verdict = self.matcher.ingress("1.2.3.4", "tcp", port, tags=["web"])
+            self.assertEqual(expected or IMPLIED_DENY_INGRESS, verdict.rule)
+        self.assertEqual(
+            FirewallVerdict(True, "allow-icmp"),
+            self.matcher.ingress("10.1.2.3", "icmp"),
+        )
+        self.assertEqual(
+            IMPLIED_DENY_INGRESS, self.matcher.ingress("10.1.2.3", "udp", 53).rule
+        )
+
+    def test_deny_wins_ties(self):
+        self.assertEqual(
+            FirewallVerdict(False, "deny-web-debug"),
+            self.matcher.ingress("1.2.3.4", "tcp", 8080, tags=["web"]),
+        )
+
+    def test_service_accounts(self):
+        verdict = self.matcher.ingress(
+            "10.0.0.1",
+            "udp",
+            53,
+            service_account="db@test.iam.gserviceaccount.com",
+            source_service_account="backup@test.iam.gserviceaccount.com",
+        )
+        self.assertEqual(FirewallVerdict(True, "allow-backup"), verdict)
+
+    def test_egress(self):
+        self.assertEqual(
+            FirewallVerdict(False, "deny-egress-smtp"),
+            self.matcher.egress("8.8.8.8", "tcp", 25),
+        )
+        self.assertEqual(
+            FirewallVerdict(True, IMPLIED_ALLOW_EGRESS),
+            self.matcher.egress("8.8.8.8", "tcp", 443),
+        )
+
+    def test_rules_in_evaluation_order(self):
+        self.assertEqual(
+            ["allow-backup", "deny-web-debug", "deny-egress-smtp"],
+            [rule.name for rule in self.matcher.rules][:3],
+        )
+
+    def test_integer_addresses(self):
+        self.assertEqual((4, 167772161), parse_address(167772161))
+        self.assertEqual((6, 1 << 32), parse_address("::1:0:0"))
+        with self.assertRaisesRegex(ValueError, "IPv6 addresses as strings"):
+            parse_address(1 << 32)
@@ -16,7 +16,9 @@ pulumi.runtime.set_mocks(TestMocks())
 # It's important to import _after_ the mocks are defined.
 from pulumi_gcp_network.firewall_rules import (  # noqa isort:skip type: ignore
     FirewallRules,
+    FirewallRulesRuleArgs,
 )
+from pulumi_gcp_network.naming import ResourceNamingEnum  # noqa isort:skip
 
 TEST_NAME = "test-firewall-rules"
 TEST_PROJECT_ID = "test"
@@ -105,3 +107,93 @@ class TestingFirewallRules(unittest.TestCase):
                 for route in self.firewall_rules.created_firewall_rules
             ]
         ).apply(check_created_firewall_destination_ranges)
+
+    @pulumi.runtime.test
+    def test_network(self):
+        def check_network(networks):
+            self.assertEqual([TEST_NETWORK_NAME] * len(TEST_FIREWALLRULES), networks)
+
+        return pulumi.Output.all(
+            *[rule.network for rule in self.firewall_rules.created_firewall_rules]
+        ).apply(check_network)
+
+    def test_rule_index(self):
+        index = self.firewall_rules.rule_index
+        self.assertIs(index, self.firewall_rules.rule_index)
+        self.assertEqual(
+            ["test-rule-1", "test-rule-2"],
+            [rule.name for rule in index.containing("10.10.20.7")],
+        )
+        self.assertEqual([], index.containing("fd00::1"))
+
+    @pulumi.runtime.test
+    def test_registered_outputs(self):
+        self.assertIs(
+            self.firewall_rules.created_firewall_rules[1],
+            self.firewall_rules.firewall_rules_by_name["test-rule-2"],
+        )
+
+        def check_outputs(outputs):
+            self.assertEqual(
+                {
+                    "id": "rule-test-rule-2-1_id",
+                    "self_link": None,
+                    "direction": "EGRESS",
+                    "priority": 1000,
+                    "ranges": ["10.10.20.0/24"],
+                },
+                outputs["firewall_rules"]["test-rule-2"],
+            )
+
+        return pulumi.Output.from_input(self.firewall_rules.registered_outputs).apply(
+            check_outputs
+        )
+
+
+class TestingFirewallRulesNaming(unittest.TestCase):
+    @pulumi.runtime.test
+    def setUp(self):
+        self.firewall_rules = FirewallRules(
+            TEST_NAME,
+            project_id=TEST_PROJECT_ID,
+            network_name=TEST_NETWORK_NAME,
+            rules=TEST_FIREWALLRULES,
+            resource_naming=ResourceNamingEnum.NAME,
+        )
+
+    @pulumi.runtime.test
+    def test_created_firewall_rules_urn(self):
+        def check_created_firewall_rules_urn(urns):
+            self.assertTrue(urns[0].endswith("::rule-test-rule-1"))
+            self.assertTrue(urns[1].endswith("::rule-test-rule-2"))
+
+        return pulumi.Output.all(
+            *[rule.urn for rule in self.firewall_rules.created_firewall_rules]
+        ).apply(check_created_firewall_rules_urn)
+
+    def test_duplicate_rule_names(self):
+        with self.assertRaises(ValueError):
+            FirewallRules(
+                TEST_NAME,
+                project_id=TEST_PROJECT_ID,
+                network_name=TEST_NETWORK_NAME,
+                rules=TEST_FIREWALLRULES + TEST_FIREWALLRULES[:1],
+                resource_naming=ResourceNamingEnum.NAME,
+            )
+
+
+class TestingFirewallRulesCompaction(unittest.TestCase):
+    @pulumi.runtime.test
+    def setUp(self):
+        self.firewall_rules = FirewallRules(
+            TEST_NAME,
+            project_id=TEST_PROJECT_ID,
+            network_name=TEST_NETWORK_NAME,
+            rules=TEST_FIREWALLRULES + [dict(TEST_FIREWALLRULES[0], name="copy")],
+            compact=True,
+        )
+
+    def test_compaction_report(self):
+        report = self.firewall_rules.compaction_report
+        self.assertEqual({"test-rule-1": ["copy"]}, report.duplicates)
+        self.assertEqual(2, len(self.firewall_rules.created_firewall_rules))
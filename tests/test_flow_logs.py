@@ -0,0 +1,160 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from pulumi_gcp_network.flow_logs import (
+    FlowLogAnalyzer,
+    FlowLogCheckpoint,
+    flow_from_log,
+)
+from pulumi_gcp_network.flow_replay import Flow
+
+TEST_RULES = [
+    {
+        "name": "allow-web",
+        "ranges": ["0.0.0.0/0"],
+        "target_tags": ["web"],
+        "allow": [{"protocol": "tcp", "ports": ["443"]}],
+    },
+    {
+        "name": "allow-db-from-web",
+        "source_tags": ["web"],
+        "target_tags": ["db"],
+        "allow": [{"protocol": "tcp", "ports": ["5432"]}],
+    },
+    {
+        "name": "allow-legacy",
+        "ranges": ["192.168.0.0/16"],
+        "allow": [{"protocol": "tcp", "ports": ["8080"]}],
+    },
+    {
+        "name": "deny-egress-smtp",
+        "direction": "EGRESS",
+        "ranges": ["0.0.0.0/0"],
+        "deny": [{"protocol": "tcp", "ports": ["25"]}],
+    },
+]
+TEST_INSTANCES = {"web-1": (["web"], None), "db-1": (["db"], None)}
+
+
+def _entry(reporter, src_ip, dest_ip, port, src_vm=None, dest_vm=None):
+    payload = {
+        "connection": {
+            "src_ip": src_ip,
+            "dest_ip": dest_ip,
+            "src_port": 40000,
+            "dest_port": port,
+            "protocol": 6,
+        },
+        "reporter": reporter,
+    }
+    if src_vm:
+        payload["src_instance"] = {"vm_name": src_vm, "zone": "us-west1-a"}
+    if dest_vm:
+        payload["dest_instance"] = {"vm_name": dest_vm, "zone": "us-west1-a"}
+    return {"jsonPayload": payload, "logName": "compute.googleapis.com/vpc_flows"}
+
+
+TEST_ENTRIES = [
+    _entry("DEST", "1.2.3.4", "10.0.0.2", 443, dest_vm="web-1"),
+    _entry("DEST", "1.2.3.4", "10.0.0.2", 443, dest_vm="web-1"),
+    _entry("SRC", "10.0.0.2", "10.0.1.2", 5432, "web-1", "db-1"),
+    _entry("DEST", "10.0.0.2", "10.0.1.2", 5432, "web-1", "db-1"),
+    _entry("SRC", "10.0.0.2", "8.8.8.8", 25, src_vm="web-1"),
+]
+
+
+class TestingFlowLogs(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / "flows.jsonl"
+        self.checkpoint = Path(self.directory.name) / "checkpoint"
+        lines = [json.dumps(entry) for entry in TEST_ENTRIES]
+        self.path.write_text("\n".join(lines[:3] + ["not json"] + lines[3:]) + "\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_flow_from_log(self):
+        self.assertEqual(
+            Flow(
+                "10.0.0.2",
+                "10.0.1.2",
+                "6",
+                5432,
+                "INGRESS",
+                ("db",),
+                source_tags=("web",),
+            ),
+            flow_from_log(TEST_ENTRIES[3], TEST_INSTANCES),
+        )
+        self.assertEqual(
+            "EGRESS", flow_from_log(TEST_ENTRIES[2]["jsonPayload"]).direction
+        )
+        self.assertIsNone(flow_from_log({"jsonPayload": {"reporter": "SRC"}}))
+
+    def test_report(self):
+        report = FlowLogAnalyzer(TEST_RULES, TEST_INSTANCES).read([self.path])
+        self.assertEqual((5, 1, 1), (report.flows, report.skipped, report.denied))
+        self.assertEqual(
+            {
+                "allow-web": 2,
+                "allow-db-from-web": 1,
+                "allow-legacy": 0,
+                "deny-egress-smtp": 1,
+                "implied-allow-egress": 1,
+                "implied-deny-ingress": 0,
+            },
+            report.hits,
+        )
+        self.assertEqual(["allow-legacy"], report.unused)
+
+    def test_resume(self):
+        analyzer = FlowLogAnalyzer(
+            TEST_RULES, TEST_INSTANCES, self.checkpoint, checkpoint_lines=2
+        )
+        self.assertEqual(5, analyzer.read([self.path]).flows)
+        checkpoint = FlowLogCheckpoint.load(self.checkpoint)
+        self.assertEqual(analyzer.checkpoint, checkpoint)
+
+        # nothing new is counted again
+        resumed = FlowLogAnalyzer(TEST_RULES, TEST_INSTANCES, self.checkpoint)
+        self.assertEqual(5, resumed.read([self.path]).flows)
+
+        # a line still being written is read once complete
+        line = json.dumps(TEST_ENTRIES[0])
+        with open(self.path, "a") as lines:
+            lines.write(line[:20])
+        self.assertEqual(5, resumed.read([self.path]).flows)
+        with open(self.path, "a") as lines:
+            lines.write(line[20:] + "\n")
+        resumed = FlowLogAnalyzer(TEST_RULES, TEST_INSTANCES, self.checkpoint)
+        report = resumed.read([self.path])
+        self.assertEqual((6, 3), (report.flows, report.hits["allow-web"]))
+
+    def test_replaced_file(self):
+        FlowLogAnalyzer(TEST_RULES, TEST_INSTANCES, self.checkpoint).read([self.path])
+
+        # a new export written over the one read, larger and on the same inode
+        lines = [json.dumps(entry) for entry in reversed(TEST_ENTRIES)] * 2
+        self.path.write_text("\n".join(lines) + "\n")
+        resumed = FlowLogAnalyzer(TEST_RULES, TEST_INSTANCES, self.checkpoint)
+        self.assertEqual(15, resumed.read([self.path]).flows)
+
+    def test_checkpoint_of_other_rules(self):
+        FlowLogAnalyzer(TEST_RULES, TEST_INSTANCES, self.checkpoint).read([self.path])
+
+        other = FlowLogAnalyzer(TEST_RULES[:2], TEST_INSTANCES, self.checkpoint)
+        self.assertEqual(0, other.checkpoint.flows)
+        self.assertEqual(5, other.read([self.path]).flows)
+        resumed = FlowLogAnalyzer(TEST_RULES[:2], TEST_INSTANCES, self.checkpoint)
+        self.assertEqual(5, resumed.read([self.path]).flows)
+
+    def test_unreadable_checkpoint(self):
+        self.checkpoint.write_text("not a checkpoint")
+        self.assertIsNone(FlowLogCheckpoint.load(self.checkpoint))
+        analyzer = FlowLogAnalyzer(TEST_RULES, checkpoint_path=self.checkpoint)
+        self.assertEqual(0, analyzer.checkpoint.flows)
+        with self.assertRaises(ValueError):
+            FlowLogAnalyzer(TEST_RULES, checkpoint_lines=0)
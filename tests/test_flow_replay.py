@@ -0,0 +1,131 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from pulumi_gcp_network.firewall_matcher import FirewallMatcher
+from pulumi_gcp_network.flow_replay import (
+    Flow,
+    compare_rules,
+    count_flows,
+    read_flow_counts,
+    read_flows,
+    replay_flows,
+)
+
+TEST_RULES = [
+    {
+        "name": "allow-web",
+        "ranges": ["0.0.0.0/0"],
+        "target_tags": ["web"],
+        "allow": [{"protocol": "tcp", "ports": ["80", "443"]}],
+    },
+    {
+        "name": "allow-db-from-web",
+        "source_tags": ["web"],
+        "target_tags": ["db"],
+        "allow": [{"protocol": "tcp", "ports": ["5432"]}],
+    },
+    {
+        "name": "deny-egress-smtp",
+        "direction": "EGRESS",
+        "ranges": ["0.0.0.0/0"],
+        "deny": [{"protocol": "tcp", "ports": ["25"]}],
+    },
+]
+
+TEST_FLOWS = [
+    Flow("1.2.3.4", "10.0.0.2", "tcp", 443, tags=("web",)),
+    Flow("1.2.3.4", "10.0.0.2", "tcp", 443, tags=("web",)),
+    Flow("1.2.3.4", "10.0.0.2", "tcp", 22, tags=("web",)),
+    Flow("10.0.0.2", "10.0.1.2", "tcp", 5432, tags=("db",), source_tags=("web",)),
+    Flow("10.0.0.2", "8.8.8.8", "tcp", 25, "EGRESS", ("web",)),
+    Flow("10.0.0.2", "8.8.8.8", "udp", 53, "EGRESS"),
+]
+
+
+class TestingFlowReplay(unittest.TestCase):
+    def test_replay_flows(self):
+        report = replay_flows(TEST_RULES, TEST_FLOWS)
+        self.assertEqual(
+            (6, 5, 4, 2),
+            (report.flows, report.distinct_flows, report.allowed, report.denied),
+        )
+        self.assertEqual(
+            {
+                "allow-web": 2,
+                "implied-deny-ingress": 1,
+                "allow-db-from-web": 1,
+                "deny-egress-smtp": 1,
+                "implied-allow-egress": 1,
+            },
+            report.hits,
+        )
+        self.assertEqual("allow-web", next(iter(report.hits)))
+
+    def test_count_flows(self):
+        counts = count_flows([tuple(flow) for flow in TEST_FLOWS])
+        self.assertEqual(2, counts[TEST_FLOWS[0]])
+        self.assertEqual(5, len(counts))
+
+    def test_integer_addresses(self):
+        matcher = FirewallMatcher(TEST_RULES)
+        self.assertEqual(
+            replay_flows(matcher, TEST_FLOWS[:3]).hits,
+            replay_flows(
+                matcher,
+                [(0x01020304, 0x0A000002, "tcp", 443, "INGRESS", ("web",))] * 2
+                + [(0x01020304, 0x0A000002, "6", 22, "INGRESS", ("web",))],
+            ).hits,
+        )
+
+    def test_compare_rules(self):
+        after = TEST_RULES[:2] + [
+            {
+                "name": "deny-ssh",
+                "ranges": ["0.0.0.0/0"],
+                "deny": [{"protocol": "tcp", "ports": ["22", "443"]}],
+                "priority": 900,
+            }
+        ]
+        report = compare_rules(TEST_RULES, after, TEST_FLOWS)
+        self.assertEqual(
+            [
+                (TEST_FLOWS[0], 2, "allow-web", "deny-ssh"),
+                (TEST_FLOWS[2], 1, "implied-deny-ingress", "deny-ssh"),
+                (TEST_FLOWS[4], 1, "deny-egress-smtp", "implied-allow-egress"),
+            ],
+            [
+                (change.flow, change.flows, change.before.rule, change.after.rule)
+                for change in report.changed
+            ],
+        )
+        self.assertEqual(
+            "4 of 6 flows decided differently: "
+            "1 newly allowed, 2 newly denied, 1 by another rule",
+            report.summary(),
+        )
+
+    def test_read_flows(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "flows.csv"
+            path.write_text(
+                "source,destination,port,tags,source_tags,direction\n"
+                "1.2.3.4,10.0.0.2,443,web,,\n"
+                "10.0.0.2,10.0.1.2,5432,db;backup,web,INGRESS\n"
+                "\n"
+                "10.0.0.2,8.8.8.8,25,web,,EGRESS\n"
+            )
+            self.assertEqual(
+                [
+                    TEST_FLOWS[0],
+                    TEST_FLOWS[3]._replace(tags=("db", "backup")),
+                    TEST_FLOWS[4],
+                ],
+                list(read_flows(path)),
+            )
+
+            self.assertEqual(count_flows(read_flows(path)), read_flow_counts(path))
+
+            path.write_text("source,destination,bytes\n")
+            with self.assertRaises(ValueError):
+                list(read_flows(path))
@@ -0,0 +1,112 @@
+import json
+import os
+import tempfile
+import unittest
+
+import pulumi
+
+
+class TestMocks(pulumi.runtime.Mocks):
+    def new_resource(self, args: pulumi.runtime.MockResourceArgs):
+        return [args.name + "_id", args.inputs]
+
+    def call(self, args: pulumi.runtime.MockCallArgs):
+        return {}
+
+
+pulumi.runtime.set_mocks(TestMocks())
+
+# It's important to import _after_ the mocks are defined.
+from pulumi_gcp_network import instrumentation  # noqa isort:skip
+from pulumi_gcp_network.routes import Routes  # noqa isort:skip type: ignore
+
+TEST_ROUTES = [
+    {"destination_range": "10.1.0.0/24", "next_hop_ip": "10.0.0.2", "tags": "a"},
+    {"destination_range": "10.2.0.0/24", "next_hop_internet": True},
+]
+
+
+class TestingCollector(unittest.TestCase):
+    def setUp(self):
+        instrumentation.disable()
+        self.addCleanup(instrumentation.disable)
+
+    def test_disabled_span_records_nothing(self):
+        with instrumentation.span("noop", "test"):
+            pass
+        self.assertIsNone(instrumentation.get_collector())
+
+    def test_stats_and_summary(self):
+        collector = instrumentation.enable()
+        for _ in range(3):
+            with instrumentation.span("work", "test"):
+                pass
+        with instrumentation.span("other", "test"):
+            pass
+
+        stats = {stats.name: stats for stats in collector.stats()}
+        self.assertEqual(3, stats["work"].calls)
+        self.assertEqual(1, stats["other"].calls)
+        self.assertGreaterEqual(stats["work"].total, stats["work"].max)
+
+        summary = collector.format_summary().splitlines()
+        self.assertEqual(3, len(summary))
+        self.assertTrue(summary[0].startswith("category"))
+
+    def test_instrumented_decorator(self):
+        @instrumentation.instrumented("convert")
+        def double(value):
+            return value * 2
+
+        self.assertEqual(4, double(2))
+        collector = instrumentation.enable()
+        self.assertEqual(6, double(3))
+        self.assertEqual(["convert"], [span.category for span in collector.spans])
+        self.assertIn("double", collector.spans[0].name)
+
+    def test_chrome_trace(self):
+        collector = instrumentation.enable()
+        with instrumentation.span("work", "test"):
+            pass
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.json")
+            collector.write_chrome_trace(path)
+            with open(path) as trace_file:
+                trace = json.load(trace_file)
+
+        (event,) = trace["traceEvents"]
+        self.assertEqual("X", event["ph"])
+        self.assertEqual("work", event["name"])
+        self.assertEqual("test", event["cat"])
+        self.assertGreaterEqual(event["dur"], 0)
+
+    def test_configure_from_env(self):
+        self.assertIsNone(instrumentation.configure_from_env({}))
+        self.assertIsNone(
+            instrumentation.configure_from_env({instrumentation.ENV_VAR: "0"})
+        )
+        self.assertIsNone(instrumentation.get_collector())
+
+
+class TestingComponentInstrumentation(unittest.TestCase):
+    def setUp(self):
+        instrumentation.disable()
+        self.addCleanup(instrumentation.disable)
+
+    @pulumi.runtime.test
+    def test_routes_spans(self):
+        collector = instrumentation.enable()
+        Routes(
+            "test-instrumented-routes",
+            project_id="test",
+            network_name="test-network",
+            routes=TEST_ROUTES,
+        )
+        counts = {
+            (stats.category, stats.name): stats.calls for stats in collector.stats()
+        }
+        self.assertEqual(1, counts[("component", "Routes")])
+        self.assertEqual(1, counts[("validate", "RoutesArgs")])
+        self.assertEqual(2, counts[("register", "gcp.compute.Route")])
+        self.assertEqual(2, counts[("convert", "Routes.get_tags")])
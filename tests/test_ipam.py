@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+
+from pulumi_gcp_network.ipam import (
+    SUBNET_RESERVED_ADDRESSES,
+    BuddyAllocator,
+    IpamError,
+    prefix_length_for_hosts,
+    read_allocations,
+    write_allocations,
+)
+
+
+class TestingBuddyAllocator(unittest.TestCase):
+    def test_allocate_mixed_sizes(self):
+        allocator = BuddyAllocator("10.0.0.0/16")
+        self.assertEqual("10.0.0.0/24", allocator.allocate(24))
+        self.assertEqual("10.0.16.0/20", allocator.allocate(20))
+        self.assertEqual("10.0.1.0/24", allocator.allocate(24))
+        self.assertEqual("10.0.2.0/23", allocator.allocate(23))
+
+    def test_deterministic(self):
+        requests = [24, 20, 26, 24, 22, 28]
+        first = BuddyAllocator("10.0.0.0/16")
+        second = BuddyAllocator("10.0.0.0/16")
+        self.assertEqual(
+            [first.allocate(p) for p in requests],
+            [second.allocate(p) for p in requests],
+        )
+
+    def test_reserve(self):
+        allocator = BuddyAllocator("10.0.0.0/16")
+        self.assertTrue(allocator.reserve("10.0.0.0/24"))
+        self.assertFalse(allocator.reserve("192.168.0.0/24"))
+        self.assertFalse(allocator.reserve("fd00::/64"))
+        self.assertEqual("10.0.1.0/24", allocator.allocate(24))
+
+    def test_claim(self):
+        allocator = BuddyAllocator("10.0.0.0/16")
+        self.assertTrue(allocator.claim("10.0.2.0/24", 24))
+        self.assertFalse(allocator.claim("10.0.2.0/24"))
+        self.assertFalse(allocator.claim("10.0.2.0/23"))
+        self.assertFalse(allocator.claim("10.0.4.0/24", 23))
+        self.assertFalse(allocator.claim("10.0.4.1/24"))
+        self.assertFalse(allocator.claim("192.168.0.0/24"))
+        self.assertFalse(allocator.claim("not a range"))
+        # the buddy of the claimed range is the tightest fit
+        self.assertEqual(
+            ["10.0.3.0/24", "10.0.0.0/24", "10.0.1.0/24"],
+            [allocator.allocate(24) for _ in range(3)],
+        )
+
+    def test_reserve_covering_supernet(self):
+        allocator = BuddyAllocator("10.1.0.0/16")
+        self.assertTrue(allocator.reserve("10.0.0.0/8"))
+        with self.assertRaises(IpamError):
+            allocator.allocate(24)
+
+    def test_exhaustion_and_release(self):
+        allocator = BuddyAllocator("10.0.0.0/23")
+        first = allocator.allocate(24)
+        allocator.allocate(24)
+        with self.assertRaises(IpamError):
+            allocator.allocate(24)
+        allocator.release(first)
+        self.assertEqual(first, allocator.allocate(24))
+
+    def test_release_merges_buddies(self):
+        allocator = BuddyAllocator("10.0.0.0/16")
+        blocks = [allocator.allocate(24) for _ in range(256)]
+        self.assertEqual(0, allocator.free_blocks)
+        for block in blocks:
+            allocator.release(block)
+        self.assertEqual(1, allocator.free_blocks)
+        self.assertEqual("10.0.0.0/16", allocator.allocate(16))
+
+    def test_ipv6(self):
+        allocator = BuddyAllocator("fd00::/48")
+        self.assertEqual("fd00::/64", allocator.allocate(64))
+        self.assertEqual("fd00:0:0:1::/64", allocator.allocate(64))
+
+    def test_prefix_length_for_hosts(self):
+        self.assertEqual(24, prefix_length_for_hosts(256))
+        self.assertEqual(
+            23, prefix_length_for_hosts(256, 32, SUBNET_RESERVED_ADDRESSES)
+        )
+        self.assertEqual(32, prefix_length_for_hosts(1))
+        with self.assertRaises(IpamError):
+            prefix_length_for_hosts(0)
+
+
+class TestingAllocationsFile(unittest.TestCase):
+    def test_roundtrip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "allocations.json")
+            self.assertEqual({}, read_allocations(path))
+            allocations = {"b": "10.0.1.0/24", "a": "10.0.0.0/24"}
+            write_allocations(path, allocations)
+            self.assertEqual(allocations, read_allocations(path))
+            self.assertEqual(
+                [path],
+                [os.path.join(directory, name) for name in os.listdir(directory)],
+            )
+
+            with open(path, "w") as allocations_file:
+                allocations_file.write("[]")
+            with self.assertRaises(IpamError):
+                read_allocations(path)
@@ -0,0 +1,149 @@
+import os
+import tempfile
+import unittest
+
+from pulumi_gcp_network.firewall_rules import (
+    FirewallDirectionEnum,
+    FirewallLogConfigMetadataEnum,
+    FirewallRulesAllowDenyArgs,
+)
+from pulumi_gcp_network.loaders import (
+    iter_records,
+    load_firewall_rules,
+    load_routes,
+    load_secondary_ranges,
+    load_subnets,
+)
+from pulumi_gcp_network.validation import BulkValidationError
+
+try:
+    import yaml  # noqa
+except ImportError:  # pragma: no cover
+    yaml = None
+
+TEST_RULES_CSV = """\
+name,description,direction,priority,ranges,allow,deny,target_tags,log_config
+ssh,"spans
+two lines",INGRESS,1000,10.0.0.0/8;192.168.0.0/16,tcp:22,,web;db,
+bad,,INGRESS,-1,,tcp:80,,,
+deny-all,,EGRESS,,0.0.0.0/0,,all,,"{""metadata"": ""EXCLUDE_ALL_METADATA""}"
+"""
+
+TEST_RANGES_YAML = """\
+- subnet_name: subnet-01
+  range_name: pods
+  ip_cidr_range: 10.1.0.0/16
+- subnet_name: subnet-01
+  range_name: services
+  prefix_length: 20
+- subnet_name: subnet-02
+  range_name: pods
+  ip_cidr_range: 10.2.0.0/16
+"""
+
+TEST_SUBNETS_YAML = """\
+subnet_name: subnet-01
+subnet_ip: 10.10.10.0/24
+subnet_region: us-west1
+---
+subnet_name: subnet-02
+subnet_region: us-west1
+"""
+
+TEST_ROUTES_JSONL = """\
+{"destination_range": "10.0.0.0/8", "next_hop_ip": "10.10.0.2"}
+
+not json
+{"destination_range": "10.1.0.0/16", "priority": 5}
+"""
+
+
+class TestingLoaders(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write(self, name: str, content: str) -> str:
+        path = os.path.join(self.directory, name)
+        with open(path, "w") as records_file:
+            records_file.write(content)
+        return path
+
+    def test_csv(self):
+        loaded = []
+        with self.assertRaises(BulkValidationError) as context:
+            for rule in load_firewall_rules(self.write("rules.csv", TEST_RULES_CSV)):
+                loaded.append(rule)
+
+        ssh, deny_all = loaded
+        self.assertEqual("spans\ntwo lines", ssh.description)
+        self.assertEqual(["10.0.0.0/8", "192.168.0.0/16"], ssh.ranges)
+        self.assertEqual(["web", "db"], ssh.target_tags)
+        self.assertEqual(
+            [FirewallRulesAllowDenyArgs(protocol="tcp", ports=["22"])], ssh.allow
+        )
+        self.assertIsNone(ssh.log_config)
+        self.assertIs(FirewallDirectionEnum.EGRESS, deny_all.direction)
+        self.assertEqual(
+            [FirewallRulesAllowDenyArgs(protocol="all", ports=[])], deny_all.deny
+        )
+        self.assertEqual(
+            FirewallLogConfigMetadataEnum.EXCLUDE_ALL_METADATA,
+            deny_all.log_config.metadata,
+        )
+        self.assertEqual(
+            {"name", "direction", "ranges", "deny", "log_config"},
+            deny_all.__fields_set__,
+        )
+        # the record after the multiline cell starts on line 4
+        self.assertEqual(
+            [(4, "priority")], [error["loc"] for error in context.exception.errors]
+        )
+        self.assertIn("rules.csv", str(context.exception))
+
+    def test_jsonl(self):
+        path = self.write("routes.jsonl", TEST_ROUTES_JSONL)
+        self.assertEqual([1, 3, 4], [line for line, _ in iter_records(path)])
+        with self.assertRaises(BulkValidationError) as context:
+            list(load_routes(path))
+        self.assertEqual(
+            [((3,), "invalid JSON: Expecting value at column 1")],
+            [(error["loc"], error["msg"]) for error in context.exception.errors],
+        )
+
+    def test_is_lazy(self):
+        routes = load_routes(self.write("routes.jsonl", TEST_ROUTES_JSONL))
+        self.assertEqual("10.0.0.0/8", next(routes).destination_range)
+
+    @unittest.skipIf(yaml is None, "PyYAML is not installed")
+    def test_yaml_sequence(self):
+        ranges = load_secondary_ranges(self.write("ranges.yaml", TEST_RANGES_YAML))
+        self.assertEqual(["subnet-01", "subnet-02"], list(ranges))
+        self.assertEqual(
+            ["pods", "services"], [r.range_name for r in ranges["subnet-01"]]
+        )
+        self.assertEqual(
+            {"range_name", "prefix_length"}, ranges["subnet-01"][1].__fields_set__
+        )
+        self.assertNotIn("subnet_name", ranges["subnet-02"][0].dict())
+
+    @unittest.skipIf(yaml is None, "PyYAML is not installed")
+    def test_yaml_documents(self):
+        path = self.write("subnets.yml", TEST_SUBNETS_YAML)
+        self.assertEqual([1, 5], [line for line, _ in iter_records(path)])
+        with self.assertRaises(BulkValidationError) as context:
+            list(load_subnets(path))
+        self.assertEqual(
+            [(5, "__root__")], [error["loc"] for error in context.exception.errors]
+        )
+
+    def test_empty_file(self):
+        self.assertEqual([], list(load_routes(self.write("routes.jsonl", ""))))
+
+    def test_unknown_format(self):
+        with self.assertRaisesRegex(ValueError, "Unknown format"):
+            list(iter_records(self.write("routes.json", "[]")))
+        self.assertEqual(
+            1, len(list(iter_records(self.write("routes.txt", "{}"), "jsonl")))
+        )
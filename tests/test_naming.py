@@ -0,0 +1,49 @@
+import unittest
+
+import pulumi
+
+from pulumi_gcp_network.naming import (
+    ResourceNamingEnum,
+    check_unique_names,
+    digest,
+    root_aliases,
+    stable_resource_name,
+)
+
+
+class TestingNaming(unittest.TestCase):
+    def test_index_naming(self):
+        name, aliases = stable_resource_name(
+            ResourceNamingEnum.INDEX, "rule-ssh-3", "rule-ssh"
+        )
+        self.assertEqual("rule-ssh-3", name)
+        self.assertIsNone(aliases)
+
+    def test_name_naming_aliases_index_name(self):
+        name, aliases = stable_resource_name(
+            ResourceNamingEnum.NAME, "rule-ssh-3", "rule-ssh"
+        )
+        self.assertEqual("rule-ssh", name)
+        self.assertEqual(1, len(aliases))
+        self.assertEqual("rule-ssh-3", aliases[0].name)
+
+    def test_root_aliases(self):
+        aliases = root_aliases([pulumi.Alias(name="rule-ssh-3")])
+        self.assertEqual(
+            [
+                ("rule-ssh-3", ...),
+                (..., pulumi.ROOT_STACK_RESOURCE),
+                ("rule-ssh-3", pulumi.ROOT_STACK_RESOURCE),
+            ],
+            [(alias.name, alias.parent) for alias in aliases],
+        )
+        self.assertEqual(1, len(root_aliases(None)))
+
+    def test_check_unique_names(self):
+        check_unique_names(["a", "b"], "rule")
+        with self.assertRaisesRegex(ValueError, "Duplicate rule names.*: a"):
+            check_unique_names(["a", "b", "a"], "rule")
+
+    def test_digest(self):
+        self.assertEqual(digest("10.0.0.0/8", 1000), digest("10.0.0.0/8", 1000))
+        self.assertNotEqual(digest("10.0.0.0/8", 1000), digest("10.0.0.0/8", 900))
@@ -0,0 +1,257 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import pulumi
+
+
+class TestMocks(pulumi.runtime.Mocks):
+    def new_resource(self, args: pulumi.runtime.MockResourceArgs):
+        return [args.name + "_id", args.inputs]
+
+    def call(self, args: pulumi.runtime.MockCallArgs):
+        return {}
+
+
+pulumi.runtime.set_mocks(TestMocks())
+
+# It's important to import _after_ the mocks are defined.
+from pulumi_gcp_network.cache import SpecCache  # noqa isort:skip
+from pulumi_gcp_network.network import Network  # noqa isort:skip type: ignore
+from pulumi_gcp_network.scheduling import RegistrationScheduler  # noqa isort:skip
+from pulumi_gcp_network.validation import BulkValidationError  # noqa isort:skip
+
+TEST_NAME = "test-network"
+TEST_PROJECT_ID = "test"
+TEST_NETWORK_NAME = "test-network"
+TEST_SUBNETS = [
+    {
+        "subnet_name": f"test-subnet-{i}",
+        "subnet_ip": f"10.10.{i}.0/24",
+        "subnet_region": "us-west1",
+    }
+    for i in range(6)
+]
+TEST_SECONDARY_RANGES = {
+    "test-subnet-0": [{"range_name": "pods", "ip_cidr_range": "192.168.0.0/24"}]
+}
+TEST_ROUTES = [
+    {"destination_range": f"172.16.{i}.0/24", "next_hop_ip": "10.10.0.2"}
+    for i in range(5)
+]
+TEST_FIREWALL_RULES = [
+    {
+        "name": f"test-rule-{i}",
+        "ranges": [f"10.20.{i}.0/24"],
+        "allow": [{"protocol": "tcp", "ports": ["22"]}],
+    }
+    for i in range(5)
+]
+
+
+class TestingNetworkValidation(unittest.TestCase):
+    def test_validate_inputs(self):
+        spec = Network.validate_inputs(
+            TEST_SUBNETS,
+            TEST_SECONDARY_RANGES,
+            TEST_ROUTES,
+            TEST_FIREWALL_RULES,
+            workers=2,
+            chunk_size=2,
+        )
+        self.assertEqual(
+            [subnet["subnet_name"] for subnet in TEST_SUBNETS],
+            [subnet.subnet_name for subnet in spec.subnets],
+        )
+        self.assertEqual(
+            "192.168.0.0/24", spec.secondary_ranges["test-subnet-0"][0].ip_cidr_range
+        )
+        self.assertEqual("172.16.4.0/24", spec.routes[4].destination_range)
+        self.assertEqual(["22"], spec.firewall_rules[0].allow[0].ports)
+
+    def test_validate_inputs_errors(self):
+        with self.assertRaisesRegex(BulkValidationError, "firewall_rules"):
+            Network.validate_inputs(
+                [], {}, [], [{"name": "bad", "priority": -1}], workers=2
+            )
+
+    @pulumi.runtime.test
+    def test_network_with_validation_workers(self):
+        network = Network(
+            TEST_NAME,
+            project_id=TEST_PROJECT_ID,
+            network_name=TEST_NETWORK_NAME,
+            subnets=TEST_SUBNETS,  # type: ignore
+            secondary_ranges=TEST_SECONDARY_RANGES,  # type: ignore
+            routes=TEST_ROUTES,  # type: ignore
+            firewall_rules=TEST_FIREWALL_RULES,  # type: ignore
+            validation_workers=2,
+        )
+        self.assertEqual(6, len(network.subnets.created_subnetworks))
+        self.assertEqual(5, len(network.routes.created_routes))
+        self.assertEqual(5, len(network.firewall_rules.created_firewall_rules))
+
+    @pulumi.runtime.test
+    def test_network_with_spec_cache(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        spec_cache = SpecCache(directory.name)
+        for _ in range(2):
+            network = Network(
+                TEST_NAME,
+                project_id=TEST_PROJECT_ID,
+                network_name=TEST_NETWORK_NAME,
+                subnets=TEST_SUBNETS,  # type: ignore
+                secondary_ranges=TEST_SECONDARY_RANGES,  # type: ignore
+                routes=TEST_ROUTES,  # type: ignore
+                firewall_rules=TEST_FIREWALL_RULES,  # type: ignore
+                spec_cache=spec_cache,
+            )
+        self.assertEqual((1, 1), (spec_cache.hits, spec_cache.misses))
+        self.assertEqual(5, len(network.firewall_rules.created_firewall_rules))
+
+    @pulumi.runtime.test
+    def test_network_with_spec_snapshot(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        snapshot_path = os.path.join(directory.name, "spec-snapshot")
+        for rules in (TEST_FIREWALL_RULES, TEST_FIREWALL_RULES[1:]):
+            network = Network(
+                TEST_NAME,
+                project_id=TEST_PROJECT_ID,
+                network_name=TEST_NETWORK_NAME,
+                subnets=TEST_SUBNETS,  # type: ignore
+                routes=TEST_ROUTES,  # type: ignore
+                firewall_rules=rules,  # type: ignore
+                spec_snapshot=snapshot_path,
+            )
+        self.assertEqual(["test-rule-0"], network.spec_diff.removed["firewall_rules"])
+        self.assertEqual(4, len(network.firewall_rules.created_firewall_rules))
+
+    def test_spec_snapshot_and_cache(self):
+        with self.assertRaisesRegex(ValueError, "cannot be combined"):
+            Network(
+                TEST_NAME,
+                project_id=TEST_PROJECT_ID,
+                network_name=TEST_NETWORK_NAME,
+                spec_cache=SpecCache("unused"),
+                spec_snapshot="unused",
+            )
+
+
+class TestingNetworkGraph(unittest.TestCase):
+    @pulumi.runtime.test
+    def setUp(self):
+        self.network = Network(
+            TEST_NAME,
+            project_id=TEST_PROJECT_ID,
+            network_name=TEST_NETWORK_NAME,
+            subnets=TEST_SUBNETS,  # type: ignore
+            routes=TEST_ROUTES,  # type: ignore
+            firewall_rules=TEST_FIREWALL_RULES,  # type: ignore
+        )
+
+    @pulumi.runtime.test
+    def test_resources_are_parented_to_the_network(self):
+        network = self.network
+        children = [
+            ("Vpc", "network", network.vpc, network.vpc.vpc),
+            (
+                "Subnets",
+                "subnetwork",
+                network.subnets,
+                network.subnets.created_subnetworks[0],
+            ),
+            ("Routes", "route", network.routes, network.routes.created_routes[0]),
+            (
+                "FirewallRules",
+                "firewall",
+                network.firewall_rules,
+                network.firewall_rules.created_firewall_rules[0],
+            ),
+        ]
+        expected, urns = [], []
+        for component, resource_type, child, resource in children:
+            component = f"zityspace-gcp:network:{component}"
+            expected += [
+                f"zityspace-gcp:network:Network${component}::",
+                f"{component}$gcp:compute/{resource_type}:",
+            ]
+            urns += [child.urn, resource.urn]
+
+        def check_parents(urns):
+            for parents, urn in zip(expected, urns):
+                self.assertIn(parents, urn)
+
+        return pulumi.Output.all(*urns).apply(check_parents)
+
+    def test_routes_depend_on_next_hop_subnets(self):
+        self.assertEqual(
+            {"10.10.0.2", "ilb"},
+            Network.get_next_hop_addresses(
+                TEST_ROUTES  # type: ignore
+                + [{"destination_range": "0.0.0.0/0", "next_hop_ilb": "ilb"}]
+            ),
+        )
+        subnetworks = self.network.subnets.created_subnetworks
+        self.assertEqual(
+            [subnetworks[0], subnetworks[3]],
+            self.network.subnets.subnetworks_containing(
+                ["10.10.3.9", "ilb", "192.0.2.1", "10.10.0.2"]
+            ),
+        )
+
+    @pulumi.runtime.test
+    def test_registered_outputs(self):
+        def check_outputs(outputs):
+            self.assertEqual(
+                ["network_name", "network_id", "network_self_link"]
+                + ["subnets", "subnets_by_region", "routes", "firewall_rules"],
+                list(outputs),
+            )
+            self.assertEqual(
+                len(self.network.subnets.created_subnetworks), len(outputs["subnets"])
+            )
+
+        return pulumi.Output.from_input(self.network.registered_outputs).apply(
+            check_outputs
+        )
+
+
+class TestingNetworkScheduler(unittest.TestCase):
+    @pulumi.runtime.test
+    def test_registration_report(self):
+        network = Network(
+            TEST_NAME,
+            project_id=TEST_PROJECT_ID,
+            network_name=TEST_NETWORK_NAME,
+            subnets=TEST_SUBNETS,  # type: ignore
+            routes=TEST_ROUTES,  # type: ignore
+            firewall_rules=TEST_FIREWALL_RULES,  # type: ignore
+            registration_scheduler=RegistrationScheduler(wave_size=4),
+        )
+
+        def check_report(report):
+            self.assertEqual(16, report.resources)
+            self.assertEqual(4, report.wave_size)
+
+        return network.registration_report.apply(check_report)  # type: ignore
+
+    @pulumi.runtime.test
+    def test_without_scheduler(self):
+        network = Network(
+            TEST_NAME, project_id=TEST_PROJECT_ID, network_name=TEST_NETWORK_NAME
+        )
+        self.assertIsNone(network.registration_report)
+
+
+class TestingImports(unittest.TestCase):
+    def test_pulumi_gcp_is_imported_by_components_only(self):
+        code = (
+            "import sys, pulumi_gcp_network.network, pulumi_gcp_network.loaders; "
+            "print('pulumi_gcp' in sys.modules)"
+        )
+        output = subprocess.check_output([sys.executable, "-c", code])
+        self.assertEqual(b"False", output.strip())
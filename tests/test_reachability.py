@@ -0,0 +1,169 @@
+import unittest
+
+from pulumi_gcp_network.reachability import ReachabilityEngine, ReachabilityQuery
+from pulumi_gcp_network.spec import NetworkSpec
+
+TEST_SUBNETS = [
+    {
+        "subnet_name": "subnet-01",
+        "subnet_ip": "10.10.10.0/24",
+        "subnet_region": "us-west1",
+    },
+    {
+        "subnet_name": "subnet-02",
+        "subnet_ip": "10.20.0.0/16",
+        "subnet_region": "us-west1",
+    },
+]
+TEST_SECONDARY_RANGES = {
+    "subnet-01": [{"range_name": "pods", "ip_cidr_range": "192.168.0.0/24"}],
+}
+TEST_ROUTES = [
+    {
+        "name": "egress-inet",
+        "destination_range": "0.0.0.0/0",
+        "next_hop_internet": True,
+    },
+]
+TEST_FIREWALL_RULES = [
+    {
+        "name": "allow-db-from-web",
+        "source_tags": ["web"],
+        "target_tags": ["db"],
+        "allow": [{"protocol": "tcp", "ports": ["5432"]}],
+    },
+    {
+        "name": "allow-ssh-iap",
+        "ranges": ["35.235.240.0/20"],
+        "allow": [{"protocol": "tcp", "ports": ["22"]}],
+        "priority": 800,
+    },
+    {
+        "name": "deny-ssh",
+        "ranges": ["0.0.0.0/0"],
+        "deny": [{"protocol": "tcp", "ports": ["22"]}],
+        "priority": 900,
+    },
+    {
+        "name": "allow-app-internal",
+        "ranges": ["10.10.10.0/24"],
+        "target_tags": ["app"],
+        "allow": [{"protocol": "all", "ports": []}],
+    },
+    {
+        "name": "deny-egress-smtp",
+        "direction": "EGRESS",
+        "ranges": ["0.0.0.0/0"],
+        "deny": [{"protocol": "tcp", "ports": ["25"]}],
+    },
+]
+
+
+class TestingReachability(unittest.TestCase):
+    def setUp(self):
+        self.engine = ReachabilityEngine.from_args(
+            TEST_SUBNETS, TEST_SECONDARY_RANGES, TEST_ROUTES, TEST_FIREWALL_RULES
+        )
+
+    def test_tagged_instances(self):
+        query = ReachabilityQuery(
+            "subnet-01",
+            "10.20.0.5",
+            5432,
+            source_tags=("web",),
+            destination_tags=("db",),
+        )
+        result = self.engine.check(query)
+        self.assertTrue(result.reachable)
+        self.assertEqual(["subnet-subnet-02"], [route.name for route in result.routes])
+        self.assertEqual("allow-db-from-web", result.ingress.rule)  # type: ignore
+        self.assertEqual(
+            "allowed by implied-allow-egress and allow-db-from-web "
+            "via subnet-subnet-02",
+            result.describe(),
+        )
+
+        result = self.engine.check(query._replace(source_tags=()))
+        self.assertFalse(result.reachable)
+        self.assertEqual("ingress denied by implied-deny-ingress", result.describe())
+
+    def test_internet(self):
+        result = self.engine.check(ReachabilityQuery("subnet-01", "8.8.8.8", 443))
+        self.assertTrue(result.reachable)
+        self.assertIsNone(result.ingress)
+        self.assertEqual("egress-inet", result.routes[0].name)
+
+        result = self.engine.check(ReachabilityQuery("subnet-01", "8.8.8.8", 25))
+        self.assertEqual("egress denied by deny-egress-smtp", result.describe())
+
+    def test_source_ranges(self):
+        query = ReachabilityQuery("35.235.240.7", "10.10.10.2", 22)
+        self.assertEqual("allow-ssh-iap", self.engine.check(query).ingress.rule)
+        query = query._replace(source="1.2.3.4")
+        self.assertEqual("deny-ssh", self.engine.check(query).ingress.rule)
+
+        # a subnet matches ranges containing all of it
+        query = ReachabilityQuery(
+            "subnet-01", "10.20.0.5", 8443, destination_tags=("app",)
+        )
+        self.assertTrue(self.engine.check(query).reachable)
+        self.assertFalse(
+            self.engine.check(query._replace(source="subnet-01/pods")).reachable
+        )
+        self.assertFalse(
+            self.engine.check(query._replace(source="10.10.0.0/16")).reachable
+        )
+
+    def test_destination_ranges(self):
+        query = ReachabilityQuery(
+            "subnet-01",
+            "subnet-02",
+            5432,
+            source_tags=("web",),
+            destination_tags=("db",),
+        )
+        result = self.engine.check(query)
+        self.assertTrue(result.reachable)
+        self.assertEqual(["subnet-subnet-02"], [route.name for route in result.routes])
+        self.assertEqual("allow-db-from-web", result.ingress.rule)  # type: ignore
+
+        result = self.engine.check(query._replace(destination="10.20.0.0/16", port=25))
+        self.assertEqual("egress denied by deny-egress-smtp", result.describe())
+
+        queries = [query, query._replace(destination="subnet-01/pods")]
+        self.assertEqual(
+            [self.engine.check(query) for query in queries],
+            self.engine.check_many(queries),
+        )
+
+    def test_no_route(self):
+        result = self.engine.check(ReachabilityQuery("subnet-01", "2001:db8::1", 443))
+        self.assertFalse(result.reachable)
+        self.assertEqual("no route", result.describe())
+
+    def test_check_many(self):
+        queries = [
+            ReachabilityQuery(
+                "subnet-01",
+                f"10.20.{i % 4}.5",
+                port,
+                source_tags=tags,
+                destination_tags=("db",),
+            )
+            for i in range(8)
+            for port in (22, 5432)
+            for tags in ((), ("web",))
+        ]
+        self.assertEqual(
+            [self.engine.check(query) for query in queries],
+            self.engine.check_many(queries),
+        )
+
+    def test_from_spec(self):
+        spec = NetworkSpec.validate(
+            TEST_SUBNETS, TEST_SECONDARY_RANGES, TEST_ROUTES, TEST_FIREWALL_RULES
+        )
+        query = ReachabilityQuery("subnet-01", "8.8.8.8", 25)
+        self.assertEqual(
+            self.engine.check(query), ReachabilityEngine.from_spec(spec).check(query)
+        )
@@ -0,0 +1,86 @@
+import unittest
+
+from pulumi_gcp_network.firewall_rules import (
+    FirewallDirectionEnum,
+    FirewallRulesRuleArgs,
+)
+from pulumi_gcp_network.records import (
+    FirewallRuleRecord,
+    RouteRecord,
+    SecondaryRangeRecord,
+    SubnetRecord,
+    pack_port,
+    unpack_port,
+)
+from pulumi_gcp_network.routes import RoutesArgs
+from pulumi_gcp_network.subnets import SubnetsSecondaryRangeArgs, SubnetsSubnetArgs
+
+
+class TestingRecords(unittest.TestCase):
+    def test_firewall_rule(self):
+        rule = FirewallRulesRuleArgs(
+            name="web",
+            direction="EGRESS",
+            ranges=["10.0.0.0/8", "10.1/16"],
+            target_tags=["web"],
+            allow=[
+                {"protocol": "tcp", "ports": [80, "8000-8080"]},
+                {"protocol": "udp", "ports": "53"},
+            ],
+        )
+        record = FirewallRuleRecord(rule)
+        self.assertIs(FirewallDirectionEnum.EGRESS, record.direction)
+        self.assertEqual(rule.ranges, record.ranges)
+        self.assertEqual(rule.target_tags, record.target_tags)
+        self.assertIsNone(record.source_tags)
+        self.assertIsNone(record.deny)
+        self.assertEqual(
+            [entry.dict() for entry in rule.allow],  # type: ignore
+            [entry.dict() for entry in record.allow],
+        )
+        self.assertFalse(hasattr(record, "__dict__"))
+
+    def test_strings_are_shared(self):
+        first, second = (
+            FirewallRuleRecord(
+                FirewallRulesRuleArgs(
+                    name=f"rule-{i}",
+                    ranges=["10.0.0.0/8"],
+                    target_tags=["".join(["t", "ier"])],
+                    allow=[{"protocol": "tcp", "ports": ["22"]}],
+                )
+            )
+            for i in range(2)
+        )
+        self.assertIs(first.target_tags[0], second.target_tags[0])
+        self.assertIs(first.ranges[0], second.ranges[0])
+        self.assertIs(first.allow[0].ports[0], second.allow[0].ports[0])
+
+    def test_route(self):
+        route = RoutesArgs(
+            destination_range="172.16.0.0/28", next_hop_ip="10.0.0.2", tags="a, b"
+        )
+        record = RouteRecord(route)
+        for name in RoutesArgs.__fields__:
+            self.assertEqual(getattr(route, name), getattr(record, name))
+
+    def test_subnet(self):
+        subnet = SubnetsSubnetArgs(
+            subnet_name="subnet", subnet_region="us-west1", subnet_ip="10.0.0.0/24"
+        )
+        record = SubnetRecord(subnet)
+        self.assertEqual("10.0.0.0/24", record.subnet_ip)
+        self.assertEqual(
+            subnet.subnet_flow_logs_interval, record.subnet_flow_logs_interval
+        )
+        secondary_range = SecondaryRangeRecord(
+            SubnetsSecondaryRangeArgs(range_name="pods", ip_cidr_range="fd00::/64")
+        )
+        self.assertEqual("fd00::/64", secondary_range.ip_cidr_range)
+
+    def test_ports(self):
+        for port in ("0", "22", "65535", "1-65535", "22-22"):
+            self.assertIsInstance(pack_port(port), int)
+            self.assertEqual(port, unpack_port(pack_port(port)))
+        for port in ("022", "65536", "1-", "-1", "http", ""):
+            self.assertEqual(port, pack_port(port))
@@ -0,0 +1,123 @@
+import unittest
+
+from pulumi_gcp_network.route_aggregation import summarize_routes
+from pulumi_gcp_network.route_table import RouteTable
+
+
+def make_route(destination_range, name=None, next_hop_ip="10.0.0.2", **kwargs):
+    return {
+        "name": name,
+        "destination_range": destination_range,
+        "next_hop_ip": next_hop_ip,
+        **kwargs,
+    }
+
+
+class TestingSummarizeRoutes(unittest.TestCase):
+    def test_adjacent_ranges_are_merged(self):
+        routes, report = summarize_routes(
+            [
+                make_route("10.1.0.0/24", name="first"),
+                make_route("10.1.1.0/24", name="second"),
+                make_route("10.1.2.0/23"),
+            ]
+        )
+        self.assertEqual(["10.1.0.0/22"], [route.destination_range for route in routes])
+        self.assertEqual("first", routes[0].name)
+        self.assertEqual(3, report.input_routes)
+        self.assertEqual(1, report.output_routes)
+        self.assertEqual(1, len(report.summaries))
+        self.assertEqual(
+            ["10.1.0.0/24", "10.1.1.0/24", "10.1.2.0/23"],
+            report.summaries[0].merged_ranges,
+        )
+        self.assertEqual(["first", "second", None], report.summaries[0].merged_names)
+
+    def test_covered_ranges_are_dropped(self):
+        routes, report = summarize_routes(
+            [make_route("10.1.0.0/16"), make_route("10.1.5.0/24")]
+        )
+        self.assertEqual(["10.1.0.0/16"], [route.destination_range for route in routes])
+        self.assertEqual(1, len(report.summaries))
+
+    def test_different_next_hops_tags_and_priorities_are_kept(self):
+        routes, report = summarize_routes(
+            [
+                make_route("10.1.0.0/24"),
+                make_route("10.1.1.0/24", next_hop_ip="10.0.0.3"),
+                make_route("10.1.2.0/24", tags="web"),
+                make_route("10.1.3.0/24", priority=100),
+            ]
+        )
+        self.assertEqual(4, len(routes))
+        self.assertEqual([], report.summaries)
+
+    def test_tag_order_does_not_matter(self):
+        routes, _ = summarize_routes(
+            [
+                make_route("10.1.0.0/24", tags="web, db"),
+                make_route("10.1.1.0/24", tags="db,web"),
+            ]
+        )
+        self.assertEqual(["10.1.0.0/23"], [route.destination_range for route in routes])
+
+    def test_ipv6_and_ipv4_are_summarized_separately(self):
+        routes, _ = summarize_routes(
+            [
+                make_route("2001:db8::/33"),
+                make_route("10.1.0.0/24"),
+                make_route("2001:db8:8000::/33"),
+                make_route("10.1.1.0/24"),
+            ]
+        )
+        self.assertEqual(
+            ["2001:db8::/32", "10.1.0.0/23"],
+            [route.destination_range for route in routes],
+        )
+
+    def test_summary_that_changes_lookups_is_skipped(self):
+        # the /23 of the other next hop would win 10.1.0.0/24 from a /22 summary
+        routes, report = summarize_routes(
+            [
+                make_route("10.1.0.0/24"),
+                make_route("10.1.1.0/24"),
+                make_route("10.1.2.0/23"),
+                make_route("10.1.0.0/23", next_hop_ip="10.0.0.3"),
+            ]
+        )
+        self.assertEqual(
+            ["10.1.0.0/24", "10.1.1.0/24", "10.1.2.0/23", "10.1.0.0/23"],
+            [route.destination_range for route in routes],
+        )
+        self.assertEqual([], report.summaries)
+
+    def test_more_specific_routes_of_other_next_hops_are_allowed(self):
+        routes, _ = summarize_routes(
+            [
+                make_route("10.1.0.0/24"),
+                make_route("10.1.1.0/24"),
+                make_route("10.1.0.128/25", next_hop_ip="10.0.0.3"),
+            ]
+        )
+        self.assertEqual(
+            ["10.1.0.0/23", "10.1.0.128/25"],
+            [route.destination_range for route in routes],
+        )
+
+    def test_lookups_are_unchanged(self):
+        original = [
+            make_route(
+                f"10.{i // 4}.{i % 4}.0/24", next_hop_ip=f"10.0.0.{i // 2 % 2 + 2}"
+            )
+            for i in range(64)
+        ] + [make_route("10.0.0.0/8", next_hop_ip="10.0.0.9")]
+        summarized, report = summarize_routes(original)
+        self.assertLess(report.output_routes, report.input_routes)
+
+        addresses = [f"10.{i // 16}.{i % 4}.{i}" for i in range(256)]
+        before = RouteTable.from_args(routes=original).lookup_many(addresses)
+        after = RouteTable.from_args(routes=summarized).lookup_many(addresses)
+        self.assertEqual(
+            [[entry.next_hop for entry in entries] for entries in before],
+            [[entry.next_hop for entry in entries] for entries in after],
+        )
@@ -0,0 +1,133 @@
+import unittest
+
+from pulumi_gcp_network.route_table import RouteEntry, RouteTable
+
+TEST_SUBNETS = [
+    {
+        "subnet_name": "subnet-01",
+        "subnet_ip": "10.10.10.0/24",
+        "subnet_region": "us-west1",
+    },
+    {
+        "subnet_name": "subnet-02",
+        "subnet_ip": "10.10.20.0/24",
+        "subnet_region": "us-west1",
+    },
+]
+
+TEST_SECONDARY_RANGES = {
+    "subnet-01": [
+        {"range_name": "subnet-01-pods", "ip_cidr_range": "192.168.64.0/24"},
+    ],
+}
+
+TEST_ROUTES = [
+    {
+        "name": "egress-inet",
+        "destination_range": "0.0.0.0/0",
+        "next_hop_internet": True,
+    },
+    {
+        "name": "proxy",
+        "destination_range": "0.0.0.0/0",
+        "tags": "proxied",
+        "next_hop_ip": "10.10.10.5",
+        "priority": 900,
+    },
+    {
+        "name": "on-prem-a",
+        "destination_range": "172.16.0.0/12",
+        "next_hop_vpn_tunnel": "tunnel-a",
+    },
+    {
+        "name": "on-prem-b",
+        "destination_range": "172.16.0.0/12",
+        "next_hop_vpn_tunnel": "tunnel-b",
+    },
+    {
+        "name": "on-prem-dc",
+        "destination_range": "172.20.0.0/16",
+        "next_hop_ilb": "ilb-dc",
+        "priority": 2000,
+    },
+    {
+        "name": "shadow-subnet",
+        "destination_range": "10.10.20.0/24",
+        "next_hop_ip": "10.10.10.6",
+    },
+    {
+        "name": "v6",
+        "destination_range": "::/0",
+        "next_hop_internet": True,
+    },
+]
+
+
+class TestingRouteTable(unittest.TestCase):
+    def setUp(self):
+        self.route_table = RouteTable.from_args(
+            TEST_ROUTES, TEST_SUBNETS, TEST_SECONDARY_RANGES
+        )
+
+    def names(self, result):
+        return [route.name for route in result]
+
+    def test_subnet_routes(self):
+        self.assertEqual(
+            ["subnet-subnet-01"], self.names(self.route_table.lookup("10.10.10.7"))
+        )
+        self.assertEqual(
+            ["subnet-subnet-01"], self.names(self.route_table.lookup("192.168.64.1"))
+        )
+        # subnet routes win over custom routes with the same destination
+        self.assertEqual(
+            ["subnet-subnet-02"], self.names(self.route_table.lookup("10.10.20.1"))
+        )
+
+    def test_tags_and_priority(self):
+        self.assertEqual(
+            ["egress-inet"], self.names(self.route_table.lookup("8.8.8.8"))
+        )
+        self.assertEqual(
+            ["proxy"], self.names(self.route_table.lookup("8.8.8.8", ["proxied"]))
+        )
+
+    def test_longest_prefix_and_ecmp(self):
+        self.assertEqual(
+            ["on-prem-a", "on-prem-b"],
+            self.names(self.route_table.lookup("172.17.0.1")),
+        )
+        # more specific prefix wins regardless of priority
+        self.assertEqual(
+            ["on-prem-dc"], self.names(self.route_table.lookup("172.20.1.1"))
+        )
+
+    def test_ipv6(self):
+        self.assertEqual(["v6"], self.names(self.route_table.lookup("2001:db8::1")))
+
+    def test_no_route(self):
+        route_table = RouteTable(
+            [RouteEntry("tagged", "10.0.0.0/8", 1000, ("web",), "ip", "10.0.0.1")]
+        )
+        self.assertEqual((), route_table.lookup("10.1.1.1"))
+        self.assertEqual((), route_table.lookup("11.0.0.1", ["web"]))
+        self.assertEqual(
+            ["tagged"], self.names(route_table.lookup("10.1.1.1", ["web"]))
+        )
+
+    def test_lookup_many_matches_lookup(self):
+        addresses = [
+            "10.10.10.7",
+            "10.10.20.1",
+            "8.8.8.8",
+            "172.17.0.1",
+            "172.20.1.1",
+            "192.168.64.200",
+            "2001:db8::1",
+            167772161,
+        ]
+        for tags in ([], ["proxied"]):
+            self.assertEqual(
+                [self.route_table.lookup(address, tags) for address in addresses],
+                self.route_table.lookup_many(addresses, tags),
+            )
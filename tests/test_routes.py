@@ -14,8 +14,10 @@ class TestMocks(pulumi.runtime.Mocks):
 pulumi.runtime.set_mocks(TestMocks())
 
 # It's important to import _after_ the mocks are defined.
+from pulumi_gcp_network.naming import ResourceNamingEnum  # noqa isort:skip
 from pulumi_gcp_network.routes import (  # noqa isort:skip type: ignore
     Routes,
+    RoutesArgs,
 )
 
 TEST_NAME = "test-routes"
@@ -107,3 +109,82 @@ class TestingRoutes(unittest.TestCase):
         return pulumi.Output.all(
             *[route.name for route in self.routes.created_routes]
         ).apply(check_created_routes_name)
+
+    @pulumi.runtime.test
+    def test_registered_outputs(self):
+        self.assertIs(
+            self.routes.created_routes[1],
+            self.routes.routes_by_name["route-test-network-1"],
+        )
+
+        def check_outputs(outputs):
+            self.assertEqual(
+                ["test-egress-inet", "route-test-network-1"], list(outputs["routes"])
+            )
+            self.assertEqual(
+                {
+                    "id": "route-test-network-1_id",
+                    "self_link": None,
+                    "destination_range": "10.10.20.0/24",
+                    "priority": 1000,
+                },
+                outputs["routes"]["route-test-network-1"],
+            )
+
+        return pulumi.Output.from_input(self.routes.registered_outputs).apply(
+            check_outputs
+        )
+
+
+class TestingRoutesNaming(unittest.TestCase):
+    def test_route_name_is_independent_of_position(self):
+        route = RoutesArgs(**TEST_ROUTES[1])
+        names = {
+            Routes.get_route_name(route, TEST_NETWORK_NAME, i, ResourceNamingEnum.NAME)
+            for i in range(3)
+        }
+        self.assertEqual(1, len(names))
+        self.assertTrue(names.pop().startswith("route-test-network-"))
+
+    def test_route_name_index(self):
+        route = RoutesArgs(**TEST_ROUTES[1])
+        self.assertEqual(
+            "route-test-network-4", Routes.get_route_name(route, TEST_NETWORK_NAME, 4)
+        )
+
+
+class TestingRoutesSummarize(unittest.TestCase):
+    @pulumi.runtime.test
+    def test_summarized_routes(self):
+        routes = Routes(
+            "test-summarized-routes",
+            project_id=TEST_PROJECT_ID,
+            network_name=TEST_NETWORK_NAME,
+            routes=[
+                {"destination_range": "10.1.0.0/24", "next_hop_ip": "10.0.0.2"},
+                {"destination_range": "10.1.1.0/24", "next_hop_ip": "10.0.0.2"},
+            ],
+            summarize=True,
+        )
+        self.assertEqual(1, routes.summary_report.output_routes)
+
+        def check_dest_ranges(args):
+            self.assertEqual(["10.1.0.0/23"], args)
+
+        return pulumi.Output.all(
+            *[route.dest_range for route in routes.created_routes]
+        ).apply(check_dest_ranges)
+
+
+class TestingRoutesArgsInstances(unittest.TestCase):
+    @pulumi.runtime.test
+    def test_route_args_are_not_mutated(self):
+        route = RoutesArgs(**TEST_ROUTES[1])
+        routes = Routes(
+            "test-unmutated-routes",
+            project_id=TEST_PROJECT_ID,
+            network_name=TEST_NETWORK_NAME,
+            routes=[route],
+        )
+        self.assertIsNone(route.name)
+        self.assertEqual(1, len(routes.created_routes))
@@ -0,0 +1,76 @@
+import unittest
+
+import pulumi
+
+from pulumi_gcp_network.scheduling import (
+    RegistrationQuota,
+    RegistrationReport,
+    RegistrationScheduler,
+)
+
+
+class FakeResource:
+    def __init__(self, name):
+        self.name = name
+        self.id = pulumi.Output.from_input(f"{name}_id")
+
+
+class TestingRegistrationQuota(unittest.TestCase):
+    def test_default_wave_size(self):
+        quota = RegistrationQuota()
+        # a create and five polls of its operation
+        self.assertEqual(6, quota.reads_per_create)
+        self.assertEqual(200, quota.creates_per_minute)
+        self.assertEqual(33, quota.wave_size())
+
+    def test_write_bound_wave_size(self):
+        quota = RegistrationQuota(
+            writes_per_minute=60, reads_per_minute=6000, headroom=0
+        )
+        self.assertEqual(60, quota.creates_per_minute)
+        self.assertEqual(10, quota.wave_size())
+        self.assertEqual(1, RegistrationQuota(writes_per_minute=1).wave_size())
+
+
+class TestingRegistrationScheduler(unittest.TestCase):
+    def test_depends_on_the_resource_a_wave_before(self):
+        scheduler = RegistrationScheduler(wave_size=2)
+        self.assertIsNone(scheduler.quota)
+        resources = [FakeResource(str(i)) for i in range(4)]
+        dependencies = []
+        for resource in resources:
+            dependencies.append(scheduler.depends_on())
+            scheduler.add(resource)  # type: ignore
+        self.assertEqual([(), (), [resources[0]], [resources[1]]], dependencies)
+        self.assertEqual(["route", resources[2]], scheduler.depends_on(["route"]))
+
+    def test_wave_size_from_quota(self):
+        self.assertEqual(33, RegistrationScheduler().wave_size)
+        quota = RegistrationQuota(writes_per_minute=60, headroom=0)
+        self.assertEqual(10, RegistrationScheduler(quota).wave_size)
+        with self.assertRaises(ValueError):
+            RegistrationScheduler(wave_size=0)
+
+    @pulumi.runtime.test
+    def test_report(self):
+        scheduler = RegistrationScheduler(wave_size=2)
+        for i in range(3):
+            scheduler.add(FakeResource(str(i)))  # type: ignore
+
+        def check_report(report):
+            self.assertEqual(3, report.resources)
+            self.assertEqual(2, report.wave_size)
+            self.assertIn("3 resources created", report.summary())
+
+        return scheduler.report().apply(check_report)
+
+    def test_report_summary(self):
+        report = RegistrationReport(
+            resources=100, wave_size=10, seconds=30.0, expected_per_minute=240.0
+        )
+        self.assertEqual(200, report.per_minute)
+        self.assertEqual(
+            "100 resources created in 30.0s in waves of 10: 200 per minute, "
+            "the quota allows 240",
+            report.summary(),
+        )
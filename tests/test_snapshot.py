@@ -0,0 +1,190 @@
+import copy
+import os
+import tempfile
+import unittest
+
+from pulumi_gcp_network.snapshot import SpecSnapshot, update_spec
+from pulumi_gcp_network.spec import NetworkSpec
+from pulumi_gcp_network.validation import BulkValidationError
+
+TEST_SUBNETS = [
+    {
+        "subnet_name": f"subnet-{i}",
+        "subnet_ip": f"10.10.{i}.0/24",
+        "subnet_region": "us-west1",
+    }
+    for i in range(4)
+]
+TEST_SECONDARY_RANGES = {
+    "subnet-0": [
+        {"range_name": "pods", "ip_cidr_range": "10.100.0.0/16"},
+        {"range_name": "services", "ip_cidr_range": "10.101.0.0/20"},
+    ],
+    "subnet-1": None,
+}
+TEST_ROUTES = [
+    {"destination_range": f"172.16.{i}.0/24", "next_hop_ip": "10.10.0.2"}
+    for i in range(4)
+]
+TEST_FIREWALL_RULES = [
+    {
+        "name": f"rule-{i}",
+        "ranges": [f"10.20.{i}.0/24"],
+        "allow": [{"protocol": "tcp", "ports": ["22"]}],
+    }
+    for i in range(4)
+]
+
+
+class TestingUpdateSpec(unittest.TestCase):
+    def setUp(self):
+        self.inputs = copy.deepcopy(
+            [TEST_SUBNETS, TEST_SECONDARY_RANGES, TEST_ROUTES, TEST_FIREWALL_RULES]
+        )
+        _, _, self.snapshot = update_spec(None, *self.inputs)
+
+    def test_first_run(self):
+        spec, diff, _ = update_spec(None, *self.inputs)
+        self.assertEqual(NetworkSpec.validate(*self.inputs), spec)
+        self.assertEqual(
+            ["rule-0", "rule-1", "rule-2", "rule-3"], diff.added["firewall_rules"]
+        )
+        self.assertEqual(
+            ["subnet-0/pods", "subnet-0/services"], diff.added["secondary_ranges"]
+        )
+
+    def test_unchanged_items_are_reused(self):
+        subnets, secondary_ranges, routes, rules = self.inputs
+        rules[1]["priority"] = 100
+        del rules[2]
+        rules.append({"name": "rule-new", "ranges": ["10.30.0.0/16"]})
+        routes.reverse()
+
+        spec, diff, _ = update_spec(
+            self.snapshot, subnets, secondary_ranges, routes, rules
+        )
+
+        self.assertEqual(
+            NetworkSpec.validate(subnets, secondary_ranges, routes, rules), spec
+        )
+        self.assertEqual(["rule-new"], diff.added["firewall_rules"])
+        self.assertEqual(["rule-2"], diff.removed["firewall_rules"])
+        self.assertEqual(["rule-1"], diff.changed["firewall_rules"])
+        self.assertEqual(2, diff.unchanged["firewall_rules"])
+        previous_rules = self.snapshot.entries["firewall_rules"]
+        self.assertIs(previous_rules["rule-0"][1], spec.firewall_rules[0])
+        self.assertIsNot(previous_rules["rule-1"][1], spec.firewall_rules[1])
+        # matched by identity, not by position
+        self.assertEqual([], diff.changed["routes"])
+        self.assertIs(
+            self.snapshot.entries["routes"]["172.16.0.0/24"][1], spec.routes[-1]
+        )
+        self.assertFalse(diff.is_empty)
+
+    def test_no_changes(self):
+        spec, diff, _ = update_spec(self.snapshot, *self.inputs)
+        self.assertTrue(diff.is_empty)
+        self.assertIn("firewall_rules +0 -0 ~0 =4", diff.summary())
+        self.assertIs(self.snapshot.entries["subnets"]["subnet-3"][1], spec.subnets[3])
+
+    def test_duplicate_identities(self):
+        rules = self.inputs[3] + [dict(self.inputs[3][0], priority=10)]
+        _, diff, snapshot = update_spec(self.snapshot, [], {}, [], rules)
+        self.assertEqual(["rule-0#1"], diff.added["firewall_rules"])
+        self.assertEqual("rule-0#1", list(snapshot.entries["firewall_rules"])[-1])
+
+    def test_errors_are_located_in_the_input(self):
+        subnets, secondary_ranges, routes, rules = self.inputs
+        rules[3]["priority"] = -1
+        secondary_ranges["subnet-1"] = [{"range_name": "pods"}]
+        with self.assertRaises(BulkValidationError) as context:
+            update_spec(self.snapshot, subnets, secondary_ranges, routes, rules)
+        self.assertEqual(
+            [("subnet-1", 0, "__root__")],
+            [error["loc"] for error in context.exception.errors],
+        )
+        del secondary_ranges["subnet-1"]
+        with self.assertRaises(BulkValidationError) as context:
+            update_spec(self.snapshot, subnets, secondary_ranges, routes, rules)
+        self.assertEqual(
+            [(3, "priority")], [error["loc"] for error in context.exception.errors]
+        )
+
+    def test_other_version(self):
+        self.snapshot.version = "other"
+        spec, diff, _ = update_spec(self.snapshot, *self.inputs)
+        self.assertTrue(diff.is_empty)
+        self.assertIsNot(
+            self.snapshot.entries["subnets"]["subnet-0"][1], spec.subnets[0]
+        )
+        self.assertEqual(NetworkSpec.validate(*self.inputs), spec)
+
+
+class TestingSpecSnapshot(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "snapshot")
+
+        _, _, self.snapshot = update_spec(
+            None, TEST_SUBNETS, TEST_SECONDARY_RANGES, TEST_ROUTES, TEST_FIREWALL_RULES
+        )
+
+    def save_changed_rules(self, snapshot, rules, compact_ratio=0.5):
+        _, _, snapshot = update_spec(
+            snapshot, TEST_SUBNETS, TEST_SECONDARY_RANGES, TEST_ROUTES, rules
+        )
+        snapshot.save(self.path, compact_ratio)
+        return snapshot
+
+    def test_save_load(self):
+        self.snapshot.save(self.path)
+        self.assertEqual(self.snapshot, SpecSnapshot.load(self.path))
+
+    def test_journal(self):
+        self.snapshot.save(self.path)
+        base = os.stat(self.path).st_mtime_ns
+        rules = copy.deepcopy(TEST_FIREWALL_RULES)
+        rules[0]["priority"] = 10
+        snapshot = self.save_changed_rules(SpecSnapshot.load(self.path), rules)
+        del rules[1]
+        snapshot = self.save_changed_rules(SpecSnapshot.load(self.path), rules)
+
+        self.assertEqual(base, os.stat(self.path).st_mtime_ns)
+        self.assertTrue(os.path.exists(self.path + ".journal"))
+        loaded = SpecSnapshot.load(self.path)
+        self.assertEqual(snapshot, loaded)
+        self.assertEqual(
+            ["rule-0", "rule-2", "rule-3"], list(loaded.entries["firewall_rules"])
+        )
+        self.assertEqual(10, loaded.entries["firewall_rules"]["rule-0"][1].priority)
+
+    def test_compaction(self):
+        self.snapshot.save(self.path)
+        rules = copy.deepcopy(TEST_FIREWALL_RULES)
+        rules[0]["priority"] = 10
+        snapshot = self.save_changed_rules(SpecSnapshot.load(self.path), rules, 0)
+        self.assertFalse(os.path.exists(self.path + ".journal"))
+        self.assertEqual(snapshot, SpecSnapshot.load(self.path))
+
+    def test_stale_or_unreadable_journal(self):
+        self.snapshot.save(self.path)
+        rules = copy.deepcopy(TEST_FIREWALL_RULES)
+        rules[0]["priority"] = 10
+        self.save_changed_rules(SpecSnapshot.load(self.path), rules)
+        journal = self.path + ".journal"
+        os.rename(journal, journal + ".old")
+        self.snapshot.base = None
+        self.snapshot.save(self.path)
+        os.rename(journal + ".old", journal)
+        self.assertEqual(self.snapshot, SpecSnapshot.load(self.path))
+
+        with open(journal, "wb") as journal_file:
+            journal_file.write(b"not a journal")
+        self.assertEqual(self.snapshot, SpecSnapshot.load(self.path))
+
+    def test_missing_or_unreadable(self):
+        self.assertIsNone(SpecSnapshot.load(self.path))
+        with open(self.path, "wb") as snapshot_file:
+            snapshot_file.write(b"not a snapshot")
+        self.assertIsNone(SpecSnapshot.load(self.path))
@@ -0,0 +1,100 @@
+import json
+import unittest
+
+from pulumi_gcp_network.firewall_rules import (
+    FirewallDirectionEnum,
+    FirewallRulesAllowDenyArgs,
+)
+from pulumi_gcp_network.routes import RoutesArgs
+from pulumi_gcp_network.spec import NetworkSpec, json_default, spec_digest
+
+TEST_SUBNETS = [
+    {
+        "subnet_name": f"subnet-{i}",
+        "subnet_ip": f"10.10.{i}.0/24",
+        "subnet_region": "us-west1",
+        "subnet_flow_logs": i % 2 == 0,
+    }
+    for i in range(3)
+]
+TEST_SECONDARY_RANGES = {
+    "subnet-0": [
+        {"range_name": "pods", "ip_cidr_range": "10.100.0.0/16"},
+        {"range_name": "services", "ip_cidr_range": "10.101.0.0/20"},
+    ],
+    "subnet-1": None,
+    "subnet-2": [{"range_name": "pods", "ip_cidr_range": "10.102.0.0/16"}],
+}
+TEST_ROUTES = [
+    {"destination_range": "0.0.0.0/0", "next_hop_internet": True, "tags": "a, b"},
+    {"destination_range": "10.0.0.0/8", "next_hop_ip": "10.10.0.2", "name": "r"},
+]
+TEST_FIREWALL_RULES = [
+    {
+        "name": "ssh",
+        "ranges": ["35.235.240.0/20"],
+        "allow": [{"protocol": "tcp", "ports": [22]}],
+        "log_config": {},
+    },
+    {
+        "name": "deny-all",
+        "direction": "EGRESS",
+        "deny": [{"protocol": "all", "ports": []}],
+    },
+]
+
+
+def roundtrip(spec: NetworkSpec) -> NetworkSpec:
+    return NetworkSpec.from_dict(
+        json.loads(json.dumps(spec.to_dict(), default=json_default))
+    )
+
+
+class TestingNetworkSpec(unittest.TestCase):
+    def setUp(self):
+        self.spec = NetworkSpec.validate(
+            TEST_SUBNETS, TEST_SECONDARY_RANGES, TEST_ROUTES, TEST_FIREWALL_RULES
+        )
+
+    def test_roundtrip(self):
+        loaded = roundtrip(self.spec)
+        self.assertEqual(self.spec, loaded)
+        self.assertEqual(
+            ["subnet-0", "subnet-1", "subnet-2"], list(loaded.secondary_ranges)
+        )
+        self.assertEqual([], loaded.secondary_ranges["subnet-1"])
+        for before, after in zip(self.spec.firewall_rules, loaded.firewall_rules):
+            self.assertEqual(before.__fields_set__, after.__fields_set__)
+
+    def test_roundtrip_types(self):
+        loaded = roundtrip(self.spec)
+        self.assertIs(FirewallDirectionEnum.EGRESS, loaded.firewall_rules[1].direction)
+        self.assertIsInstance(
+            loaded.firewall_rules[0].allow[0], FirewallRulesAllowDenyArgs
+        )
+        self.assertIsInstance(loaded.routes[0], RoutesArgs)
+
+    def test_changed_fields(self):
+        data = json.loads(json.dumps(self.spec.to_dict(), default=json_default))
+        data["routes"]["fields"].append("removed")
+        with self.assertRaisesRegex(ValueError, "RoutesArgs"):
+            NetworkSpec.from_dict(data)
+
+    def test_empty(self):
+        self.assertEqual(NetworkSpec(), roundtrip(NetworkSpec()))
+
+
+class TestingSpecDigest(unittest.TestCase):
+    def test_key_order(self):
+        self.assertEqual(
+            spec_digest([{"a": 1, "b": 2}]), spec_digest([{"b": 2, "a": 1}])
+        )
+
+    def test_list_order(self):
+        self.assertNotEqual(spec_digest([1, 2]), spec_digest([2, 1]))
+
+    def test_models(self):
+        self.assertEqual(
+            spec_digest([{"destination_range": "10.0.0.0/8"}]),
+            spec_digest([RoutesArgs(destination_range="10.0.0.0/8")]),
+        )
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 
 import pulumi
@@ -14,8 +16,10 @@ class TestMocks(pulumi.runtime.Mocks):
 pulumi.runtime.set_mocks(TestMocks())
 
 # It's important to import _after_ the mocks are defined.
+from pulumi_gcp_network.cidr import CidrOverlapError  # noqa isort:skip
 from pulumi_gcp_network.subnets import (  # noqa isort:skip type: ignore
     Subnets,
+    SubnetsSubnetArgs,
 )
 
 TEST_NAME = "test-subnets"
@@ -173,3 +177,195 @@ class TestingRoutes(unittest.TestCase):
         return pulumi.Output.all(
             *[subnet.secondary_ip_ranges for subnet in self.subnets.created_subnetworks]
         ).apply(check_created_subnets_secondary_ip_ranges)
+
+    @pulumi.runtime.test
+    def test_registered_outputs(self):
+        subnetworks = self.subnets.created_subnetworks
+        self.assertIs(
+            subnetworks[2], self.subnets.subnetworks["us-west1/test-subnet-3"]
+        )
+        self.assertIs(
+            subnetworks[3],
+            self.subnets.subnetworks_by_region["us-west1"]["test-subnet-4"],
+        )
+
+        def check_outputs(outputs):
+            self.assertEqual(
+                {
+                    "name": "test-subnet-1",
+                    "region": "us-west1",
+                    "id": "subnetwork-0_id",
+                    "self_link": None,
+                    "ip_cidr_range": "10.10.10.0/24",
+                    "secondary_ranges": {
+                        "test-subnet-1-01": "192.168.64.0/24",
+                        "test-subnet-1-02": "192.168.65.0/24",
+                    },
+                },
+                outputs["subnets"]["us-west1/test-subnet-1"],
+            )
+            self.assertEqual(
+                [f"test-subnet-{i}" for i in range(1, 5)],
+                list(outputs["subnets_by_region"]["us-west1"]),
+            )
+
+        return pulumi.Output.from_input(self.subnets.registered_outputs).apply(
+            check_outputs
+        )
+
+
+class TestingSubnetsOverlaps(unittest.TestCase):
+    def test_overlapping_secondary_range(self):
+        with self.assertRaises(CidrOverlapError) as context:
+            Subnets(
+                TEST_NAME,
+                project_id=TEST_PROJECT_ID,
+                network_name=TEST_NETWORK_NAME,
+                subnets=TEST_SUBNETS,
+                secondary_ranges={
+                    "test-subnet-4": [
+                        {
+                            "range_name": "test-subnet-4-01",
+                            "ip_cidr_range": "10.10.10.128/25",
+                        }
+                    ]
+                },
+            )
+        self.assertEqual(
+            [("test-subnet-1", "test-subnet-4/test-subnet-4-01")],
+            [(a.owner, b.owner) for a, b in context.exception.overlaps],
+        )
+
+
+class TestingSubnetsAllocation(unittest.TestCase):
+    @pulumi.runtime.test
+    def setUp(self):
+        self.subnets = Subnets(
+            TEST_NAME,
+            project_id=TEST_PROJECT_ID,
+            network_name=TEST_NETWORK_NAME,
+            subnets=[
+                {
+                    "subnet_name": "test-subnet-1",
+                    "subnet_ip": "10.20.0.0/24",
+                    "subnet_region": "us-west1",
+                },
+                {
+                    "subnet_name": "test-subnet-2",
+                    "subnet_prefix_length": 24,
+                    "subnet_region": "us-west1",
+                },
+                {
+                    "subnet_name": "test-subnet-3",
+                    "subnet_host_count": 500,
+                    "subnet_region": "us-west1",
+                },
+            ],
+            secondary_ranges={
+                "test-subnet-2": [
+                    {"range_name": "pods", "prefix_length": 20},
+                    {"range_name": "services", "host_count": 1000},
+                ],
+            },
+            supernet="10.20.0.0/16",
+            secondary_supernet="10.128.0.0/14",
+        )
+
+    def test_allocations(self):
+        self.assertDictEqual(
+            {
+                "test-subnet-2": "10.20.1.0/24",
+                "test-subnet-2/pods": "10.128.0.0/20",
+                "test-subnet-2/services": "10.128.16.0/22",
+                "test-subnet-3": "10.20.2.0/23",
+            },
+            self.subnets.allocations,
+        )
+
+    @pulumi.runtime.test
+    def test_created_subnets_ip_cidr_range(self):
+        def check_ip_cidr_ranges(args):
+            self.assertListEqual(["10.20.0.0/24", "10.20.1.0/24", "10.20.2.0/23"], args)
+
+        return pulumi.Output.all(
+            *[subnet.ip_cidr_range for subnet in self.subnets.created_subnetworks]
+        ).apply(check_ip_cidr_ranges)
+
+    def test_missing_supernet(self):
+        with self.assertRaises(ValueError):
+            Subnets(
+                TEST_NAME,
+                project_id=TEST_PROJECT_ID,
+                network_name=TEST_NETWORK_NAME,
+                subnets=[
+                    {
+                        "subnet_name": "test-subnet-1",
+                        "subnet_prefix_length": 24,
+                        "subnet_region": "us-west1",
+                    },
+                ],
+            )
+
+
+def sized_subnets(*names):
+    return [
+        {"subnet_name": name, "subnet_prefix_length": 24, "subnet_region": "us-west1"}
+        for name in names
+    ]
+
+
+class TestingSubnetsStableAllocation(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "allocations.json")
+
+    def allocate(self, *names):
+        return Subnets(
+            TEST_NAME,
+            project_id=TEST_PROJECT_ID,
+            network_name=TEST_NETWORK_NAME,
+            subnets=sized_subnets(*names),
+            supernet="10.0.0.0/16",
+            allocations_path=self.path,
+        ).allocations
+
+    def test_insert_and_remove(self):
+        first = {"a": "10.0.0.0/24", "b": "10.0.1.0/24", "c": "10.0.2.0/24"}
+        self.assertEqual(first, self.allocate("a", "b", "c"))
+
+        inserted = self.allocate("a", "new", "b", "c")
+        self.assertEqual(first, {name: inserted[name] for name in first})
+        self.assertEqual("10.0.3.0/24", inserted["new"])
+
+        removed = self.allocate("new", "b", "c")
+        self.assertEqual(
+            {"new": "10.0.3.0/24", "b": "10.0.1.0/24", "c": "10.0.2.0/24"}, removed
+        )
+        # the range of the removed subnet is free again
+        self.assertEqual("10.0.0.0/24", self.allocate("new", "b", "c", "d")["d"])
+
+    def test_without_file_order_decides(self):
+        previous = {"b": "10.0.1.0/24", "c": "10.0.2.0/24"}
+        args = [SubnetsSubnetArgs(**subnet) for subnet in sized_subnets("b", "c")]
+        self.assertEqual(
+            {"b": "10.0.0.0/24", "c": "10.0.1.0/24"},
+            Subnets.allocate_ranges(args, {}, "10.0.0.0/16"),
+        )
+        self.assertEqual(
+            previous, Subnets.allocate_ranges(args, {}, "10.0.0.0/16", None, previous)
+        )
+
+    def test_resized_subnet_is_allocated_again(self):
+        self.allocate("a", "b")
+        subnets = sized_subnets("a", "b")
+        subnets[0]["subnet_prefix_length"] = 23
+        allocations = Subnets(
+            TEST_NAME,
+            project_id=TEST_PROJECT_ID,
+            network_name=TEST_NETWORK_NAME,
+            subnets=subnets,
+            supernet="10.0.0.0/16",
+            allocations_path=self.path,
+        ).allocations
+        self.assertEqual({"a": "10.0.2.0/23", "b": "10.0.1.0/24"}, allocations)
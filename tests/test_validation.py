@@ -0,0 +1,178 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+from pulumi_gcp_network.firewall_rules import (
+    FirewallDirectionEnum,
+    FirewallRulesAllowDenyArgs,
+    FirewallRulesRuleArgs,
+)
+from pulumi_gcp_network.routes import RoutesArgs
+from pulumi_gcp_network.subnets import SubnetsSecondaryRangeArgs, SubnetsSubnetArgs
+from pulumi_gcp_network.validation import (
+    BulkValidationError,
+    construct_trusted,
+    validate_iter,
+    validate_many,
+    validate_many_by_key,
+)
+
+
+class TestingValidateMany(unittest.TestCase):
+    def test_matches_per_item_validation(self):
+        routes = [
+            {"destination_range": "10.0.0.0/24", "tags": "a, b"},
+            {"destination_range": "10.0.1.0/24", "priority": "10", "name": "named"},
+        ]
+        self.assertEqual(
+            [RoutesArgs.validate(route) for route in routes],
+            validate_many(RoutesArgs, routes),
+        )
+
+    def test_fields_set(self):
+        (route,) = validate_many(RoutesArgs, [{"destination_range": "10.0.0.0/24"}])
+        self.assertEqual({"destination_range"}, route.__fields_set__)
+
+    def test_instances_are_not_copied(self):
+        route = RoutesArgs(destination_range="10.0.0.0/24")
+        self.assertIs(route, validate_many(RoutesArgs, [route])[0])
+
+    def test_every_error_is_reported(self):
+        routes = [
+            {"destination_range": "10.0.0.0/24"},
+            {"priority": 70000},
+            "not a route",
+        ]
+        with self.assertRaises(BulkValidationError) as context:
+            validate_many(RoutesArgs, routes, "routes")
+
+        error = context.exception
+        self.assertEqual(
+            [(1, "destination_range"), (1, "priority"), (2,)],
+            [item_error["loc"] for item_error in error.errors],
+        )
+        self.assertIsInstance(error, ValueError)
+        self.assertIn("3 validation errors for routes", str(error))
+        self.assertIn("1 -> priority", str(error))
+
+    def test_root_validators_run(self):
+        with self.assertRaises(BulkValidationError) as context:
+            validate_many(
+                SubnetsSubnetArgs,
+                [{"subnet_name": "a", "subnet_region": "us-west1"}],
+            )
+        self.assertEqual(
+            [(0, "__root__")], [e["loc"] for e in context.exception.errors]
+        )
+
+    def test_by_key(self):
+        ranges = {
+            "a": [{"range_name": "pods", "ip_cidr_range": "10.1.0.0/16"}],
+            "b": None,
+            "c": [{"range_name": "services"}],
+        }
+        with self.assertRaises(BulkValidationError) as context:
+            validate_many_by_key(SubnetsSecondaryRangeArgs, ranges)
+        self.assertEqual(("c", 0, "__root__"), context.exception.errors[0]["loc"])
+
+        del ranges["c"]
+        validated = validate_many_by_key(SubnetsSecondaryRangeArgs, ranges)
+        self.assertEqual("10.1.0.0/16", validated["a"][0].ip_cidr_range)
+        self.assertEqual([], validated["b"])
+
+    def test_nested_models(self):
+        (rule,) = validate_many(
+            FirewallRulesRuleArgs,
+            [{"name": "ssh", "allow": [{"protocol": "tcp", "ports": [22, "80"]}]}],
+        )
+        self.assertEqual(
+            [FirewallRulesAllowDenyArgs(protocol="tcp", ports=["22", "80"])],
+            rule.allow,
+        )
+
+    def test_scalar_ports(self):
+        self.assertEqual(
+            "22", FirewallRulesAllowDenyArgs(protocol="tcp", ports=22).ports
+        )
+        self.assertEqual(
+            "22", FirewallRulesAllowDenyArgs(protocol="tcp", ports="22").ports
+        )
+
+
+class TestingValidateIter(unittest.TestCase):
+    def test_errors_are_raised_after_the_valid_items(self):
+        routes = [
+            ("a", {"destination_range": "10.0.0.0/24"}),
+            ("b", {"priority": 1}),
+            ("c", {"destination_range": "10.0.1.0/24"}),
+        ]
+        validated = validate_iter(RoutesArgs, routes, chunk_size=2)
+        self.assertEqual("10.0.0.0/24", next(validated).destination_range)
+        self.assertEqual("10.0.1.0/24", next(validated).destination_range)
+        with self.assertRaises(BulkValidationError) as context:
+            next(validated)
+        self.assertEqual(
+            [("b", "destination_range")],
+            [item_error["loc"] for item_error in context.exception.errors],
+        )
+
+
+class TestingValidateManyExecutor(unittest.TestCase):
+    def setUp(self):
+        self.executor = ProcessPoolExecutor(max_workers=2)
+        self.addCleanup(self.executor.shutdown)
+
+    def test_chunks_keep_order(self):
+        routes = [{"destination_range": f"10.0.{i}.0/24"} for i in range(25)]
+        validated = validate_many(
+            RoutesArgs, routes, executor=self.executor, chunk_size=4
+        )
+        self.assertEqual(validate_many(RoutesArgs, routes), validated)
+
+    def test_chunk_errors_are_located(self):
+        routes = [{"destination_range": f"10.0.{i}.0/24"} for i in range(10)]
+        routes[1] = {}
+        routes[9] = {"destination_range": "10.1.0.0/24", "priority": -1}
+        with self.assertRaises(BulkValidationError) as context:
+            validate_many(RoutesArgs, routes, executor=self.executor, chunk_size=4)
+        self.assertEqual(
+            [(1, "destination_range"), (9, "priority")],
+            [item_error["loc"] for item_error in context.exception.errors],
+        )
+
+    def test_by_key(self):
+        ranges = {
+            f"subnet-{i}": [
+                {"range_name": "pods", "ip_cidr_range": f"10.{i}.0.0/16"},
+                {"range_name": "services", "prefix_length": 24},
+            ]
+            for i in range(5)
+        }
+        validated = validate_many_by_key(
+            SubnetsSecondaryRangeArgs, ranges, executor=self.executor, chunk_size=3
+        )
+        self.assertEqual(list(ranges), list(validated))
+        self.assertEqual(
+            validate_many(SubnetsSecondaryRangeArgs, ranges["subnet-3"]),
+            validated["subnet-3"],
+        )
+
+
+class TestingConstructTrusted(unittest.TestCase):
+    def test_matches_validation(self):
+        values = {
+            "name": "ssh",
+            "direction": "EGRESS",
+            "allow": [{"protocol": "tcp", "ports": ["22"]}],
+            "log_config": {},
+        }
+        rule = construct_trusted(FirewallRulesRuleArgs, values)
+        self.assertEqual(FirewallRulesRuleArgs(**values), rule)
+        self.assertIs(FirewallDirectionEnum.EGRESS, rule.direction)
+        self.assertIsInstance(rule.allow[0], FirewallRulesAllowDenyArgs)
+        self.assertEqual(set(values), rule.__fields_set__)
+
+    def test_defaults_are_not_shared(self):
+        first = construct_trusted(FirewallRulesRuleArgs, {"name": "a"})
+        second = construct_trusted(FirewallRulesRuleArgs, {"name": "b"})
+        first.ranges.append("10.0.0.0/8")
+        self.assertEqual([], second.ranges)
@@ -95,3 +95,13 @@ class TestingVpc(unittest.TestCase):
             self.assertIn(TEST_NAME, urn)
 
         return pulumi.Output.all([self.vpc.urn]).apply(check_urn)
+
+    @pulumi.runtime.test
+    def test_registered_outputs(self):
+        def check_outputs(outputs):
+            self.assertEqual(TEST_NETWORK_NAME, outputs["network_name"])
+            self.assertEqual("vpc_id", outputs["network_id"])
+
+        return pulumi.Output.from_input(self.vpc.registered_outputs).apply(
+            check_outputs
+        )